@@ -12,12 +12,27 @@ from .main import (
     string_to_index,
     k_ring,
     k_ring_distances,
+    cell_distance,
+    grid_path,
     cell_sibling,
     cell_to_parent,
     cell_to_children,
+    cell_to_key_range,
+    cells_to_key_ranges,
+    cell_to_hilbert,
+    hilbert_to_cell,
     geometry_to_cells,
+    estimate_cover_size,
+    bbox_to_cells,
+    bbox_to_rows,
     cell_area,
 )
+from .aggregation import bin_points, bin_points_chunked, build_pyramid
+from .incremental import update_cover
+from .budget import cover_with_budget
+from .serialization import cells_to_geojson, cells_to_wkb
+from .mvt import cells_to_mvt
+from .instrumentation import instrument
 from ._version import __version__
 
 __all__ = [
@@ -34,10 +49,28 @@ __all__ = [
     "string_to_index",
     "k_ring",
     "k_ring_distances",
+    "cell_distance",
+    "grid_path",
     "cell_sibling",
     "cell_to_parent",
     "cell_to_children",
+    "cell_to_key_range",
+    "cells_to_key_ranges",
+    "cell_to_hilbert",
+    "hilbert_to_cell",
     "geometry_to_cells",
+    "estimate_cover_size",
+    "bbox_to_cells",
+    "bbox_to_rows",
     "cell_area",
+    "bin_points",
+    "bin_points_chunked",
+    "build_pyramid",
+    "update_cover",
+    "cover_with_budget",
+    "cells_to_geojson",
+    "cells_to_wkb",
+    "cells_to_mvt",
+    "instrument",
     "__version__",
 ]
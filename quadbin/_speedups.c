@@ -0,0 +1,607 @@
+/*
+ * Compiled implementations of the hot functions of quadbin.main and
+ * quadbin.tilecover. They follow the pure Python functions step by step,
+ * which remain the reference and the fallback when this module is not built.
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <math.h>
+#include <stdint.h>
+
+#ifndef M_PI
+#define M_PI 3.14159265358979323846
+#endif
+
+#define HEADER 0x4000000000000000ULL
+#define FOOTER 0xFFFFFFFFFFFFFULL
+#define MIN_LONGITUDE -180.0
+#define MAX_LONGITUDE 180.0
+#define MIN_LATITUDE -85.051129
+#define MAX_LATITUDE 85.051129
+
+static const uint64_t B[] = {
+    0x5555555555555555ULL,
+    0x3333333333333333ULL,
+    0x0F0F0F0F0F0F0F0FULL,
+    0x00FF00FF00FF00FFULL,
+    0x0000FFFF0000FFFFULL,
+    0x00000000FFFFFFFFULL,
+};
+static const uint64_t S[] = {1, 2, 4, 8, 16};
+
+/* Integer math */
+
+static uint64_t
+encode_cell(uint64_t x, uint64_t y, uint64_t z)
+{
+    int i;
+
+    x = x << (32 - z);
+    y = y << (32 - z);
+    for (i = 4; i >= 0; i--) {
+        x = (x | (x << S[i])) & B[i];
+        y = (y | (y << S[i])) & B[i];
+    }
+    return HEADER | (1ULL << 59) | (z << 52) | ((x | (y << 1)) >> 12) |
+           (z * 2 < 64 ? FOOTER >> (z * 2) : 0);
+}
+
+static void
+decode_cell(uint64_t cell, uint64_t *x, uint64_t *y, uint64_t *z)
+{
+    int i;
+    uint64_t q;
+
+    *z = (cell >> 52) & 31;
+    q = (cell & FOOTER) << 12;
+    *x = q & B[0];
+    *y = (q >> 1) & B[0];
+    for (i = 0; i < 5; i++) {
+        *x = (*x | (*x >> S[i])) & B[i + 1];
+        *y = (*y | (*y >> S[i])) & B[i + 1];
+    }
+    *x = *x >> (32 - *z);
+    *y = *y >> (32 - *z);
+}
+
+static long long
+floor_mod(long long a, long long b)
+{
+    long long m = a % b;
+    return (m != 0 && ((m < 0) != (b < 0))) ? m + b : m;
+}
+
+static long long
+tile_hash(long long x, long long y, int z)
+{
+    long long z2 = 1LL << z;
+    return ((2 * z2 * y + floor_mod(x, z2)) * 32) + z;
+}
+
+/* Float math, with the errors raised by Python */
+
+static double
+clip_number(double num, double lower, double upper)
+{
+    double value = upper < num ? upper : num;
+    return lower > value ? lower : value;
+}
+
+static double
+float_mod(double x, double y)
+{
+    double m = fmod(x, y);
+    if (m != 0.0) {
+        if ((y < 0) != (m < 0))
+            m += y;
+    }
+    else {
+        m = copysign(0.0, y);
+    }
+    return m;
+}
+
+static int
+floor_to_long_long(double value, long long *result)
+{
+    if (isnan(value)) {
+        PyErr_SetString(PyExc_ValueError, "cannot convert float NaN to integer");
+        return -1;
+    }
+    if (isinf(value)) {
+        PyErr_SetString(PyExc_OverflowError,
+                        "cannot convert float infinity to integer");
+        return -1;
+    }
+    *result = (long long)floor(value);
+    return 0;
+}
+
+static int
+tile_fraction(double longitude, double latitude, int z, double *x, double *y)
+{
+    double z2 = (double)(1LL << z);
+    double sinlat = sin(latitude * M_PI / 180.0);
+    double ratio;
+
+    if (1 - sinlat == 0) {
+        PyErr_SetString(PyExc_ZeroDivisionError, "float division by zero");
+        return -1;
+    }
+    ratio = (1 + sinlat) / (1 - sinlat);
+    if (ratio <= 0) {
+        PyErr_SetString(PyExc_ValueError, "math domain error");
+        return -1;
+    }
+    *x = z2 * (longitude / 360.0 + 0.5);
+    *y = z2 * (0.5 - 0.25 * log(ratio) / M_PI);
+
+    *x = float_mod(*x, z2);
+    if (*x < 0)
+        *x += z2;
+    return 0;
+}
+
+/* Argument conversion */
+
+static int
+as_cell(PyObject *obj, uint64_t *cell)
+{
+    unsigned long long value = PyLong_AsUnsignedLongLongMask(obj);
+    if (value == (unsigned long long)-1 && PyErr_Occurred())
+        return -1;
+    *cell = value;
+    return 0;
+}
+
+static int
+as_long_long(PyObject *obj, long long *result)
+{
+    if (PyFloat_Check(obj)) {
+        /* int() of a float, as the tile fractions of Python 2 */
+        double value = PyFloat_AS_DOUBLE(obj);
+        if (isnan(value) || isinf(value)) {
+            PyErr_SetString(PyExc_ValueError, "cannot convert float to integer");
+            return -1;
+        }
+        *result = (long long)value;
+        return 0;
+    }
+    *result = PyLong_AsLongLong(obj);
+    if (*result == -1 && PyErr_Occurred())
+        return -1;
+    return 0;
+}
+
+static int
+item_as_double(PyObject *sequence, Py_ssize_t i, double *result)
+{
+    PyObject *item = PySequence_GetItem(sequence, i);
+    if (item == NULL)
+        return -1;
+    *result = PyFloat_AsDouble(item);
+    Py_DECREF(item);
+    if (*result == -1.0 && PyErr_Occurred())
+        return -1;
+    return 0;
+}
+
+static int
+append_long_long(PyObject *list, long long value)
+{
+    int status;
+    PyObject *item = PyLong_FromLongLong(value);
+    if (item == NULL)
+        return -1;
+    status = PyList_Append(list, item);
+    Py_DECREF(item);
+    return status;
+}
+
+static int
+append_pair(PyObject *list, long long x, long long y)
+{
+    int status;
+    PyObject *pair = Py_BuildValue("[LL]", x, y);
+    if (pair == NULL)
+        return -1;
+    status = PyList_Append(list, pair);
+    Py_DECREF(pair);
+    return status;
+}
+
+/* quadbin.main */
+
+PyDoc_STRVAR(cell_to_tile_doc, "cell_to_tile(cell)\n\nConvert a cell into a tile.");
+
+static PyObject *
+cell_to_tile(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    static char *kwlist[] = {"cell", NULL};
+    PyObject *obj;
+    uint64_t cell, x, y, z;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O", kwlist, &obj))
+        return NULL;
+    if (as_cell(obj, &cell) < 0)
+        return NULL;
+    decode_cell(cell, &x, &y, &z);
+    return Py_BuildValue("(KKK)", x, y, z);
+}
+
+PyDoc_STRVAR(tile_to_cell_doc, "tile_to_cell(tile)\n\nConvert a tile into a cell.");
+
+static PyObject *
+tile_to_cell(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    static char *kwlist[] = {"tile", NULL};
+    PyObject *tile, *items;
+    long long x, y, z;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O", kwlist, &tile))
+        return NULL;
+    if (tile == Py_None)
+        Py_RETURN_NONE;
+
+    items = PySequence_Fast(tile, "cannot unpack non-iterable object");
+    if (items == NULL)
+        return NULL;
+    if (PySequence_Fast_GET_SIZE(items) != 3) {
+        Py_DECREF(items);
+        PyErr_SetString(PyExc_ValueError, "expected 3 values to unpack");
+        return NULL;
+    }
+    if (as_long_long(PySequence_Fast_GET_ITEM(items, 0), &x) < 0 ||
+        as_long_long(PySequence_Fast_GET_ITEM(items, 1), &y) < 0 ||
+        as_long_long(PySequence_Fast_GET_ITEM(items, 2), &z) < 0) {
+        Py_DECREF(items);
+        return NULL;
+    }
+    Py_DECREF(items);
+
+    if (z < 0 || z > 32) {
+        PyErr_SetString(PyExc_ValueError, "negative shift count");
+        return NULL;
+    }
+    return PyLong_FromUnsignedLongLong(
+        encode_cell((uint64_t)x, (uint64_t)y, (uint64_t)z));
+}
+
+PyDoc_STRVAR(point_to_cell_doc,
+             "point_to_cell(longitude, latitude, resolution)\n\n"
+             "Convert a geographic point into a cell.");
+
+static PyObject *
+point_to_cell(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    static char *kwlist[] = {"longitude", "latitude", "resolution", NULL};
+    double longitude, latitude, fx, fy;
+    long long x, y;
+    int resolution;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "ddi", kwlist, &longitude,
+                                     &latitude, &resolution))
+        return NULL;
+    if (resolution < 0 || resolution > 26) {
+        PyErr_SetString(PyExc_ValueError,
+                        "Invalid resolution: should be between 0 and 26");
+        return NULL;
+    }
+
+    longitude = clip_number(longitude, MIN_LONGITUDE, MAX_LONGITUDE);
+    latitude = clip_number(latitude, MIN_LATITUDE, MAX_LATITUDE);
+    if (tile_fraction(longitude, latitude, resolution, &fx, &fy) < 0 ||
+        floor_to_long_long(fx, &x) < 0 || floor_to_long_long(fy, &y) < 0)
+        return NULL;
+
+    return PyLong_FromUnsignedLongLong(
+        encode_cell((uint64_t)x, (uint64_t)y, (uint64_t)resolution));
+}
+
+PyDoc_STRVAR(cell_to_parent_doc,
+             "cell_to_parent(cell, parent_resolution)\n\n"
+             "Compute the parent cell for a specific resolution.");
+
+static PyObject *
+cell_to_parent(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    static char *kwlist[] = {"cell", "parent_resolution", NULL};
+    PyObject *obj;
+    uint64_t cell;
+    long long parent_resolution;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "OL", kwlist, &obj,
+                                     &parent_resolution))
+        return NULL;
+    if (as_cell(obj, &cell) < 0)
+        return NULL;
+    if (parent_resolution < 0 ||
+        parent_resolution > (long long)((cell >> 52) & 0x1F)) {
+        PyErr_SetString(PyExc_ValueError, "Invalid resolution");
+        return NULL;
+    }
+
+    return PyLong_FromUnsignedLongLong(
+        (cell & ~(0x1FULL << 52)) | ((uint64_t)parent_resolution << 52) |
+        (FOOTER >> (parent_resolution << 1)));
+}
+
+PyDoc_STRVAR(cell_to_children_doc,
+             "cell_to_children(cell, children_resolution)\n\n"
+             "Compute the children cells for a specific resolution.");
+
+static PyObject *
+cell_to_children(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    static char *kwlist[] = {"cell", "children_resolution", NULL};
+    PyObject *obj, *children, *child;
+    uint64_t cell, resolution, block_range, block_shift, child_base, x;
+    long long children_resolution;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "OL", kwlist, &obj,
+                                     &children_resolution))
+        return NULL;
+    if (as_cell(obj, &cell) < 0)
+        return NULL;
+    resolution = (cell >> 52) & 0x1F;
+    if (children_resolution < 0 || children_resolution > 26 ||
+        children_resolution <= (long long)resolution) {
+        PyErr_SetString(PyExc_ValueError, "Invalid resolution");
+        return NULL;
+    }
+
+    block_range = 1ULL << ((children_resolution - resolution) << 1);
+    block_shift = 52 - (children_resolution << 1);
+    child_base = (cell & ~(0x1FULL << 52)) | ((uint64_t)children_resolution << 52);
+    child_base = child_base & ~((block_range - 1) << block_shift);
+
+    if (block_range > (uint64_t)PY_SSIZE_T_MAX)
+        return PyErr_NoMemory();
+    children = PyList_New((Py_ssize_t)block_range);
+    if (children == NULL)
+        return NULL;
+    for (x = 0; x < block_range; x++) {
+        child = PyLong_FromUnsignedLongLong(child_base | (x << block_shift));
+        if (child == NULL) {
+            Py_DECREF(children);
+            return NULL;
+        }
+        PyList_SET_ITEM(children, (Py_ssize_t)x, child);
+    }
+    return children;
+}
+
+/* quadbin.tilecover */
+
+PyDoc_STRVAR(to_tile_hash_doc, "to_tile_hash(x, y, z)\n\nCompute a hash from the tile.");
+
+static PyObject *
+to_tile_hash(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    static char *kwlist[] = {"x", "y", "z", NULL};
+    long long x, y;
+    int z;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "LLi", kwlist, &x, &y, &z))
+        return NULL;
+    if (z < 0 || z > 31) {
+        PyErr_SetString(PyExc_ValueError, "Invalid resolution");
+        return NULL;
+    }
+    return PyLong_FromLongLong(tile_hash(x, y, z));
+}
+
+PyDoc_STRVAR(from_tile_hash_doc,
+             "from_tile_hash(tile_hash)\n\nCompute a tile from the hash.");
+
+static PyObject *
+from_tile_hash(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    static char *kwlist[] = {"tile_hash", NULL};
+    long long hash, z, dim, xy, x;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "L", kwlist, &hash))
+        return NULL;
+    /* Floor modulo as in Python, for the rows beyond the poles */
+    z = floor_mod(hash, 32);
+    dim = 2 * (1LL << z);
+    xy = (hash - z) / 32;
+    x = floor_mod(xy, dim);
+    return Py_BuildValue("(LLL)", x, floor_mod((xy - x) / dim, dim), z);
+}
+
+static double *
+tile_fractions(PyObject *coords, Py_ssize_t n, int z, PyObject *origin, int unwrap)
+{
+    double z2 = (double)(1LL << z);
+    double reference = 0.0, lon, lat, *fractions;
+    int has_reference = origin != Py_None;
+    Py_ssize_t i;
+    PyObject *coord;
+
+    if (has_reference) {
+        reference = PyFloat_AsDouble(origin);
+        if (reference == -1.0 && PyErr_Occurred())
+            return NULL;
+    }
+
+    fractions = PyMem_Malloc(sizeof(double) * 2 * (n ? n : 1));
+    if (fractions == NULL) {
+        PyErr_NoMemory();
+        return NULL;
+    }
+    for (i = 0; i < n; i++) {
+        coord = PySequence_Fast_GET_ITEM(coords, i);
+        if (item_as_double(coord, 0, &lon) < 0 || item_as_double(coord, 1, &lat) < 0 ||
+            tile_fraction(lon, lat, z, &fractions[2 * i], &fractions[2 * i + 1]) < 0) {
+            PyMem_Free(fractions);
+            return NULL;
+        }
+        if (unwrap && has_reference)
+            fractions[2 * i] += z2 * floor((reference - fractions[2 * i]) / z2 + 0.5);
+        reference = fractions[2 * i];
+        has_reference = 1;
+    }
+    return fractions;
+}
+
+PyDoc_STRVAR(line_cover_doc,
+             "line_cover(coords, resolution, ring=None, origin=None)\n\n"
+             "Return the tiles hashes that cover a line.");
+
+static PyObject *
+line_cover(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    static char *kwlist[] = {"coords", "resolution", "ring", "origin", NULL};
+    PyObject *coords, *ring = Py_None, *origin = Py_None, *tiles_hashes = NULL;
+    PyObject *first, *first_y;
+    double *fractions = NULL, x0, y0, x1, y1, dx, dy;
+    double t_max_x, t_max_y, tdx, tdy, inf = HUGE_VAL;
+    long long x, y = 0, prev_x = 0, prev_y = 0, sx, sy, ring_y;
+    int resolution, has_prev = 0, has_y = 0;
+    Py_ssize_t i, n, ring_length;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "Oi|OO", kwlist, &coords,
+                                     &resolution, &ring, &origin))
+        return NULL;
+    if (resolution < 0 || resolution > 26) {
+        PyErr_SetString(PyExc_ValueError, "Invalid resolution");
+        return NULL;
+    }
+    if (ring != Py_None && !PyList_Check(ring)) {
+        PyErr_SetString(PyExc_TypeError, "ring should be a list");
+        return NULL;
+    }
+
+    coords = PySequence_Fast(coords, "coords should be a sequence");
+    if (coords == NULL)
+        return NULL;
+    n = PySequence_Fast_GET_SIZE(coords);
+
+    fractions = tile_fractions(coords, n, resolution, origin, 1);
+    if (fractions == NULL)
+        goto error;
+    if (ring != Py_None && n > 1 &&
+        fabs(fractions[2 * (n - 1)] - fractions[0]) >= (double)(1LL << resolution) / 2) {
+        /* Rings around a pole do not close once unwrapped */
+        PyMem_Free(fractions);
+        fractions = tile_fractions(coords, n, resolution, Py_None, 0);
+        if (fractions == NULL)
+            goto error;
+    }
+
+    tiles_hashes = PyList_New(0);
+    if (tiles_hashes == NULL)
+        goto error;
+
+    for (i = 0; i + 1 < n; i++) {
+        x0 = fractions[2 * i];
+        y0 = fractions[2 * i + 1];
+        x1 = fractions[2 * i + 2];
+        y1 = fractions[2 * i + 3];
+        dx = x1 - x0;
+        dy = y1 - y0;
+
+        if (dy == 0 && dx == 0)
+            continue;
+
+        sx = dx > 0 ? 1 : -1;
+        sy = dy > 0 ? 1 : -1;
+        if (floor_to_long_long(x0, &x) < 0 || floor_to_long_long(y0, &y) < 0)
+            goto error;
+        has_y = 1;
+        t_max_x = dx == 0 ? inf : fabs(((double)((dx > 0 ? 1 : 0) + x) - x0) / dx);
+        t_max_y = dy == 0 ? inf : fabs(((double)((dy > 0 ? 1 : 0) + y) - y0) / dy);
+        tdx = dx == 0 ? inf : fabs(sx / dx);
+        tdy = dy == 0 ? inf : fabs(sy / dy);
+
+        if (!has_prev || x != prev_x || y != prev_y) {
+            if (append_long_long(tiles_hashes, tile_hash(x, y, resolution)) < 0)
+                goto error;
+            if (ring != Py_None && (!has_prev || y != prev_y) &&
+                append_pair(ring, x, y) < 0)
+                goto error;
+            prev_x = x;
+            prev_y = y;
+            has_prev = 1;
+        }
+
+        while (t_max_x < 1 || t_max_y < 1) {
+            if (t_max_x < t_max_y) {
+                t_max_x += tdx;
+                x += sx;
+            }
+            else {
+                t_max_y += tdy;
+                y += sy;
+            }
+
+            if (append_long_long(tiles_hashes, tile_hash(x, y, resolution)) < 0)
+                goto error;
+            if (ring != Py_None && y != prev_y && append_pair(ring, x, y) < 0)
+                goto error;
+            prev_x = x;
+            prev_y = y;
+        }
+    }
+
+    if (ring != Py_None && has_y && (ring_length = PyList_GET_SIZE(ring)) > 0) {
+        first = PyList_GET_ITEM(ring, 0);
+        first_y = PySequence_GetItem(first, 1);
+        if (first_y == NULL)
+            goto error;
+        ring_y = PyLong_AsLongLong(first_y);
+        Py_DECREF(first_y);
+        if (ring_y == -1 && PyErr_Occurred())
+            goto error;
+        if (y == ring_y &&
+            PyList_SetSlice(ring, ring_length - 1, ring_length, NULL) < 0)
+            goto error;
+    }
+
+    PyMem_Free(fractions);
+    Py_DECREF(coords);
+    return tiles_hashes;
+
+error:
+    PyMem_Free(fractions);
+    Py_XDECREF(tiles_hashes);
+    Py_DECREF(coords);
+    return NULL;
+}
+
+#define METHOD(name) \
+    {#name, (PyCFunction)(void (*)(void))name, METH_VARARGS | METH_KEYWORDS, name##_doc}
+
+static PyMethodDef speedups_methods[] = {
+    METHOD(cell_to_tile),
+    METHOD(tile_to_cell),
+    METHOD(point_to_cell),
+    METHOD(cell_to_parent),
+    METHOD(cell_to_children),
+    METHOD(to_tile_hash),
+    METHOD(from_tile_hash),
+    METHOD(line_cover),
+    {NULL, NULL, 0, NULL},
+};
+
+PyDoc_STRVAR(speedups_doc, "Compiled implementations of quadbin functions.");
+
+#if PY_MAJOR_VERSION >= 3
+static struct PyModuleDef speedups_module = {
+    PyModuleDef_HEAD_INIT, "_speedups", speedups_doc, -1, speedups_methods,
+};
+
+PyMODINIT_FUNC
+PyInit__speedups(void)
+{
+    return PyModule_Create(&speedups_module);
+}
+#else
+PyMODINIT_FUNC
+init_speedups(void)
+{
+    Py_InitModule3("_speedups", speedups_methods, speedups_doc);
+}
+#endif
@@ -0,0 +1,285 @@
+from __future__ import division
+
+try:
+    import numpy as np
+
+    from . import vectorized
+except ImportError:
+    np = vectorized = None
+
+from .main import cell_to_parent, get_resolution, tile_to_cell
+from .utils import clip_latitude, clip_longitude, point_to_tile
+
+AGGREGATIONS = ("count", "sum", "mean", "min", "max")
+
+
+def bin_points(longitudes, latitudes, resolution, weights=None, agg="count"):
+    """Aggregate points into the cells that contain them.
+
+    Parameters
+    ----------
+    longitudes : sequence of float
+        Longitudes in decimal degrees.
+    latitudes : sequence of float
+        Latitudes in decimal degrees.
+    resolution : int
+        The resolution of the cells.
+    weights : sequence of float, optional
+        Value of each point, by default 1 for every point.
+    agg : str, optional
+        Aggregation: "count", "sum", "mean", "min" or "max", by default "count".
+
+    Returns
+    -------
+    tuple (list, list)
+        Sorted unique cells and the aggregated value of each cell.
+
+    Raises
+    ------
+    ValueError
+        If the resolution, the aggregation or the lengths are not valid.
+    """
+    return bin_points_chunked([(longitudes, latitudes, weights)], resolution, agg)
+
+
+def bin_points_chunked(chunks, resolution, agg="count"):
+    """Aggregate batches of points into the cells that contain them.
+
+    The chunks are consumed one at a time and only the per-cell
+    accumulators are kept, so memory is bounded by the number of
+    distinct cells instead of the number of points.
+
+    Parameters
+    ----------
+    chunks : iterable
+        Tuples (longitudes, latitudes) or (longitudes, latitudes, weights).
+    resolution : int
+        The resolution of the cells.
+    agg : str, optional
+        Aggregation: "count", "sum", "mean", "min" or "max", by default "count".
+
+    Returns
+    -------
+    tuple (list, list)
+        Sorted unique cells and the aggregated value of each cell.
+
+    Raises
+    ------
+    ValueError
+        If the resolution, the aggregation or the lengths of a chunk are
+        not valid.
+    """
+    if resolution < 0 or resolution > 26:
+        raise ValueError("Invalid resolution: should be between 0 and 26")
+    if agg not in AGGREGATIONS:
+        raise ValueError("Invalid aggregation: should be count, sum, mean, min or max")
+
+    groups = {}
+    for chunk in chunks:
+        longitudes, latitudes = chunk[0], chunk[1]
+        weights = chunk[2] if len(chunk) > 2 else None
+        if weights is None:
+            weights = [1] * len(longitudes)
+        if not len(longitudes) == len(latitudes) == len(weights):
+            raise ValueError(
+                "Invalid points: longitudes, latitudes and weights should have "
+                "the same length"
+            )
+        accumulate_points(groups, longitudes, latitudes, weights, resolution, agg)
+
+    return finalize_groups(groups, agg)
+
+
+def build_pyramid(cells, values, min_res, agg="sum"):
+    """Aggregate sorted cells into every coarser resolution.
+
+    The parents of sorted cells of the same resolution are contiguous, so
+    each level is reduced in a single pass: a parent is complete as soon
+    as the next cell has a different parent, and it is then merged into
+    the level above.
+
+    Parameters
+    ----------
+    cells : sequence of int
+        Sorted cells, all of the same resolution.
+    values : sequence of float
+        Value of each cell.
+    min_res : int
+        The coarsest resolution of the pyramid.
+    agg : str, optional
+        Aggregation: "count", "sum", "mean", "min" or "max", by default "sum".
+
+    Returns
+    -------
+    dict
+        Tuples (cells, values) of sorted parent cells and their aggregated
+        value, keyed by resolution from min_res to the resolution of the
+        cells minus one.
+
+    Raises
+    ------
+    ValueError
+        If the resolutions, the aggregation or the order are not valid.
+    """
+    if agg not in AGGREGATIONS:
+        raise ValueError("Invalid aggregation: should be count, sum, mean, min or max")
+    if min_res < 0 or min_res > 26:
+        raise ValueError("Invalid resolution")
+    if len(cells) == 0:
+        return {}
+
+    resolution = get_resolution(cells[0])
+    if min_res > resolution:
+        raise ValueError("Invalid resolution")
+
+    levels = list(range(resolution - 1, min_res - 1, -1))
+    pyramid = dict((level, ([], [])) for level in levels)
+    parents = dict((level, None) for level in levels)
+    accumulators = {}
+
+    def push(level, parent, accumulator):
+        # Merge a complete cell of level + 1 into its parent at this level
+        if parents[level] == parent:
+            accumulators[level] = merge(accumulators[level], accumulator, agg)
+            return
+        if parents[level] is not None:
+            flush(level)
+        parents[level] = parent
+        accumulators[level] = accumulator
+
+    def flush(level):
+        parent = parents[level]
+        accumulator = accumulators[level]
+        level_cells, level_values = pyramid[level]
+        level_cells.append(parent)
+        if agg == "mean":
+            level_values.append(accumulator[0] / accumulator[1])
+        else:
+            level_values.append(accumulator)
+        if level > min_res:
+            push(level - 1, cell_to_parent(parent, level - 1), accumulator)
+
+    previous = None
+    for cell, value in zip(cells, values):
+        if get_resolution(cell) != resolution:
+            raise ValueError("Invalid resolution: cells should be of the same one")
+        if previous is not None and cell < previous:
+            raise ValueError("Invalid order: cells should be sorted")
+        previous = cell
+        if levels:
+            push(levels[0], cell_to_parent(cell, levels[0]), initial(value, agg))
+
+    # The last parent of every level is complete once the finer level is flushed
+    for level in levels:
+        flush(level)
+
+    return pyramid
+
+
+def accumulate_points(groups, longitudes, latitudes, weights, resolution, agg):
+    """Accumulate weighted points into a dict of per-cell accumulators.
+
+    If NumPy is installed, numeric points are grouped by accumulate_arrays,
+    so only one accumulator per distinct cell is merged in Python.
+    """
+    if np is not None:
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        weights = np.asarray(weights)
+        if (
+            weights.dtype.kind in "iuf"
+            and np.isfinite(longitudes).all()
+            and np.isfinite(latitudes).all()
+        ):
+            accumulate_arrays(groups, longitudes, latitudes, weights, resolution, agg)
+            return
+        longitudes = longitudes.tolist()
+        latitudes = latitudes.tolist()
+        weights = weights.tolist()
+
+    for longitude, latitude, weight in zip(longitudes, latitudes, weights):
+        tile = point_to_tile(
+            clip_longitude(longitude), clip_latitude(latitude), resolution
+        )
+        accumulate(groups, tile_to_cell(tile), weight, agg)
+
+
+def accumulate_arrays(groups, longitudes, latitudes, weights, resolution, agg):
+    """Accumulate arrays of weighted points, grouped by cell with np.unique."""
+    cells = vectorized.points_to_cells(longitudes, latitudes, resolution)
+    keys, first, inverse = np.unique(cells, return_index=True, return_inverse=True)
+    if agg == "count":
+        values = np.bincount(inverse, minlength=len(keys))
+    elif agg == "sum" or agg == "mean":
+        values = np.bincount(inverse, weights, len(keys))
+        if weights.dtype.kind != "f":
+            values = values.astype(weights.dtype)
+    else:
+        values = weights[first]
+        reduce = np.minimum if agg == "min" else np.maximum
+        reduce.at(values, inverse, weights)
+
+    keys = keys.tolist()
+    values = values.tolist()
+    if agg == "mean":
+        counts = np.bincount(inverse, minlength=len(keys)).tolist()
+        values = [[value, count] for value, count in zip(values, counts)]
+    for key, value in zip(keys, values):
+        current = groups.get(key)
+        groups[key] = value if current is None else merge(current, value, agg)
+
+
+def accumulate(groups, key, value, agg):
+    """Merge a value into the accumulator of a key.
+
+    The accumulator is a count for "count", a number for "sum", "min" and
+    "max", and a list [sum, count] for "mean".
+    """
+    current = groups.get(key)
+    if agg == "count":
+        groups[key] = 1 if current is None else current + 1
+    elif agg == "mean":
+        if current is None:
+            groups[key] = [value, 1]
+        else:
+            current[0] += value
+            current[1] += 1
+    elif current is None:
+        groups[key] = value
+    elif agg == "sum":
+        groups[key] = current + value
+    elif agg == "min":
+        if value < current:
+            groups[key] = value
+    elif value > current:
+        groups[key] = value
+
+
+def finalize_groups(groups, agg):
+    """Convert a dict of accumulators into sorted cells and values."""
+    cells = sorted(groups)
+    if agg == "mean":
+        values = [groups[cell][0] / groups[cell][1] for cell in cells]
+    else:
+        values = [groups[cell] for cell in cells]
+    return cells, values
+
+
+def initial(value, agg):
+    """Create the accumulator of a single value."""
+    if agg == "count":
+        return 1
+    if agg == "mean":
+        return [value, 1]
+    return value
+
+
+def merge(accumulator, other, agg):
+    """Merge two accumulators of the same aggregation."""
+    if agg == "count" or agg == "sum":
+        return accumulator + other
+    if agg == "mean":
+        return [accumulator[0] + other[0], accumulator[1] + other[1]]
+    if agg == "min":
+        return min(accumulator, other)
+    return max(accumulator, other)
@@ -0,0 +1,204 @@
+# Awaitable bulk functions for asyncio applications. asyncio needs Python 3,
+# so this module is not imported by quadbin.
+
+import asyncio
+import json
+from functools import partial
+from itertools import islice
+
+from .main import cell_to_boundary, tile_to_cell
+from .tilecover import (
+    boundary_tiles_hashes,
+    from_tile_hash,
+    get_tiles,
+    polygon_spans,
+    span_hashes,
+    to_tile_hash,
+)
+from .utils import distinct
+
+CHUNK_SIZE = 4096
+
+
+async def geometry_to_cells(geometry, resolution, executor=None, chunk_size=CHUNK_SIZE):
+    """Compute the cells that fill an input geometry without blocking the loop.
+
+    The boundary of each polygon is computed once, and its interior is
+    filled in chunks of rows of about chunk_size cells, each one computed
+    in the executor. Cancelling the task stops the fill after the chunk
+    being computed.
+
+    Parameters
+    ----------
+    geometry : str
+        Input geometry as GeoJSON.
+    resolution : int
+        The resolution of the cells.
+    executor : concurrent.futures.Executor, optional
+        Executor of the chunks, by default the one of the event loop.
+    chunk_size : int, optional
+        Approximate number of cells of each chunk, by default 4096.
+
+    Returns
+    -------
+    list
+        Cells intersecting the geometry, as geometry_to_cells.
+    """
+    loop = asyncio.get_running_loop()
+    geometry = json.loads(geometry)
+    if geometry["type"] == "GeometryCollection":
+        geometries = geometry["geometries"]
+    else:
+        geometries = [geometry]
+
+    tiles_hashes = []
+    for geom in geometries:
+        for job in cover_jobs(geom, resolution, chunk_size):
+            tiles_hashes += await loop.run_in_executor(executor, job)
+
+    tiles_hashes = await loop.run_in_executor(executor, distinct, tiles_hashes)
+    return await map_chunks(hash_to_cell, tiles_hashes, executor, chunk_size)
+
+
+async def cells_to_boundaries(
+    cells, geojson=False, executor=None, chunk_size=CHUNK_SIZE
+):
+    """Compute the boundaries of cells without blocking the loop.
+
+    Parameters
+    ----------
+    cells : iterable of int
+    geojson : bool, optional
+        Return the boundaries as GeoJSON strings, by default False.
+    executor : concurrent.futures.Executor, optional
+        Executor of the chunks, by default the one of the event loop.
+    chunk_size : int, optional
+        Number of cells of each chunk, by default 4096.
+
+    Returns
+    -------
+    list
+        Boundary of each cell, as cell_to_boundary.
+    """
+    function = partial(cell_to_boundary, geojson=geojson)
+    return await map_chunks(function, cells, executor, chunk_size)
+
+
+async def map_chunks(function, items, executor=None, chunk_size=CHUNK_SIZE):
+    """Apply a function to every item, in chunks computed in an executor.
+
+    The event loop runs other tasks between chunks, and cancelling the
+    task stops the work after the chunk being computed.
+
+    Parameters
+    ----------
+    function : callable
+    items : iterable
+    executor : concurrent.futures.Executor, optional
+        Executor of the chunks, by default the one of the event loop.
+    chunk_size : int, optional
+        Number of items of each chunk, by default 4096.
+
+    Returns
+    -------
+    list
+        Results of the function, in the order of the items.
+
+    Raises
+    ------
+    ValueError
+        If the chunk size is not valid.
+    """
+    if chunk_size <= 0:
+        raise ValueError("Invalid chunk size: should be positive")
+
+    loop = asyncio.get_running_loop()
+    items = iter(items)
+    results = []
+    while True:
+        chunk = list(islice(items, chunk_size))
+        if not chunk:
+            return results
+        results += await loop.run_in_executor(executor, map_chunk, function, chunk)
+
+
+def map_chunk(function, chunk):
+    """Apply a function to the items of a chunk.
+
+    Returns
+    -------
+    list
+    """
+    return [function(item) for item in chunk]
+
+
+def cover_jobs(geometry, resolution, chunk_size):
+    """Split the cover of a geometry into jobs to run one after the other.
+
+    The fill jobs of a polygon share its polygon_spans generator, so the
+    edge table is built once and each job continues the rows of the
+    previous one.
+
+    Yields
+    ------
+    callable
+        Jobs without arguments that return tiles hashes.
+    """
+    if chunk_size <= 0:
+        raise ValueError("Invalid chunk size: should be positive")
+
+    if geometry["type"] == "Polygon":
+        polygons = [geometry["coordinates"]]
+    elif geometry["type"] == "MultiPolygon":
+        polygons = geometry["coordinates"]
+    else:
+        yield partial(geometry_hashes, geometry, resolution)
+        return
+
+    for polygon in polygons:
+        if not polygon or not polygon[0]:
+            continue
+        boundary = {"type": "Polygon", "coordinates": polygon}
+        yield partial(boundary_tiles_hashes, boundary, resolution)
+        spans = polygon_spans(polygon, resolution)
+        done = []
+        while not done:
+            yield partial(fill_chunk, spans, resolution, chunk_size, done)
+
+
+def fill_chunk(spans, resolution, chunk_size, done):
+    """Compute the tiles hashes of the next spans, up to about chunk_size.
+
+    Appends True to done once the spans are exhausted.
+
+    Returns
+    -------
+    list
+    """
+    tiles_hashes = []
+    for y, start, stop in spans:
+        tiles_hashes += span_hashes(y, start, stop, resolution)
+        if len(tiles_hashes) >= chunk_size:
+            return tiles_hashes
+    done.append(True)
+    return tiles_hashes
+
+
+def geometry_hashes(geometry, resolution):
+    """Compute the tiles hashes of a geometry with get_tiles.
+
+    Returns
+    -------
+    list
+    """
+    return [to_tile_hash(x, y, z) for x, y, z in get_tiles(geometry, resolution)]
+
+
+def hash_to_cell(tile_hash):
+    """Convert a tile hash into a cell.
+
+    Returns
+    -------
+    int
+    """
+    return tile_to_cell(from_tile_hash(tile_hash))
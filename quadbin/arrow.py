@@ -0,0 +1,203 @@
+# Cell functions over Apache Arrow columns. PyArrow is an optional dependency
+# (quadbin[arrow]), so this module is not imported by quadbin.
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from . import vectorized
+from .main import tile_to_cell
+
+TILE_TYPE = pa.struct([("x", pa.uint32()), ("y", pa.uint32()), ("z", pa.uint8())])
+
+
+def point_to_cell(longitudes, latitudes, resolution):
+    """Convert columns of geographic points into cells.
+
+    Parameters
+    ----------
+    longitudes : pyarrow.Array or pyarrow.ChunkedArray
+        Longitudes in decimal degrees.
+    latitudes : pyarrow.Array or pyarrow.ChunkedArray
+        Latitudes in decimal degrees.
+    resolution : int
+        The resolution of the cells.
+
+    Returns
+    -------
+    pyarrow.UInt64Array or pyarrow.ChunkedArray
+
+    Raises
+    ------
+    ValueError
+        If the resolution is out of bounds.
+    """
+    if resolution < 0 or resolution > 26:
+        raise ValueError("Invalid resolution: should be between 0 and 26")
+
+    def function(longitudes, latitudes):
+        return pa.array(vectorized.points_to_cells(longitudes, latitudes, resolution))
+
+    return apply(function, [longitudes, latitudes], pa.float64(), pa.uint64())
+
+
+def cell_to_parent(cells, parent_resolution):
+    """Compute the parent cells of a column for a specific resolution.
+
+    Parameters
+    ----------
+    cells : pyarrow.Array or pyarrow.ChunkedArray
+        Cells as uint64 or int64.
+    parent_resolution : int
+
+    Returns
+    -------
+    pyarrow.UInt64Array or pyarrow.ChunkedArray
+
+    Raises
+    ------
+    ValueError
+        If the parent resolution is not valid.
+    """
+
+    def function(cells):
+        return pa.array(vectorized.cells_to_parents(cells, parent_resolution))
+
+    # Null slots hold a finest cell, so they never fail the resolution check
+    fill = tile_to_cell((0, 0, 26))
+    return apply(function, [cells], pa.uint64(), pa.uint64(), fill)
+
+
+def cell_to_tile(cells):
+    """Convert a column of cells into tiles.
+
+    Parameters
+    ----------
+    cells : pyarrow.Array or pyarrow.ChunkedArray
+        Cells as uint64 or int64.
+
+    Returns
+    -------
+    pyarrow.StructArray or pyarrow.ChunkedArray
+        Tiles with the fields x, y and z.
+    """
+
+    def function(cells):
+        x, y, z = vectorized.cells_to_tiles(cells)
+        return pa.StructArray.from_arrays(
+            [
+                pa.array(x.astype(np.uint32)),
+                pa.array(y.astype(np.uint32)),
+                pa.array(z.astype(np.uint8)),
+            ],
+            fields=list(TILE_TYPE),
+        )
+
+    return apply(function, [cells], pa.uint64(), TILE_TYPE)
+
+
+def index_to_string(indexes):
+    """Convert a column of indexes into their string representation.
+
+    Parameters
+    ----------
+    indexes : pyarrow.Array or pyarrow.ChunkedArray
+        Indexes as uint64 or int64.
+
+    Returns
+    -------
+    pyarrow.StringArray or pyarrow.ChunkedArray
+        The hexadecimal representations of the indexes.
+    """
+
+    def function(indexes):
+        data, offsets = vectorized.hex_buffers(indexes)
+        return pa.StringArray.from_buffers(
+            len(indexes), pa.py_buffer(offsets), pa.py_buffer(data)
+        )
+
+    return apply(function, [indexes], pa.uint64(), pa.string())
+
+
+def apply(function, arrays, value_type, result_type, fill=0):
+    """Apply a function over the values of Arrow columns, chunk by chunk.
+
+    The values are passed as NumPy views of the Arrow buffers. Chunks with
+    nulls are copied to set their null slots to the fill value, which are
+    then masked in the result.
+
+    Returns
+    -------
+    pyarrow.Array or pyarrow.ChunkedArray
+    """
+    arrays = [to_arrow(array, value_type) for array in arrays]
+
+    if not any(isinstance(array, pa.ChunkedArray) for array in arrays):
+        return apply_chunk(function, arrays, value_type, fill)
+
+    arrays = [
+        array if isinstance(array, pa.ChunkedArray) else pa.chunked_array([array])
+        for array in arrays
+    ]
+    layouts = set(tuple(len(chunk) for chunk in array.chunks) for array in arrays)
+    if len(layouts) > 1:
+        arrays = [pa.chunked_array([array.combine_chunks()]) for array in arrays]
+
+    chunks = [
+        apply_chunk(function, list(chunk), value_type, fill)
+        for chunk in zip(*[array.chunks for array in arrays])
+    ]
+    return pa.chunked_array(chunks, type=result_type)
+
+
+def apply_chunk(function, arrays, value_type, fill):
+    """Apply a function over the values of Arrow arrays of the same length."""
+    if not any(array.null_count for array in arrays):
+        return function(*[buffer_values(array, value_type) for array in arrays])
+
+    valid = arrays[0].is_valid()
+    for array in arrays[1:]:
+        valid = pc.and_(valid, array.is_valid())
+
+    fill = pa.scalar(fill, value_type)
+    values = [buffer_values(pc.fill_null(array, fill), value_type) for array in arrays]
+    result = function(*values)
+    return pc.if_else(valid, result, pa.scalar(None, result.type))
+
+
+def buffer_values(array, value_type):
+    """View the values of a primitive Arrow array as a NumPy array, without copying.
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    dtype = value_type.to_pandas_dtype()
+    if len(array) == 0:
+        return np.empty(0, dtype=dtype)
+    offset = array.offset
+    values = np.frombuffer(array.buffers()[1], dtype=dtype, count=len(array) + offset)
+    return values[offset:]
+
+
+def to_arrow(values, value_type):
+    """Convert values into an Arrow array of a type, reusing its buffers if possible.
+
+    Signed 64-bit integers are reinterpreted as unsigned ones, which is
+    exact for indexes.
+
+    Returns
+    -------
+    pyarrow.Array or pyarrow.ChunkedArray
+    """
+    if not isinstance(values, (pa.Array, pa.ChunkedArray)):
+        values = pa.array(values)
+    if values.type == value_type:
+        return values
+    if value_type == pa.uint64() and values.type == pa.int64():
+        if isinstance(values, pa.ChunkedArray):
+            return pa.chunked_array(
+                [chunk.view(value_type) for chunk in values.chunks], type=value_type
+            )
+        return values.view(value_type)
+    return values.cast(value_type)
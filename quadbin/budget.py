@@ -0,0 +1,225 @@
+import json
+
+from .main import bbox_to_rows, cell_to_children, cell_to_tile, tile_to_cell
+from .tilecover import (
+    boundary_tiles_hashes,
+    from_tile_hash,
+    get_tiles,
+    polygon_spans,
+)
+
+
+def cover_with_budget(geometry, max_cells, min_res, max_res):
+    """Cover a geometry with at most a number of cells, as fine as possible.
+
+    The cover starts at the finest resolution whose bounding box fits in
+    the budget, and the cells crossed by the boundary are refined level by
+    level while the budget allows it, the ones with fewer children first.
+    Cells inside polygons are kept at their resolution, so the cover mixes
+    resolutions. Only the cells of the cover are computed, never the full
+    cover of a resolution that does not fit.
+
+    Parameters
+    ----------
+    geometry : str
+        Input geometry as GeoJSON.
+    max_cells : int
+        Maximum number of cells of the cover.
+    min_res : int
+        Resolution of the coarsest cells.
+    max_res : int
+        Resolution of the finest cells.
+
+    Returns
+    -------
+    list
+        Cells intersecting the geometry, from min_res to max_res.
+
+    Raises
+    ------
+    ValueError
+        If the budget or the resolutions are not valid, or if the cover at
+        min_res has more than max_cells cells.
+    """
+    if max_cells < 1:
+        raise ValueError("Invalid budget: should be positive")
+    if min_res < 0 or min_res > max_res or max_res > 26:
+        raise ValueError("Invalid resolutions: should be 0 <= min_res <= max_res <= 26")
+
+    geometry = json.loads(geometry)
+    if geometry["type"] == "GeometryCollection":
+        parts = geometry["geometries"]
+    else:
+        parts = [geometry]
+
+    resolution = start_resolution(parts, max_cells, max_res)
+    boundary = boundary_tiles(parts, resolution)
+    tiles = set(tile for part in parts for tile in get_tiles(part, resolution))
+    interior = [tile_to_cell(tile) for tile in tiles if tile not in boundary]
+    frontier = [tile_to_cell(tile) for tile in boundary]
+    cells = []
+
+    while resolution < max_res and (frontier or resolution < min_res):
+        resolution += 1
+        groups = refine_cells(parts, frontier, resolution)
+
+        if resolution <= min_res:
+            # Every cell is refined down to min_res
+            size = 4 * len(interior) + sum(
+                len(edge) + len(inner) for _, edge, inner in groups
+            )
+            if size > max_cells:
+                raise ValueError(
+                    "Invalid budget: the cover at min_res has more than max_cells cells"
+                )
+            interior = [
+                child
+                for cell in interior
+                for child in cell_to_children(cell, resolution)
+            ]
+            interior += [cell for _, _, inner in groups for cell in inner]
+            frontier = [cell for _, edge, _ in groups for cell in edge]
+            continue
+
+        size = len(cells) + len(interior) + len(frontier)
+        groups.sort(key=lambda group: (len(group[1]) + len(group[2]), group[0]))
+        frontier = []
+        for i, (parent, edge, inner) in enumerate(groups):
+            if size + len(edge) + len(inner) - 1 > max_cells:
+                # The remaining cells have as many children or more
+                cells += frontier + [group[0] for group in groups[i:]]
+                frontier = []
+                break
+            size += len(edge) + len(inner) - 1
+            cells += inner
+            frontier += edge
+
+    return cells + interior + frontier
+
+
+def start_resolution(parts, max_cells, max_res):
+    """Find the finest resolution whose bounding box has at most max_cells tiles.
+
+    Returns
+    -------
+    int
+    """
+    coordinates = []
+    for part in parts:
+        coordinates += flatten_coordinates(part["coordinates"])
+    if not coordinates:
+        return max_res
+
+    xmin = min(point[0] for point in coordinates)
+    xmax = max(point[0] for point in coordinates)
+    ymin = min(point[1] for point in coordinates)
+    ymax = max(point[1] for point in coordinates)
+    if xmax - xmin >= 360:
+        xmin, xmax = -180, 180
+
+    for resolution in range(1, max_res + 1):
+        rows = bbox_to_rows(xmin, ymin, xmax, ymax, resolution)
+        if sum(stop - start for _, start, stop in rows) > max_cells:
+            return resolution - 1
+    return max_res
+
+
+def flatten_coordinates(coordinates):
+    """Collect the points of nested GeoJSON coordinates.
+
+    Returns
+    -------
+    list
+    """
+    if coordinates and isinstance(coordinates[0], (int, float)):
+        return [coordinates]
+    points = []
+    for item in coordinates:
+        points += flatten_coordinates(item)
+    return points
+
+
+def boundary_tiles(parts, resolution):
+    """Compute the tiles of the points, lines and rings of geometries.
+
+    Returns
+    -------
+    set
+    """
+    tiles = set()
+    for part in parts:
+        if part["type"] in ("Point", "MultiPoint"):
+            tiles.update(get_tiles(part, resolution))
+        else:
+            tiles.update(
+                from_tile_hash(tile_hash)
+                for tile_hash in boundary_tiles_hashes(part, resolution)
+            )
+    return tiles
+
+
+def refine_cells(parts, cells, resolution):
+    """Compute the children of cells that intersect geometries.
+
+    The cells are those crossed by the boundary at the parent resolution,
+    so every child is either crossed by the boundary or fully inside or
+    outside the polygons, as told by its center.
+
+    Returns
+    -------
+    list
+        Tuples (cell, edge, inner) with the children crossed by the
+        boundary and the children inside the polygons.
+    """
+    boundary = boundary_tiles(parts, resolution)
+    children = [
+        (cell, [cell_to_tile(child) for child in cell_to_children(cell, resolution)])
+        for cell in cells
+    ]
+    inside = inside_tiles(
+        parts,
+        resolution,
+        [tile for _, tiles in children for tile in tiles if tile not in boundary],
+    )
+    return [
+        (
+            cell,
+            [tile_to_cell(tile) for tile in tiles if tile in boundary],
+            [tile_to_cell(tile) for tile in tiles if tile in inside],
+        )
+        for cell, tiles in children
+    ]
+
+
+def inside_tiles(parts, resolution, tiles):
+    """Select the tiles whose center is inside the polygons of geometries.
+
+    Returns
+    -------
+    set
+    """
+    if not tiles:
+        return set()
+
+    polygons = []
+    for part in parts:
+        if part["type"] == "Polygon":
+            polygons.append(part["coordinates"])
+        elif part["type"] == "MultiPolygon":
+            polygons += part["coordinates"]
+
+    z2 = 1 << resolution
+    rows = (min(tile[1] for tile in tiles), max(tile[1] for tile in tiles))
+    spans = {}
+    for polygon in polygons:
+        for y, start, stop in polygon_spans(polygon, resolution, rows=rows):
+            spans.setdefault(y, []).append((start, stop))
+
+    return set(
+        tile
+        for tile in tiles
+        if any(
+            stop - start >= z2 or (tile[0] - start) % z2 < stop - start
+            for start, stop in spans.get(tile[1], ())
+        )
+    )
@@ -0,0 +1,211 @@
+import json
+import math
+
+from .main import tile_to_cell
+from .tilecover import from_tile_hash, get_tiles, polygon_cover, tile_fractions
+from .utils import distinct
+
+POLYGON_TYPES = ("Polygon", "MultiPolygon")
+
+
+def update_cover(cells, previous_geometry, geometry, resolution):
+    """Compute the cells added and removed by an edit of a geometry.
+
+    For polygons with the same structure, only the tiles inside the
+    extent of the edited edges are recomputed. Other geometries fall
+    back to a full cover of the new geometry.
+
+    Parameters
+    ----------
+    cells : iterable of int
+        Cells covering the previous geometry. A set is used as is.
+    previous_geometry : str
+        Previous geometry as GeoJSON.
+    geometry : str
+        New geometry as GeoJSON.
+    resolution : int
+        The resolution of the cells.
+
+    Returns
+    -------
+    tuple (list, list)
+        Cells added to and removed from the cover.
+    """
+    if not isinstance(cells, (set, frozenset)):
+        cells = set(cells)
+
+    previous_geometry = json.loads(previous_geometry)
+    geometry = json.loads(geometry)
+    windows = changed_windows(previous_geometry, geometry, resolution)
+
+    if windows is False:
+        new_cells = [
+            tile_to_cell(tile) for tile in geometry_tiles(geometry, resolution)
+        ]
+        new_cells_set = set(new_cells)
+        added = [cell for cell in new_cells if cell not in cells]
+        removed = [cell for cell in cells if cell not in new_cells_set]
+        return added, removed
+
+    if windows is None:
+        return [], []
+
+    previous_cells = window_cells(previous_geometry, resolution, windows)
+    new_cells = window_cells(geometry, resolution, windows)
+    new_cells_set = set(new_cells)
+
+    added = [cell for cell in new_cells if cell not in cells]
+    removed = [
+        cell for cell in previous_cells if cell in cells and cell not in new_cells_set
+    ]
+    return added, removed
+
+
+def changed_windows(previous_geometry, geometry, resolution):
+    """Compute the tile extents of the edges that differ between two polygons.
+
+    The changed vertices are unwrapped one against the other as in
+    tile_fractions, so an extent crossing the antimeridian is split in two.
+
+    Returns
+    -------
+    list
+        Inclusive tile extents (xmin, ymin, xmax, ymax), padded by one tile.
+    None
+        If the geometries are equal.
+    False
+        If the geometries can not be compared ring by ring, a changed ring
+        goes around a pole, or the changed edges span more than half the
+        world.
+    """
+    if (
+        previous_geometry["type"] not in POLYGON_TYPES
+        or previous_geometry["type"] != geometry["type"]
+    ):
+        return False
+
+    previous_rings = polygon_rings(previous_geometry)
+    rings = polygon_rings(geometry)
+    if [len(ring) for ring in previous_rings] != [len(ring) for ring in rings]:
+        return False
+
+    points = []
+    for previous_polygon, polygon in zip(previous_rings, rings):
+        for previous_ring, ring in zip(previous_polygon, polygon):
+            changed = changed_points(previous_ring, ring)
+            if changed and (ring_turns(previous_ring) or ring_turns(ring)):
+                # Rings around a pole are not unwrapped by polygon_cover,
+                # and their fill changes outside the edited edges
+                return False
+            points += changed
+
+    if not points:
+        return None
+
+    fractions = tile_fractions(points, resolution)
+    z2 = 1 << resolution
+    xmin = int(math.floor(min(x for x, _ in fractions))) - 1
+    xmax = int(math.floor(max(x for x, _ in fractions))) + 1
+    if 2 * (xmax - xmin + 1) > z2:
+        return False
+    ymin = max(0, int(math.floor(min(y for _, y in fractions))) - 1)
+    ymax = min(z2 - 1, int(math.floor(max(y for _, y in fractions))) + 1)
+
+    # Wrap the unwrapped extent, split at the antimeridian
+    offset = xmin // z2 * z2
+    xmin -= offset
+    xmax -= offset
+    if xmax < z2:
+        return [(xmin, ymin, xmax, ymax)]
+    return [(xmin, ymin, z2 - 1, ymax), (0, ymin, xmax - z2, ymax)]
+
+
+def changed_points(previous_ring, ring):
+    """Return the vertices of the edges that differ between two closed rings.
+
+    The changed vertices are found by skipping the common prefix and suffix
+    of both rings, and the unchanged vertices at both ends of the changed
+    chain are included since their edges changed too.
+
+    Returns
+    -------
+    list
+    """
+    previous_ring = [tuple(point) for point in previous_ring[:-1]]
+    ring = [tuple(point) for point in ring[:-1]]
+    if previous_ring == ring:
+        return []
+
+    length = min(len(previous_ring), len(ring))
+    prefix = 0
+    while prefix < length and previous_ring[prefix] == ring[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < length - prefix and previous_ring[-1 - suffix] == ring[-1 - suffix]:
+        suffix += 1
+
+    points = []
+    for vertices in (previous_ring, ring):
+        if not vertices:
+            continue
+        stop = len(vertices) - suffix
+        points += vertices[prefix:stop]
+        points.append(vertices[(prefix - 1) % len(vertices)])
+        points.append(vertices[stop % len(vertices)])
+    return points
+
+
+def ring_turns(ring):
+    """Count the turns around a pole of a ring unwrapped as in tile_fractions.
+
+    Returns
+    -------
+    int
+    """
+    fractions = tile_fractions(ring, 0)
+    if not fractions:
+        return 0
+    return int(round(fractions[-1][0] - fractions[0][0]))
+
+
+def polygon_rings(geometry):
+    """Return the rings of each polygon of a Polygon or MultiPolygon.
+
+    Returns
+    -------
+    list
+    """
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    return geometry["coordinates"]
+
+
+def window_cells(geometry, resolution, windows):
+    """Compute the cells of a polygon cover inside tile extents.
+
+    Returns
+    -------
+    list
+    """
+    tiles_hashes = []
+    for polygon in polygon_rings(geometry):
+        for window in windows:
+            tiles_hashes += polygon_cover(polygon, resolution, window)
+    return [
+        tile_to_cell(from_tile_hash(tile_hash)) for tile_hash in distinct(tiles_hashes)
+    ]
+
+
+def geometry_tiles(geometry, resolution):
+    """Compute the tiles that fill a geometry, including collections.
+
+    Returns
+    -------
+    list
+    """
+    if geometry["type"] == "GeometryCollection":
+        tiles = []
+        for geom in geometry["geometries"]:
+            tiles += get_tiles(geom, resolution)
+        return distinct(tiles)
+    return get_tiles(geometry, resolution)
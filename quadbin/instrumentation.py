@@ -0,0 +1,118 @@
+# Opt-in profiling of the geometry covers. While no recorder is active the
+# instrumented functions only test once per call if the recorders of their
+# thread are empty.
+
+import threading
+import time
+from contextlib import contextmanager
+
+STAGES = ("parse", "simplify", "boundary", "fill", "dedupe", "convert")
+COUNTS = ("calls", "vertices", "boundary_tiles", "filled_cells", "duplicates", "cells")
+PEAKS = ("tiles_hashes", "cells")
+STATE = threading.local()
+
+timer = getattr(time, "perf_counter", time.time)
+
+
+@contextmanager
+def instrument(callback=None):
+    """Record the stages of the geometry covers while the context is active.
+
+    Every call of geometry_to_cells, and of the covers built on get_tiles,
+    made by the current thread adds to the statistics, so concurrent
+    requests served by other threads are not mixed in. Work sent to other
+    threads, such as the executor jobs of quadbin.aio, is not recorded.
+
+    Parameters
+    ----------
+    callback : callable, optional
+        Called with the statistics when the context exits, for example to
+        export them to a metrics system.
+
+    Yields
+    ------
+    dict
+        Statistics with the seconds spent in each stage in "timings", the
+        number of calls, vertices, boundary tiles, filled cells, duplicates
+        removed and cells returned in "counts", and the largest number of
+        tiles hashes and cells of a single cover in "peaks". The parse stage
+        includes the conversion of coordinates to arrays by the numba
+        backend.
+    """
+    stats = {
+        "timings": dict.fromkeys(STAGES, 0.0),
+        "counts": dict.fromkeys(COUNTS, 0),
+        "peaks": dict.fromkeys(PEAKS, 0),
+    }
+    recorders = STATE.__dict__.setdefault("recorders", [])
+    recorders.append(stats)
+    try:
+        yield stats
+    finally:
+        for i in range(len(recorders)):
+            if recorders[i] is stats:
+                del recorders[i]
+                break
+        if callback is not None:
+            callback(stats)
+
+
+def active_recorders():
+    """Return the statistics being recorded by the current thread.
+
+    Returns
+    -------
+    list
+    """
+    return STATE.__dict__.get("recorders", ())
+
+
+def record_stage(stage, start, **counts):
+    """Add the time since start to a stage, and counts, to the active recorders.
+
+    Returns
+    -------
+    float
+        The current time, to start the next stage.
+    """
+    now = timer()
+    record_time(stage, now - start, **counts)
+    return now
+
+
+def record_time(stage, seconds, **counts):
+    """Add seconds to a stage, and counts, to the active recorders."""
+    for stats in active_recorders():
+        stats["timings"][stage] += seconds
+    record_counts(**counts)
+
+
+def record_counts(**counts):
+    """Add counts to the active recorders."""
+    for stats in active_recorders():
+        for name, count in counts.items():
+            stats["counts"][name] += count
+
+
+def record_peak(name, size):
+    """Keep the largest size of an output in the active recorders."""
+    for stats in active_recorders():
+        stats["peaks"][name] = max(stats["peaks"][name], size)
+
+
+def geometry_vertices(geometry):
+    """Count the vertices of a GeoJSON geometry.
+
+    Returns
+    -------
+    int
+    """
+    coordinates = geometry["coordinates"]
+    geom_type = geometry["type"]
+    if geom_type == "Point":
+        return 1
+    if geom_type in ("MultiPoint", "LineString"):
+        return len(coordinates)
+    if geom_type in ("MultiLineString", "Polygon"):
+        return sum(len(line) for line in coordinates)
+    return sum(len(ring) for rings in coordinates for ring in rings)
@@ -0,0 +1,505 @@
+# Numba compiled backend of tilecover.get_tiles for lines and polygons. Numba is
+# an optional dependency (quadbin[numba]): tilecover loads this module on the
+# first cover and falls back to the pure Python functions if it is missing.
+#
+# The kernels follow the Python functions step by step over typed arrays, and
+# are cached on disk, so the compilation is only paid by the first process.
+# Call warm_up at startup to load or compile them before the first request.
+
+import math
+
+import numpy as np
+from numba import njit
+
+from .instrumentation import active_recorders, record_peak, record_time, timer
+
+
+def get_tiles(geometry, resolution, fill_rule="evenodd"):
+    """Compute the tiles that fill a line or polygon geometry.
+
+    Parameters
+    ----------
+    geometry : dict
+        Input geometry as GeoJSON, of type LineString, MultiLineString,
+        Polygon or MultiPolygon.
+    resolution : int
+        The resolution of the cells.
+    fill_rule : str, optional
+        "evenodd" or "nonzero" fill of polygons, by default "evenodd".
+
+    Returns
+    -------
+    list
+        Tiles intersecting the geometry, as tilecover.get_tiles.
+    None
+        If the geometry can not be covered by the kernels, such as
+        coordinates at the poles, so the pure Python functions are used.
+        Nothing is recorded by instrument then.
+    """
+    geom_type = geometry["type"]
+    coordinates = geometry["coordinates"]
+    if geom_type == "LineString":
+        parts = [[coordinates]]
+    elif geom_type == "MultiLineString":
+        parts = [[line] for line in coordinates]
+    elif geom_type == "Polygon":
+        parts = [coordinates]
+    elif geom_type == "MultiPolygon":
+        parts = coordinates
+    else:
+        return None
+
+    # Stages are kept until the cover succeeds, so a fallback to the pure
+    # Python functions is not recorded twice
+    stages = [] if active_recorders() else None
+    tiles_hashes = []
+    for rings in parts:
+        start = timer()
+        arrays = coordinate_arrays(rings)
+        if arrays is None:
+            return None
+        if stages is not None:
+            stages.append(("parse", timer() - start, {}))
+        longitudes, latitudes, offsets = arrays
+        if geom_type in ("Polygon", "MultiPolygon"):
+            hashes = polygon_cover(
+                longitudes, latitudes, offsets, resolution, fill_rule, stages
+            )
+        else:
+            hashes = line_cover(longitudes, latitudes, resolution, stages)
+        if hashes is None:
+            return None
+        tiles_hashes.append(hashes)
+
+    if not tiles_hashes:
+        return []
+    start = timer()
+    hashes = np.concatenate(tiles_hashes)
+    tiles = hashes_to_tiles(hashes, resolution)
+    if stages is not None:
+        stages.append(
+            ("dedupe", timer() - start, {"duplicates": len(hashes) - len(tiles)})
+        )
+        for stage, seconds, counts in stages:
+            record_time(stage, seconds, **counts)
+        record_peak("tiles_hashes", len(hashes))
+    return tiles
+
+
+def warm_up():
+    """Load or compile the kernels, so the first cover does not pay for it."""
+    line = [[0.0, 0.0], [1.0, 1.0]]
+    get_tiles({"type": "LineString", "coordinates": line}, 1)
+    get_tiles({"type": "Polygon", "coordinates": [line + [[1.0, 0.0], line[0]]]}, 1)
+
+
+def coordinate_arrays(rings):
+    """Convert the coordinates of rings into typed arrays.
+
+    Returns
+    -------
+    tuple (numpy.ndarray, numpy.ndarray, numpy.ndarray)
+        Longitudes, latitudes and the offsets where every ring starts,
+        with the total length as last offset.
+    None
+        If the coordinates are not finite or lie at the poles.
+    """
+    try:
+        arrays = [
+            np.asarray(ring, dtype=np.float64).reshape(len(ring), -1) for ring in rings
+        ]
+    except ValueError:
+        return None
+    if any(array.shape[1] < 2 for array in arrays if len(array)):
+        return None
+
+    offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+    np.cumsum([len(array) for array in arrays], out=offsets[1:])
+    if offsets[-1] == 0:
+        return np.empty(0), np.empty(0), offsets
+
+    coordinates = np.concatenate([array[:, :2] for array in arrays if len(array)])
+    longitudes = np.ascontiguousarray(coordinates[:, 0])
+    latitudes = np.ascontiguousarray(coordinates[:, 1])
+
+    # Python raises for these, so they are left to it
+    if not np.isfinite(coordinates).all():
+        return None
+    if (np.abs(np.sin(latitudes * math.pi / 180.0)) == 1.0).any():
+        return None
+    return longitudes, latitudes, offsets
+
+
+def line_cover(longitudes, latitudes, resolution, stages=None):
+    """Compute the tiles hashes that cover a line.
+
+    Parameters
+    ----------
+    stages : list, optional
+        If given, the boundary stage is appended as (stage, seconds, counts).
+
+    Returns
+    -------
+    numpy.ndarray
+        int64 hashes, with duplicates.
+    None
+        If the traversal overflowed its bound.
+    """
+    start = timer()
+    z = np.int64(resolution)
+    fx, fy = tile_fractions(longitudes, latitudes, z, np.nan, True)
+    hashes = np.empty(hashes_capacity(fx, fy), dtype=np.int64)
+    ring = np.empty((1, 2), dtype=np.int64)
+    count, _ = traverse(fx, fy, z, hashes, 0, ring, False)
+    if count < 0:
+        return None
+    if stages is not None:
+        stages.append(("boundary", timer() - start, {"boundary_tiles": count}))
+    return hashes[:count]
+
+
+def polygon_cover(
+    longitudes, latitudes, offsets, resolution, fill_rule="evenodd", stages=None
+):
+    """Compute the tiles hashes that cover a polygon.
+
+    Parameters
+    ----------
+    stages : list, optional
+        If given, the boundary and fill stages are appended as
+        (stage, seconds, counts).
+
+    Returns
+    -------
+    numpy.ndarray
+        int64 hashes, with duplicates.
+    None
+        If the traversal overflowed its bound.
+    """
+    if offsets[-1] == 0:
+        return np.empty(0, dtype=np.int64)
+
+    start = timer()
+    z = np.int64(resolution)
+    fx, fy, capacity = project_rings(longitudes, latitudes, offsets, z)
+    boundary, count = trace_rings(fx, fy, offsets, z, capacity)
+    if count < 0:
+        return None
+    if stages is not None:
+        now = timer()
+        stages.append(("boundary", now - start, {"boundary_tiles": count}))
+        start = now
+
+    spans = polygon_spans(fx, fy, offsets, np.int64(1) << z, fill_rule == "nonzero")
+    fill = span_tiles(spans, z)
+    if stages is not None:
+        stages.append(("fill", timer() - start, {"filled_cells": len(fill)}))
+    return np.concatenate((boundary[:count], fill))
+
+
+def hashes_to_tiles(hashes, resolution):
+    """Convert tile hashes of a resolution into distinct tiles.
+
+    Returns
+    -------
+    list
+        Tuples (x, y, z).
+    """
+    hashes = np.unique(hashes)
+    dim = 2 << resolution
+    xy = (hashes - resolution) // 32
+    x = xy % dim
+    y = (xy // dim) % dim
+    return list(zip(x.tolist(), y.tolist(), [resolution] * len(hashes)))
+
+
+@njit(cache=True)
+def tile_hash(x, y, z):
+    """Compute a hash from the tile, as tilecover.to_tile_hash."""
+    z2 = np.int64(1) << z
+    return ((2 * z2 * y + x % z2) * 32) + z
+
+
+@njit(cache=True)
+def tile_fractions(longitudes, latitudes, z, origin, unwrap):
+    """Project coordinates into tile fractions, as tilecover.tile_fractions.
+
+    The origin is NaN if the first vertex is not unwrapped.
+    """
+    z2 = float(np.int64(1) << z)
+    n = len(longitudes)
+    fx = np.empty(n)
+    fy = np.empty(n)
+    reference = origin
+    for i in range(n):
+        sinlat = math.sin(latitudes[i] * math.pi / 180.0)
+        x = z2 * (longitudes[i] / 360.0 + 0.5)
+        y = z2 * (0.5 - 0.25 * math.log((1 + sinlat) / (1 - sinlat)) / math.pi)
+        x = x % z2
+        if x < 0:
+            x += z2
+        if unwrap and not math.isnan(reference):
+            x += z2 * math.floor((reference - x) / z2 + 0.5)
+        fx[i] = x
+        fy[i] = y
+        reference = x
+    return fx, fy
+
+
+@njit(cache=True)
+def hashes_capacity(fx, fy):
+    """Bound the number of hashes of the traversal of a line."""
+    capacity = 0
+    for i in range(len(fx) - 1):
+        capacity += abs(math.floor(fx[i + 1]) - math.floor(fx[i]))
+        capacity += abs(math.floor(fy[i + 1]) - math.floor(fy[i])) + 3
+    return int(capacity)
+
+
+@njit(cache=True)
+def traverse(fx, fy, z, hashes, count, ring, with_ring):
+    """Traverse the tiles of a line, as tilecover.line_cover.
+
+    The hashes are written from count on, and the ring tiles are written
+    if with_ring is True.
+
+    Returns the number of hashes and of ring tiles, or -1 hashes if the
+    arrays are too small.
+    """
+    ring_count = 0
+    has_prev = False
+    prev_x = 0
+    prev_y = 0
+    y = 0
+    for i in range(len(fx) - 1):
+        x0 = fx[i]
+        y0 = fy[i]
+        dx = fx[i + 1] - x0
+        dy = fy[i + 1] - y0
+
+        if dy == 0 and dx == 0:
+            continue
+
+        sx = 1 if dx > 0 else -1
+        sy = 1 if dy > 0 else -1
+        x = np.int64(math.floor(x0))
+        y = np.int64(math.floor(y0))
+        t_max_x = np.inf if dx == 0 else abs(((1 if dx > 0 else 0) + x - x0) / dx)
+        t_max_y = np.inf if dy == 0 else abs(((1 if dy > 0 else 0) + y - y0) / dy)
+        tdx = np.inf if dx == 0 else abs(sx / dx)
+        tdy = np.inf if dy == 0 else abs(sy / dy)
+
+        if not has_prev or x != prev_x or y != prev_y:
+            if count >= len(hashes) or ring_count >= len(ring):
+                return -1, ring_count
+            hashes[count] = tile_hash(x, y, z)
+            count += 1
+            if with_ring and (not has_prev or y != prev_y):
+                ring[ring_count, 0] = x
+                ring[ring_count, 1] = y
+                ring_count += 1
+            prev_x = x
+            prev_y = y
+            has_prev = True
+
+        while t_max_x < 1 or t_max_y < 1:
+            if t_max_x < t_max_y:
+                t_max_x += tdx
+                x += sx
+            else:
+                t_max_y += tdy
+                y += sy
+
+            if count >= len(hashes) or ring_count >= len(ring):
+                return -1, ring_count
+            hashes[count] = tile_hash(x, y, z)
+            count += 1
+            if with_ring and y != prev_y:
+                ring[ring_count, 0] = x
+                ring[ring_count, 1] = y
+                ring_count += 1
+            prev_x = x
+            prev_y = y
+
+    if with_ring and ring_count > 0 and y == ring[0, 1]:
+        ring_count -= 1
+    return count, ring_count
+
+
+@njit(cache=True)
+def project_rings(longitudes, latitudes, offsets, z):
+    """Project the rings of a polygon, unwrapped against its first vertex.
+
+    Returns the tile fractions and the bound of the number of boundary
+    tiles.
+    """
+    z2 = np.int64(1) << z
+    origin, _ = tile_fractions(longitudes[:1], latitudes[:1], z, np.nan, False)
+    fx = np.empty(len(longitudes))
+    fy = np.empty(len(longitudes))
+    capacity = 0
+    for r in range(len(offsets) - 1):
+        start = offsets[r]
+        stop = offsets[r + 1]
+        rx, ry = tile_fractions(
+            longitudes[start:stop], latitudes[start:stop], z, origin[0], True
+        )
+        if stop - start > 1 and abs(rx[-1] - rx[0]) >= z2 / 2:
+            # Rings around a pole do not close once unwrapped
+            rx, ry = tile_fractions(
+                longitudes[start:stop], latitudes[start:stop], z, np.nan, False
+            )
+        fx[start:stop] = rx
+        fy[start:stop] = ry
+        capacity += hashes_capacity(rx, ry)
+    return fx, fy, capacity
+
+
+@njit(cache=True)
+def trace_rings(fx, fy, offsets, z, capacity):
+    """Traverse the boundary tiles of the rings of a polygon.
+
+    Returns the hashes and their number, or -1 if the traversal
+    overflowed its bound.
+    """
+    boundary = np.empty(capacity, dtype=np.int64)
+    ring = np.empty((1, 2), dtype=np.int64)
+    count = 0
+    for r in range(len(offsets) - 1):
+        start = offsets[r]
+        stop = offsets[r + 1]
+        count, _ = traverse(
+            fx[start:stop], fy[start:stop], z, boundary, count, ring, False
+        )
+        if count < 0:
+            break
+    return boundary, count
+
+
+@njit(cache=True)
+def span_tiles(spans, z):
+    """Compute the hashes of the tiles of (y, start, stop) spans."""
+    fill = 0
+    for i in range(len(spans)):
+        fill += spans[i, 2] - spans[i, 1]
+    hashes = np.empty(fill, dtype=np.int64)
+    count = 0
+    for i in range(len(spans)):
+        for x in range(spans[i, 1], spans[i, 2]):
+            hashes[count] = tile_hash(x, spans[i, 0], z)
+            count += 1
+    return hashes
+
+
+@njit(cache=True)
+def polygon_spans(fx, fy, offsets, z2, nonzero):
+    """Compute the spans of tiles whose center is inside a polygon.
+
+    The rows are scanned with an active edge table, as
+    tilecover.polygon_spans. Spans wider than the world are cut to z2.
+
+    Returns an array of (y, start, stop) rows.
+    """
+    # Edge table of first row, last row, x, y, dx/dy and winding
+    n = len(fx)
+    first = np.empty(n, dtype=np.int64)
+    last = np.empty(n, dtype=np.int64)
+    ex = np.empty(n)
+    ey = np.empty(n)
+    slope = np.empty(n)
+    winding = np.empty(n, dtype=np.int64)
+    n_edges = 0
+    for r in range(len(offsets) - 1):
+        start = offsets[r]
+        stop = offsets[r + 1]
+        for i in range(start, stop):
+            j = i + 1 if i + 1 < stop else start
+            x0 = fx[i]
+            y0 = fy[i]
+            x1 = fx[j]
+            y1 = fy[j]
+            if y0 == y1:
+                continue
+            w = 1 if y1 > y0 else -1
+            if w < 0:
+                x0, y0, x1, y1 = x1, y1, x0, y0
+            # Rows whose center line y + 0.5 is in [y0, y1)
+            row_first = max(np.int64(math.ceil(y0 - 0.5)), 0)
+            row_last = min(np.int64(math.ceil(y1 - 0.5)) - 1, z2 - 1)
+            if row_first <= row_last:
+                first[n_edges] = row_first
+                last[n_edges] = row_last
+                ex[n_edges] = x0
+                ey[n_edges] = y0
+                slope[n_edges] = (x1 - x0) / (y1 - y0)
+                winding[n_edges] = w
+                n_edges += 1
+    order = np.argsort(first[:n_edges], kind="mergesort")
+
+    spans = np.empty((16, 3), dtype=np.int64)
+    n_spans = 0
+    active = np.empty(n_edges, dtype=np.int64)
+    n_active = 0
+    crossings = np.empty(n_edges)
+    directions = np.empty(n_edges, dtype=np.int64)
+    i = 0
+    y = np.int64(0)
+    while i < n_edges or n_active > 0:
+        if n_active == 0:
+            y = max(y, first[order[i]])
+        while i < n_edges and first[order[i]] <= y:
+            active[n_active] = order[i]
+            n_active += 1
+            i += 1
+
+        # Crossings of the center line sorted by x and direction
+        center = y + 0.5
+        for a in range(n_active):
+            e = active[a]
+            x = ex[e] + (center - ey[e]) * slope[e]
+            w = winding[e]
+            b = a
+            while b > 0 and (
+                crossings[b - 1] > x
+                or (crossings[b - 1] == x and directions[b - 1] > w)
+            ):
+                crossings[b] = crossings[b - 1]
+                directions[b] = directions[b - 1]
+                b -= 1
+            crossings[b] = x
+            directions[b] = w
+
+        # Pair the crossings with the fill rule
+        total = 0
+        span_start = 0.0
+        for a in range(n_active):
+            if nonzero:
+                if total == 0:
+                    span_start = crossings[a]
+                total += directions[a]
+                inside_end = total == 0
+            else:
+                if a % 2 == 0:
+                    span_start = crossings[a]
+                inside_end = a % 2 == 1
+            if inside_end:
+                start = np.int64(math.ceil(span_start - 0.5))
+                stop = min(np.int64(math.ceil(crossings[a] - 0.5)), start + z2)
+                if start < stop:
+                    if n_spans == len(spans):
+                        grown = np.empty((2 * len(spans), 3), dtype=np.int64)
+                        grown[:n_spans] = spans
+                        spans = grown
+                    spans[n_spans, 0] = y
+                    spans[n_spans, 1] = start
+                    spans[n_spans, 2] = stop
+                    n_spans += 1
+
+        y += 1
+        kept = 0
+        for a in range(n_active):
+            if last[active[a]] >= y:
+                active[kept] = active[a]
+                kept += 1
+        n_active = kept
+    return spans[:n_spans]
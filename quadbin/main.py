@@ -1,6 +1,12 @@
 import json
 
-from .tilecover import get_tiles
+try:
+    from . import _speedups
+except ImportError:
+    _speedups = None
+
+from .instrumentation import active_recorders, record_peak, record_stage, timer
+from .tilecover import cover_size, get_tiles
 from .utils import (
     DIRECTIONS,
     clip_latitude,
@@ -8,6 +14,8 @@ from .utils import (
     distinct,
     point_to_tile,
     tile_k_ring,
+    tile_offset,
+    tile_path,
     tile_sibling,
     tile_to_longitude,
     tile_to_latitude,
@@ -373,6 +381,62 @@ def k_ring_distances(origin, k):
     ]
 
 
+def cell_distance(origin, target):
+    """Compute the grid distance between two cells.
+
+    The distance is the smallest k such that the target is in the k-ring
+    of the origin.
+
+    Parameters
+    ----------
+    origin : int
+    target : int
+
+    Returns
+    -------
+    int
+
+    Raises
+    ------
+    ValueError
+        If the cells have different resolutions.
+    """
+    origin_tile = cell_to_tile(origin)
+    target_tile = cell_to_tile(target)
+    if origin_tile[2] != target_tile[2]:
+        raise ValueError("Invalid cells: should have the same resolution")
+
+    dx, dy = tile_offset(origin_tile, target_tile)
+    return max(abs(dx), abs(dy))
+
+
+def grid_path(origin, target):
+    """Compute the cells crossed by the line between the centers of two cells.
+
+    Parameters
+    ----------
+    origin : int
+    target : int
+
+    Returns
+    -------
+    list
+        Cells from the origin to the target, each one sharing an edge
+        with the previous one.
+
+    Raises
+    ------
+    ValueError
+        If the cells have different resolutions.
+    """
+    origin_tile = cell_to_tile(origin)
+    target_tile = cell_to_tile(target)
+    if origin_tile[2] != target_tile[2]:
+        raise ValueError("Invalid cells: should have the same resolution")
+
+    return [tile_to_cell(tile) for tile in tile_path(origin_tile, target_tile)]
+
+
 def cell_sibling(cell, direction):
     """Compute the sibling cell in a specific direction.
 
@@ -472,7 +536,148 @@ def cell_to_children(cell, children_resolution):
     return children
 
 
-def geometry_to_cells(geometry, resolution):
+def cell_to_key_range(cell, resolution):
+    """Compute the range of keys of the descendants of a cell at a resolution.
+
+    Cells of the same resolution sort along the Z-order curve, so the
+    descendants of a cell are all the cells between the first and the
+    last one, and a sorted key-value store can scan them as a range.
+
+    Parameters
+    ----------
+    cell : int
+    resolution : int
+        Resolution of the stored cells, at least the one of the cell.
+
+    Returns
+    -------
+    tuple (min_key, max_key)
+        First and last descendant cells, both included.
+
+    Raises
+    ------
+    ValueError
+        If the resolution is not valid.
+    """
+    if resolution < get_resolution(cell) or resolution > 26:
+        raise ValueError("Invalid resolution")
+
+    max_key = (cell & ~(0x1F << 52)) | (resolution << 52)
+    levels = (FOOTER >> (get_resolution(cell) << 1)) & ~(FOOTER >> (resolution << 1))
+    return (max_key & ~levels, max_key)
+
+
+def cells_to_key_ranges(cells, resolution):
+    """Compute the merged ranges of keys of the descendants of cells.
+
+    Parameters
+    ----------
+    cells : iterable of int
+        Cells of any resolution up to the one of the stored cells.
+    resolution : int
+        Resolution of the stored cells.
+
+    Returns
+    -------
+    list
+        Sorted tuples (min_key, max_key) of disjoint ranges, both keys
+        included, that are not contiguous with each other.
+
+    Raises
+    ------
+    ValueError
+        If the resolution is not valid.
+    """
+    if resolution < 0 or resolution > 26:
+        raise ValueError("Invalid resolution")
+
+    step = 1 << (52 - (resolution << 1))
+    ranges = []
+    for min_key, max_key in sorted(
+        cell_to_key_range(cell, resolution) for cell in cells
+    ):
+        if ranges and min_key <= ranges[-1][1] + step:
+            ranges[-1] = (ranges[-1][0], max(ranges[-1][1], max_key))
+        else:
+            ranges.append((min_key, max_key))
+    return ranges
+
+
+def cell_to_hilbert(cell):
+    """Compute the Hilbert curve key of a cell.
+
+    The key is the position of the first descendant of the cell along the
+    Hilbert curve of resolution 26, followed by 5 bits with the resolution.
+    Sorting by the key keeps neighbor cells closer than the Z-order of the
+    cells, and every parent sorts right before its descendants.
+
+    Parameters
+    ----------
+    cell : int
+
+    Returns
+    -------
+    int
+    """
+    x, y, z = cell_to_tile(cell)
+    n = 1 << z
+    position = 0
+    s = n >> 1
+    while s:
+        rx = 1 if x & s else 0
+        ry = 1 if y & s else 0
+        position += s * s * ((3 * rx) ^ ry)
+        if ry == 0:
+            if rx == 1:
+                x = n - 1 - x
+                y = n - 1 - y
+            x, y = y, x
+        s >>= 1
+
+    return (position << (57 - (z << 1))) | z
+
+
+def hilbert_to_cell(key):
+    """Convert a Hilbert curve key into a cell.
+
+    Parameters
+    ----------
+    key : int
+        Key from cell_to_hilbert.
+
+    Returns
+    -------
+    int
+
+    Raises
+    ------
+    ValueError
+        If the key is not valid.
+    """
+    z = key & 0x1F
+    if key < 0 or z > 26 or key >> 57 or (key >> 5) & ((1 << (52 - (z << 1))) - 1):
+        raise ValueError("Invalid Hilbert key")
+
+    position = key >> (57 - (z << 1))
+    x = y = 0
+    s = 1
+    while s < 1 << z:
+        rx = 1 & (position >> 1)
+        ry = 1 & (position ^ rx)
+        if ry == 0:
+            if rx == 1:
+                x = s - 1 - x
+                y = s - 1 - y
+            x, y = y, x
+        x += s * rx
+        y += s * ry
+        position >>= 2
+        s <<= 1
+
+    return tile_to_cell((x, y, z))
+
+
+def geometry_to_cells(geometry, resolution, simplify=None, fill_rule="evenodd"):
     """Compute the cells that fill an input geometry.
 
     Parameters
@@ -481,23 +686,170 @@ def geometry_to_cells(geometry, resolution):
         Input geometry as GeoJSON.
     resolution : int
         The resolution of the cells.
+    simplify : str, optional
+        Simplify lines and rings to the resolution before the cover:
+        "exact" keeps the same cells and "superset" may add neighbors of
+        the boundary cells. By default None, without simplification.
+    fill_rule : str, optional
+        "evenodd" or "nonzero" fill of polygons whose rings overlap, by
+        default "evenodd".
 
     Returns
     -------
     list
         Cells intersecting the geometry.
     """
+    recording = bool(active_recorders())
+    if recording:
+        start = timer()
+
     tiles = []
     geometry = json.loads(geometry)
+    if recording:
+        record_stage("parse", start, calls=1)
 
     if geometry["type"] == "GeometryCollection":
         for geom in geometry["geometries"]:
-            tiles += [tile for tile in get_tiles(geom, resolution)]
+            tiles += [tile for tile in get_tiles(geom, resolution, simplify, fill_rule)]
+        if recording:
+            start = timer()
+        size = len(tiles)
         tiles = distinct(tiles)
+        if recording:
+            record_stage("dedupe", start, duplicates=size - len(tiles))
     else:
-        tiles = [tile for tile in get_tiles(geometry, resolution)]
+        tiles = [tile for tile in get_tiles(geometry, resolution, simplify, fill_rule)]
+
+    if not recording:
+        return [tile_to_cell(tile) for tile in tiles]
+
+    start = timer()
+    cells = [tile_to_cell(tile) for tile in tiles]
+    record_stage("convert", start, cells=len(cells))
+    record_peak("cells", len(cells))
+    return cells
+
+
+def estimate_cover_size(geometry, resolution, fill_rule="evenodd"):
+    """Count the cells that fill an input geometry without computing them.
+
+    The interior of polygons is counted from the spans of tiles of each
+    row, so the cost grows with the perimeter and the height of the
+    geometry instead of the number of cells. The count is exact.
+
+    Parameters
+    ----------
+    geometry : str
+        Input geometry as GeoJSON.
+    resolution : int
+        The resolution of the cells.
+    fill_rule : str, optional
+        "evenodd" or "nonzero" fill of polygons, by default "evenodd".
+
+    Returns
+    -------
+    int
+        Number of cells returned by geometry_to_cells.
+    """
+    geometry = json.loads(geometry)
+    if geometry["type"] == "GeometryCollection":
+        return cover_size(geometry["geometries"], resolution, fill_rule)
+    return cover_size([geometry], resolution, fill_rule)
+
+
+def bbox_to_cells(xmin, ymin, xmax, ymax, resolution):
+    """Compute the cells that intersect a bounding box.
+
+    Parameters
+    ----------
+    xmin : float
+        Western longitude in decimal degrees. A box with xmin greater
+        than xmax crosses the antimeridian.
+    ymin : float
+        Southern latitude in decimal degrees.
+    xmax : float
+        Eastern longitude in decimal degrees.
+    ymax : float
+        Northern latitude in decimal degrees.
+    resolution : int
+        The resolution of the cells.
+
+    Returns
+    -------
+    list
+        Cells intersecting the bounding box, row by row from the north.
+
+    Raises
+    ------
+    ValueError
+        If the resolution or the bounding box are not valid.
+    """
+    return [
+        tile_to_cell((x, y, resolution))
+        for y, x_start, x_stop in bbox_to_rows(xmin, ymin, xmax, ymax, resolution)
+        for x in range(x_start, x_stop)
+    ]
+
+
+def bbox_to_rows(xmin, ymin, xmax, ymax, resolution):
+    """Compute the rows of tiles that intersect a bounding box.
 
-    return [tile_to_cell(tile) for tile in tiles]
+    Rows crossing the antimeridian are split into two ranges.
+
+    Parameters
+    ----------
+    xmin : float
+        Western longitude in decimal degrees. A box with xmin greater
+        than xmax crosses the antimeridian.
+    ymin : float
+        Southern latitude in decimal degrees.
+    xmax : float
+        Eastern longitude in decimal degrees.
+    ymax : float
+        Northern latitude in decimal degrees.
+    resolution : int
+        The resolution of the cells.
+
+    Returns
+    -------
+    list
+        Tuples (y, x_start, x_stop) with the tiles from x_start to x_stop,
+        excluded, in the row y. Their cells are tile_to_cell((x, y, resolution)).
+
+    Raises
+    ------
+    ValueError
+        If the resolution or the bounding box are not valid.
+    """
+    if resolution < 0 or resolution > 26:
+        raise ValueError("Invalid resolution: should be between 0 and 26")
+    if ymin > ymax:
+        raise ValueError("Invalid bounding box: ymin should not be greater than ymax")
+
+    z2 = 1 << resolution
+    west, north, _ = point_to_tile(xmin, clip_latitude(ymax), resolution)
+    east, south, _ = point_to_tile(xmax, clip_latitude(ymin), resolution)
+
+    # Number of columns from the extent in degrees, as tiles wrap around
+    extent = xmax - xmin if xmax >= xmin else xmax - xmin + 360
+    if extent >= 360:
+        columns = z2
+    else:
+        columns = (east - west) % z2 + 1
+        if columns == 1 and extent * z2 > 360:
+            columns = z2
+
+    if columns == z2:
+        x_ranges = [(0, z2)]
+    elif west + columns <= z2:
+        x_ranges = [(west, west + columns)]
+    else:
+        x_ranges = [(west, z2), (0, west + columns - z2)]
+    return [
+        (y, x_start, x_stop)
+        for y in range(max(north, 0), min(south, z2 - 1) + 1)
+        for x_start, x_stop in x_ranges
+    ]
 
 
 def cell_area(cell):
@@ -514,3 +866,21 @@ def cell_area(cell):
     float
     """
     return tile_area(cell_to_tile(cell))
+
+
+# The compiled extension, if built, replaces the hot functions above. The pure
+# Python functions remain the fallback and the reference implementation.
+PYTHON_FUNCTIONS = {
+    "cell_to_tile": cell_to_tile,
+    "tile_to_cell": tile_to_cell,
+    "point_to_cell": point_to_cell,
+    "cell_to_parent": cell_to_parent,
+    "cell_to_children": cell_to_children,
+}
+
+if _speedups is not None:
+    cell_to_tile = _speedups.cell_to_tile
+    tile_to_cell = _speedups.tile_to_cell
+    point_to_cell = _speedups.point_to_cell
+    cell_to_parent = _speedups.cell_to_parent
+    cell_to_children = _speedups.cell_to_children
@@ -0,0 +1,240 @@
+import numbers
+import struct
+
+from .aggregation import AGGREGATIONS, accumulate, finalize_groups
+from .main import cell_to_tile
+
+MVT_VERSION = 2
+MVT_POLYGON = 3
+
+MOVE_TO = 1
+LINE_TO = 2
+CLOSE_PATH = 7
+
+WIRE_VARINT = 0
+WIRE_64BIT = 1
+WIRE_LENGTH = 2
+
+SINT64_MIN = -(1 << 63)
+SINT64_MAX = (1 << 63) - 1
+
+
+def cells_to_mvt(cells, values, tile, extent=4096, layer="cells", agg="sum"):
+    """Encode the cells that intersect a tile as a Mapbox Vector Tile.
+
+    Since cells are Web Mercator tiles, their geometry inside the tile is
+    computed with integer arithmetic from the tile coordinates. Cells
+    coarser than the tile are clipped to it, and cells smaller than one
+    unit of the extent are grouped into that unit, aggregating their values.
+
+    Parameters
+    ----------
+    cells : iterable of int
+    values : iterable, optional
+        Value of each cell, stored as the "value" property. None to skip it.
+        Integers are stored as sint64 and other real numbers as doubles.
+    tile : tuple (x, y, z)
+        The tile to encode.
+    extent : int, optional
+        Size of the tile in integer units, by default 4096.
+    layer : str, optional
+        Name of the layer, by default "cells".
+    agg : str, optional
+        Aggregation of grouped cells: "count", "sum", "mean", "min" or "max",
+        by default "sum".
+
+    Returns
+    -------
+    bytes
+        Tile encoded as a protocol buffer.
+
+    Raises
+    ------
+    ValueError
+        If the extent, the aggregation, the number of values or an integer
+        value are not valid.
+    """
+    if extent <= 0:
+        raise ValueError("Invalid extent: should be positive")
+    if agg not in AGGREGATIONS:
+        raise ValueError("Invalid aggregation: should be count, sum, mean, min or max")
+
+    cells = list(cells)
+    if values is None:
+        cell_values = [None] * len(cells)
+    else:
+        cell_values = list(values)
+        if len(cell_values) != len(cells):
+            raise ValueError("Invalid values: should have one value per cell")
+
+    tx, ty, tz = tile
+    groups = {}
+    ids = {}
+    for cell, value in zip(cells, cell_values):
+        rectangle = cell_rectangle(cell_to_tile(cell), tx, ty, tz, extent)
+        if rectangle is None:
+            continue
+        # Only features of a single cell keep the cell as their id
+        ids[rectangle] = cell if rectangle not in ids else None
+        if values is not None:
+            accumulate(groups, rectangle, value, agg)
+
+    if values is None:
+        rectangles, rectangle_values = sorted(ids), None
+    else:
+        rectangles, rectangle_values = finalize_groups(groups, agg)
+
+    return encode_tile(layer, extent, rectangles, rectangle_values, ids)
+
+
+def cell_rectangle(cell_tile, tx, ty, tz, extent):
+    """Compute the rectangle of a cell in the integer space of a tile.
+
+    Returns
+    -------
+    tuple (left, top, right, bottom)
+    None
+        If the cell does not intersect the tile.
+    """
+    cx, cy, cz = cell_tile
+
+    if cz <= tz:
+        shift = tz - cz
+        if (tx >> shift, ty >> shift) != (cx, cy):
+            return None
+        return (0, 0, extent, extent)
+
+    shift = cz - tz
+    if (cx >> shift, cy >> shift) != (tx, ty):
+        return None
+
+    x = cx - (tx << shift)
+    y = cy - (ty << shift)
+    left = (x * extent) >> shift
+    top = (y * extent) >> shift
+    right = max(((x + 1) * extent) >> shift, left + 1)
+    bottom = max(((y + 1) * extent) >> shift, top + 1)
+    return (left, top, right, bottom)
+
+
+def encode_tile(name, extent, rectangles, values, ids):
+    """Encode rectangles as the polygon features of a single layer tile.
+
+    Returns
+    -------
+    bytes
+    """
+    layer = [
+        encode_key(15, WIRE_VARINT) + encode_varint(MVT_VERSION),
+        encode_bytes(1, name.encode("utf-8")),
+    ]
+
+    value_indexes = {}
+    encoded_values = []
+    for i, rectangle in enumerate(rectangles):
+        feature = []
+        if ids[rectangle] is not None:
+            feature.append(encode_key(1, WIRE_VARINT) + encode_varint(ids[rectangle]))
+        if values is not None:
+            value = values[i]
+            key = (type(value), value)
+            if key not in value_indexes:
+                value_indexes[key] = len(encoded_values)
+                encoded_values.append(encode_value(value))
+            feature.append(encode_packed(2, [0, value_indexes[key]]))
+        feature.append(encode_key(3, WIRE_VARINT) + encode_varint(MVT_POLYGON))
+        feature.append(encode_packed(4, rectangle_geometry(rectangle)))
+        layer.append(encode_bytes(2, b"".join(feature)))
+
+    if values is not None:
+        layer.append(encode_bytes(3, b"value"))
+    for encoded_value in encoded_values:
+        layer.append(encode_bytes(4, encoded_value))
+    layer.append(encode_key(5, WIRE_VARINT) + encode_varint(extent))
+
+    return encode_bytes(3, b"".join(layer))
+
+
+def rectangle_geometry(rectangle):
+    """Encode a rectangle as the clockwise exterior ring of a polygon.
+
+    Returns
+    -------
+    list
+        Commands and zigzag encoded parameters.
+    """
+    left, top, right, bottom = rectangle
+    width = right - left
+    height = bottom - top
+    return [
+        command(MOVE_TO, 1),
+        zigzag(left),
+        zigzag(top),
+        command(LINE_TO, 3),
+        zigzag(width),
+        0,
+        0,
+        zigzag(height),
+        zigzag(-width),
+        0,
+        command(CLOSE_PATH, 1),
+    ]
+
+
+def encode_value(value):
+    """Encode a property value message.
+
+    Returns
+    -------
+    bytes
+
+    Raises
+    ------
+    ValueError
+        If an integer does not fit in a sint64.
+    """
+    if isinstance(value, bool):
+        return encode_key(7, WIRE_VARINT) + encode_varint(int(value))
+    if isinstance(value, numbers.Integral):
+        value = int(value)
+        if value < SINT64_MIN or value > SINT64_MAX:
+            raise ValueError("Invalid value: integers should fit in a sint64")
+        return encode_key(6, WIRE_VARINT) + encode_varint(zigzag(value))
+    if isinstance(value, numbers.Real):
+        return encode_key(3, WIRE_64BIT) + struct.pack("<d", float(value))
+    return encode_bytes(1, str(value).encode("utf-8"))
+
+
+def command(command_id, count):
+    """Compute a geometry command integer."""
+    return (command_id & 0x7) | (count << 3)
+
+
+def zigzag(value):
+    """Zigzag encode a signed integer."""
+    return value << 1 if value >= 0 else ((-value) << 1) - 1
+
+
+def encode_key(field, wire_type):
+    """Encode the key of a protocol buffer field."""
+    return encode_varint((field << 3) | wire_type)
+
+
+def encode_varint(value):
+    """Encode an unsigned integer as a protocol buffer varint."""
+    data = bytearray()
+    while value > 0x7F:
+        data.append((value & 0x7F) | 0x80)
+        value >>= 7
+    data.append(value)
+    return bytes(data)
+
+
+def encode_bytes(field, data):
+    """Encode a length delimited protocol buffer field."""
+    return encode_key(field, WIRE_LENGTH) + encode_varint(len(data)) + data
+
+
+def encode_packed(field, integers):
+    """Encode a packed repeated varint protocol buffer field."""
+    return encode_bytes(field, b"".join(encode_varint(i) for i in integers))
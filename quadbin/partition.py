@@ -0,0 +1,121 @@
+# Load balanced partitions of cells for distributed jobs. NumPy is an optional
+# dependency (quadbin[numpy]), so this module is not imported by quadbin.
+
+import numpy as np
+
+from .main import FOOTER, HEADER
+from .vectorized import as_cells, get_resolutions
+
+U64_FOOTER = np.uint64(FOOTER)
+
+
+def partition_boundaries(sample, partitions, tolerance=0.05):
+    """Split the cells along the Z-order curve into balanced partitions.
+
+    Each split is placed at the start of the coarsest cell that keeps the
+    number of sample cells of the partitions within the tolerance, so the
+    partitions are made of whole cells where possible.
+
+    Parameters
+    ----------
+    sample : array_like of int
+        Sample of the cells to partition.
+    partitions : int
+        Number of partitions.
+    tolerance : float, optional
+        Allowed deviation of the split points, as a fraction of the size
+        of a partition, by default 0.05.
+
+    Returns
+    -------
+    numpy.ndarray
+        The partitions - 1 uint64 cells where each partition after the
+        first one starts, sorted along the curve.
+
+    Raises
+    ------
+    ValueError
+        If the number of partitions or the sample are not valid.
+    """
+    if partitions < 1:
+        raise ValueError("Invalid number of partitions: should be positive")
+    positions = np.sort(cell_positions(sample).ravel())
+    if not positions.size:
+        raise ValueError("Invalid sample: should not be empty")
+
+    size = len(positions)
+    margin = int(tolerance * size / partitions)
+    boundaries = []
+    for i in range(1, partitions):
+        rank = int(round(i * size / partitions))
+        # The split is after the position of lower and up to the one of upper
+        lower = int(positions[rank - margin - 1]) if rank - margin > 0 else -1
+        upper = int(positions[min(rank + margin, size - 1)])
+        if rank + margin >= size:
+            upper = FOOTER
+        position, resolution = aligned_position(lower, upper)
+        if boundaries and position < boundaries[-1][0]:
+            position, resolution = boundaries[-1]
+        boundaries.append((position, resolution))
+
+    return np.array(
+        [
+            HEADER
+            | (1 << 59)
+            | (resolution << 52)
+            | position
+            | (FOOTER >> (resolution << 1))
+            for position, resolution in boundaries
+        ],
+        dtype=np.uint64,
+    )
+
+
+def assign_partition(cells, boundaries):
+    """Find the partition of cells by binary search of their position.
+
+    Cells coarser than a partition are assigned by their first descendant.
+
+    Parameters
+    ----------
+    cells : array_like of int
+    boundaries : array_like of int
+        Cells where each partition after the first one starts, as returned
+        by partition_boundaries.
+
+    Returns
+    -------
+    numpy.ndarray
+        Index of the partition of each cell.
+    """
+    return np.searchsorted(
+        cell_positions(boundaries), cell_positions(cells), side="right"
+    )
+
+
+def cell_positions(cells):
+    """Compute the position along the Z-order curve of the start of cells.
+
+    Returns
+    -------
+    numpy.ndarray
+        Positions at resolution 26 as uint64.
+    """
+    cells = as_cells(cells)
+    unused = U64_FOOTER >> (get_resolutions(cells) << np.uint64(1))
+    return cells & U64_FOOTER & ~unused
+
+
+def aligned_position(lower, upper):
+    """Find the start of the coarsest cell after lower and up to upper.
+
+    Returns
+    -------
+    tuple (position, resolution)
+    """
+    for resolution in range(27):
+        step = 1 << (52 - (resolution << 1))
+        position = (lower // step + 1) * step
+        if position <= upper:
+            return position, resolution
+    return upper, 26
@@ -0,0 +1,266 @@
+# Conversions between cells and NumPy rasters in Web Mercator. NumPy is an
+# optional dependency (quadbin[numpy]), so this module is not imported by quadbin.
+
+import math
+
+import numpy as np
+
+from .aggregation import AGGREGATIONS
+from .utils import clip_latitude, clip_longitude
+from .vectorized import as_cells, cells_to_tiles, tiles_to_cells
+
+RASTER_AGGREGATIONS = AGGREGATIONS + ("mode",)
+
+
+def cells_to_raster(
+    cells, values, tile_or_bbox, width, height, agg="mean", nodata=np.nan
+):
+    """Render cell values into a raster of a tile or a bounding box.
+
+    Pixels are sampled at their centers in Web Mercator. Cells of at least
+    a pixel fill the pixels whose center they contain, and smaller cells
+    are aggregated into the pixel that contains their center.
+
+    Parameters
+    ----------
+    cells : array_like of int
+    values : array_like of float
+        Value of each cell.
+    tile_or_bbox : tuple
+        Tile (x, y, z) or bounding box in degrees (xmin, ymin, xmax, ymax).
+        A bounding box with xmin greater than xmax crosses the antimeridian.
+    width : int
+        Number of columns of the raster.
+    height : int
+        Number of rows of the raster.
+    agg : str, optional
+        Aggregation of cells smaller than a pixel: "count", "sum", "mean",
+        "min" or "max", by default "mean".
+    nodata : float, optional
+        Value of the pixels without cells, by default NaN.
+
+    Returns
+    -------
+    numpy.ndarray
+        Raster of shape (height, width), with the first row at the north.
+
+    Raises
+    ------
+    ValueError
+        If the aggregation or the bounding box are not valid.
+    """
+    if agg not in AGGREGATIONS:
+        raise ValueError("Invalid aggregation: should be count, sum, mean, min or max")
+
+    x0, y0, x1, y1 = mercator_extent(tile_or_bbox)
+    raster = np.full(height * width, nodata, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    x, y, z = cells_to_tiles(as_cells(cells))
+    scale = np.ldexp(1.0, -z.astype(np.int64))
+    west = x * scale
+    if x1 > 1:
+        # Across the antimeridian, cells are also rendered one world east
+        west = np.concatenate([west, west + 1])
+        y = np.tile(y, 2)
+        scale = np.tile(scale, 2)
+        values = np.tile(values, 2)
+
+    # Cell edges in pixel units
+    left = (west - x0) * (width / (x1 - x0))
+    right = (west + scale - x0) * (width / (x1 - x0))
+    top = (y * scale - y0) * (height / (y1 - y0))
+    bottom = ((y + 1) * scale - y0) * (height / (y1 - y0))
+
+    # Cells of at least a pixel fill the pixels whose center they contain
+    fills = (right - left >= 1) & (bottom - top >= 1)
+    col_start = np.clip(np.ceil(left[fills] - 0.5), 0, width).astype(np.int64)
+    col_stop = np.clip(np.ceil(right[fills] - 0.5), 0, width).astype(np.int64)
+    row_start = np.clip(np.ceil(top[fills] - 0.5), 0, height).astype(np.int64)
+    row_stop = np.clip(np.ceil(bottom[fills] - 0.5), 0, height).astype(np.int64)
+    fill_pixels(raster, width, values[fills], col_start, col_stop, row_start, row_stop)
+
+    # Smaller cells are aggregated into the pixel that contains their center
+    col = np.floor((left + right) / 2).astype(np.int64)
+    row = np.floor((top + bottom) / 2).astype(np.int64)
+    small = ~fills & (col >= 0) & (col < width) & (row >= 0) & (row < height)
+    pixels = row[small] * width + col[small]
+    if len(pixels):
+        unique, inverse = np.unique(pixels, return_inverse=True)
+        raster[unique] = aggregate_groups(inverse, values[small], agg, len(unique))
+
+    return raster.reshape(height, width)
+
+
+def raster_to_cells(array, tile_or_bbox, resolution, nodata=None, agg="mean"):
+    """Convert the pixels of a raster of a tile or a bounding box into cells.
+
+    Pixels are located by their centers in Web Mercator. When pixels are
+    finer than the cells, the pixels of every cell are aggregated.
+    Otherwise, every cell takes the value of the pixel that contains its
+    center.
+
+    Parameters
+    ----------
+    array : array_like
+        Raster of shape (height, width), with the first row at the north.
+    tile_or_bbox : tuple
+        Tile (x, y, z) or bounding box in degrees (xmin, ymin, xmax, ymax).
+        A bounding box with xmin greater than xmax crosses the antimeridian.
+    resolution : int
+        The resolution of the cells.
+    nodata : float, optional
+        Value of the pixels to skip. NaN pixels are always skipped.
+    agg : str, optional
+        Aggregation of the pixels of a cell: "count", "sum", "mean", "min",
+        "max" or "mode", by default "mean". Use "mode" for categorical
+        rasters.
+
+    Returns
+    -------
+    tuple (numpy.ndarray, numpy.ndarray)
+        The sorted uint64 cells and their values.
+
+    Raises
+    ------
+    ValueError
+        If the resolution, the aggregation or the bounding box are not valid.
+    """
+    if resolution < 0 or resolution > 26:
+        raise ValueError("Invalid resolution: should be between 0 and 26")
+    if agg not in RASTER_AGGREGATIONS:
+        raise ValueError(
+            "Invalid aggregation: should be count, sum, mean, min, max or mode"
+        )
+
+    array = np.asarray(array)
+    height, width = array.shape
+    x0, y0, x1, y1 = mercator_extent(tile_or_bbox)
+    n = 1 << resolution
+
+    if (x1 - x0) / width <= 1.0 / n and (y1 - y0) / height <= 1.0 / n:
+        # Pixels finer than cells are aggregated into the cell of their center
+        tx = np.floor((x0 + (np.arange(width) + 0.5) * ((x1 - x0) / width)) * n)
+        ty = np.floor((y0 + (np.arange(height) + 0.5) * ((y1 - y0) / height)) * n)
+        tx = np.mod(tx, n)
+        ty = np.clip(ty, 0, n - 1)
+        tx, ty = np.meshgrid(tx, ty)
+        values = array
+    else:
+        # Cells finer than pixels take the pixel of their center
+        cx = np.arange(math.floor(x0 * n), math.ceil(x1 * n))
+        cy = np.arange(max(math.floor(y0 * n), 0), min(math.ceil(y1 * n), n))
+        cols = np.floor(((cx + 0.5) / n - x0) * (width / (x1 - x0))).astype(np.int64)
+        rows = np.floor(((cy + 0.5) / n - y0) * (height / (y1 - y0))).astype(np.int64)
+        cx = cx[(cols >= 0) & (cols < width)]
+        cols = cols[(cols >= 0) & (cols < width)]
+        cy = cy[(rows >= 0) & (rows < height)]
+        rows = rows[(rows >= 0) & (rows < height)]
+        tx, ty = np.meshgrid(np.mod(cx, n), cy)
+        values = array[np.ix_(rows, cols)]
+
+    valid = np.ones(values.shape, dtype=bool)
+    if values.dtype.kind == "f":
+        valid &= ~np.isnan(values)
+    if nodata is not None and nodata == nodata:
+        valid &= values != nodata
+
+    cells = tiles_to_cells(tx[valid], ty[valid], resolution)
+    values = values[valid]
+    if len(cells) == 0:
+        return cells, values
+
+    unique, inverse = np.unique(cells, return_inverse=True)
+    return unique, aggregate_groups(inverse, values, agg, len(unique))
+
+
+def fill_pixels(raster, width, values, col_start, col_stop, row_start, row_stop):
+    """Assign the value of each cell to all the pixels of its range."""
+    widths = np.maximum(col_stop - col_start, 0)
+    counts = widths * np.maximum(row_stop - row_start, 0)
+    if not counts.sum():
+        return
+
+    # Position of every pixel inside the range of its cell
+    cell = np.repeat(np.arange(len(counts)), counts)
+    position = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    rows = row_start[cell] + position // widths[cell]
+    cols = col_start[cell] + position % widths[cell]
+    raster[rows * width + cols] = values[cell]
+
+
+def aggregate_groups(inverse, values, agg, size):
+    """Aggregate values by the index of their group.
+
+    Returns
+    -------
+    numpy.ndarray
+        Aggregated value of each group.
+    """
+    if agg == "count":
+        return np.bincount(inverse, minlength=size)
+    if agg == "mode":
+        # Most frequent value of each group, the lowest one in case of a tie
+        pairs, counts = np.unique(
+            np.column_stack([inverse, values]), axis=0, return_counts=True
+        )
+        order = np.lexsort((-counts, pairs[:, 0]))
+        pairs = pairs[order]
+        first = np.ones(len(pairs), dtype=bool)
+        first[1:] = pairs[1:, 0] != pairs[:-1, 0]
+        return pairs[first, 1].astype(values.dtype)
+
+    values = values.astype(np.float64)
+    if agg == "sum":
+        return np.bincount(inverse, weights=values, minlength=size)
+    if agg == "mean":
+        return np.bincount(inverse, weights=values, minlength=size) / np.bincount(
+            inverse, minlength=size
+        )
+    if agg == "min":
+        result = np.full(size, np.inf)
+        np.minimum.at(result, inverse, values)
+        return result
+    result = np.full(size, -np.inf)
+    np.maximum.at(result, inverse, values)
+    return result
+
+
+def mercator_extent(tile_or_bbox):
+    """Compute the extent of a tile or bounding box as world fractions.
+
+    Returns
+    -------
+    tuple (x0, y0, x1, y1)
+        Web Mercator fractions of the world, from 0 to 1, with y
+        growing southwards. The x1 of a bounding box crossing the
+        antimeridian is greater than 1.
+
+    Raises
+    ------
+    ValueError
+        If ymin is greater than ymax.
+    """
+    if len(tile_or_bbox) == 3:
+        x, y, z = tile_or_bbox
+        scale = 1.0 / (1 << z)
+        return (x * scale, y * scale, (x + 1) * scale, (y + 1) * scale)
+
+    xmin, ymin, xmax, ymax = tile_or_bbox
+    if ymin > ymax:
+        raise ValueError("Invalid bounding box: ymin should not be greater than ymax")
+    x0 = longitude_fraction(xmin)
+    x1 = longitude_fraction(xmax)
+    if xmin > xmax:
+        x1 += 1
+    return (x0, latitude_fraction(ymax), x1, latitude_fraction(ymin))
+
+
+def longitude_fraction(longitude):
+    """Compute the Web Mercator x fraction of the world of a longitude."""
+    return clip_longitude(longitude) / 360.0 + 0.5
+
+
+def latitude_fraction(latitude):
+    """Compute the Web Mercator y fraction of the world of a latitude."""
+    sinlat = math.sin(clip_latitude(latitude) * math.pi / 180.0)
+    return 0.5 - 0.25 * math.log((1 + sinlat) / (1 - sinlat)) / math.pi
@@ -0,0 +1,157 @@
+import json
+import struct
+
+from .main import cell_to_tile, index_to_string
+from .utils import tile_to_latitude, tile_to_longitude
+
+BATCH_SIZE = 1024
+
+WKB_LITTLE_ENDIAN = 1
+WKB_POLYGON = 3
+WKB_MULTIPOLYGON = 6
+WKB_MULTIPOLYGON_HEADER = struct.Struct("<BII")
+WKB_POLYGON_CELL = struct.Struct("<BIII10d")
+
+
+def cells_to_geojson(cells, file=None, properties=None):
+    """Serialize cells as a GeoJSON FeatureCollection of their boundaries.
+
+    Every feature has the index string of its cell as id. The output is
+    compact JSON, written in batches so large collections are never held
+    in a single string when a file is given.
+
+    Parameters
+    ----------
+    cells : iterable of int
+    file : file-like, optional
+        Binary file object to write to.
+    properties : iterable of dict, optional
+        Properties of each feature, in the order of the cells.
+
+    Returns
+    -------
+    bytes
+        if file is None.
+    None
+        if a file is given.
+    """
+    chunks = []
+    write = chunks.append if file is None else file.write
+    bounding_box = bounding_box_function()
+    if properties is not None:
+        properties = iter(properties)
+
+    write(b'{"type":"FeatureCollection","features":[')
+    batch = []
+    separator = ""
+    for cell in cells:
+        props = None if properties is None else next(properties)
+        xmin, ymin, xmax, ymax = [repr(value) for value in bounding_box(cell)]
+        batch.append(
+            '{0}{{"type":"Feature","id":"{1}","geometry":{{"type":"Polygon",'
+            '"coordinates":[[[{2},{5}],[{2},{3}],[{4},{3}],[{4},{5}],[{2},{5}]]]}},'
+            '"properties":{6}}}'.format(
+                separator,
+                index_to_string(cell),
+                xmin,
+                ymin,
+                xmax,
+                ymax,
+                "{}" if props is None else json.dumps(props, separators=(",", ":")),
+            )
+        )
+        separator = ","
+        if len(batch) == BATCH_SIZE:
+            write("".join(batch).encode("utf-8"))
+            batch = []
+    write("".join(batch).encode("utf-8"))
+    write(b"]}")
+
+    if file is None:
+        return b"".join(chunks)
+
+
+def cells_to_wkb(cells, file=None):
+    """Serialize cells as a little-endian WKB MultiPolygon of their boundaries.
+
+    The polygons are packed in batches so large outputs can be streamed
+    when a file is given.
+
+    Parameters
+    ----------
+    cells : sequence of int
+    file : file-like, optional
+        Binary file object to write to.
+
+    Returns
+    -------
+    bytes
+        if file is None.
+    None
+        if a file is given.
+    """
+    chunks = []
+    write = chunks.append if file is None else file.write
+    bounding_box = bounding_box_function()
+
+    write(WKB_MULTIPOLYGON_HEADER.pack(WKB_LITTLE_ENDIAN, WKB_MULTIPOLYGON, len(cells)))
+    batch = []
+    for cell in cells:
+        xmin, ymin, xmax, ymax = bounding_box(cell)
+        batch.append(
+            WKB_POLYGON_CELL.pack(
+                WKB_LITTLE_ENDIAN,
+                WKB_POLYGON,
+                1,
+                5,
+                xmin,
+                ymax,
+                xmin,
+                ymin,
+                xmax,
+                ymin,
+                xmax,
+                ymax,
+                xmin,
+                ymax,
+            )
+        )
+        if len(batch) == BATCH_SIZE:
+            write(b"".join(batch))
+            batch = []
+    write(b"".join(batch))
+
+    if file is None:
+        return b"".join(chunks)
+
+
+def bounding_box_function():
+    """Create a cell_to_bounding_box that caches the latitude of tile rows.
+
+    Bulk cells usually share rows, so the latitude of each row edge is
+    only computed once.
+
+    Returns
+    -------
+    function
+        Bounding box in degrees [xmin, ymin, xmax, ymax] of a cell.
+    """
+    latitudes = {}
+
+    def row_latitude(y, z):
+        key = (y, z)
+        if key not in latitudes:
+            latitudes[key] = tile_to_latitude((0, y, z), 0)
+        return latitudes[key]
+
+    def bounding_box(cell):
+        tile = cell_to_tile(cell)
+        _, y, z = tile
+        return [
+            tile_to_longitude(tile, 0),
+            row_latitude(y + 1, z),
+            tile_to_longitude(tile, 1),
+            row_latitude(y, z),
+        ]
+
+    return bounding_box
@@ -3,12 +3,31 @@
 
 from __future__ import division
 
+import bisect
 import math
 
+try:
+    from . import _speedups
+except ImportError:
+    _speedups = None
+
+from .instrumentation import (
+    active_recorders,
+    geometry_vertices,
+    record_counts,
+    record_peak,
+    record_stage,
+    timer,
+)
 from .utils import distinct, point_to_tile, point_to_tile_fraction
 
+FILL_RULES = ("evenodd", "nonzero")
+SIMPLIFICATIONS = ("exact", "superset")
+JIT_TYPES = ("LineString", "MultiLineString", "Polygon", "MultiPolygon")
+JIT_BACKEND = []
 
-def get_tiles(geometry, resolution):
+
+def get_tiles(geometry, resolution, simplify=None, fill_rule="evenodd"):
     """Compute the tiles that fill an input geometry.
 
     Parameters
@@ -17,6 +36,14 @@ def get_tiles(geometry, resolution):
         Input geometry as GeoJSON.
     resolution : int
         The resolution of the cells.
+    simplify : str, optional
+        Simplify lines and rings before the cover, in tile fractions:
+        "exact" drops the vertices inside the same tile as both neighbors,
+        keeping the same cover, and "superset" simplifies to half a tile
+        and adds the neighbors of the boundary tiles, covering a superset.
+        By default None, without simplification.
+    fill_rule : str, optional
+        "evenodd" or "nonzero" fill of polygons, by default "evenodd".
 
     Returns
     -------
@@ -27,6 +54,8 @@ def get_tiles(geometry, resolution):
     ------
     Exception
         If the geometry type is not supported.
+    ValueError
+        If the simplification or the fill rule are not valid.
     """
     tiles_hashes = []
     geom_type = geometry["type"]
@@ -43,10 +72,262 @@ def get_tiles(geometry, resolution):
 
     if geom_type not in get_tiles_hashes_function:
         raise Exception("Geometry type not implemented")
+    if fill_rule not in FILL_RULES:
+        raise ValueError("Invalid fill rule: should be evenodd or nonzero")
+
+    if simplify is not None:
+        if simplify not in SIMPLIFICATIONS:
+            raise ValueError("Invalid simplification: should be exact or superset")
+        if geom_type in JIT_TYPES and resolution >= 2:
+            return simplified_tiles(geometry, resolution, simplify, fill_rule)
+
+    recording = bool(active_recorders())
+    if recording:
+        record_counts(vertices=geometry_vertices(geometry))
+        start = timer()
+
+    if geom_type in JIT_TYPES:
+        jit = jit_backend()
+        tiles = None if jit is None else jit.get_tiles(geometry, resolution, fill_rule)
+        if tiles is not None:
+            return tiles
+
+    if geom_type in ("Polygon", "MultiPolygon"):
+        tiles_hashes = get_tiles_hashes_function[geom_type](
+            geom_coordinates, resolution, fill_rule
+        )
+    else:
+        tiles_hashes = get_tiles_hashes_function[geom_type](
+            geom_coordinates, resolution
+        )
+    if not recording:
+        return tiles_hashes_to_tiles(tiles_hashes)
+
+    if geom_type in ("Polygon", "MultiPolygon"):
+        # The boundary and the fill are recorded by polygon_cover
+        start = timer()
+    else:
+        start = record_stage("boundary", start, boundary_tiles=len(tiles_hashes))
+    tiles = tiles_hashes_to_tiles(tiles_hashes)
+    record_stage("dedupe", start, duplicates=len(tiles_hashes) - len(tiles))
+    record_peak("tiles_hashes", len(tiles_hashes))
+    return tiles
+
+
+def simplified_tiles(geometry, resolution, simplify, fill_rule="evenodd"):
+    """Compute the tiles that fill a line or polygon geometry after simplifying it.
+
+    Returns
+    -------
+    list
+    """
+    recording = bool(active_recorders())
+    if recording:
+        start = timer()
+    simplified = simplify_geometry(geometry, resolution, simplify)
+    if recording:
+        record_stage("simplify", start)
+    tiles = get_tiles(simplified, resolution, fill_rule=fill_rule)
+    if simplify == "exact":
+        return tiles
+
+    # The original boundary is within half a tile of the simplified one
+    if recording:
+        start = timer()
+    z2 = 1 << resolution
+    tiles_hashes = [to_tile_hash(x, y, z) for x, y, z in tiles]
+    for tile_hash in distinct(boundary_tiles_hashes(simplified, resolution)):
+        x, y, z = from_tile_hash(tile_hash)
+        for j in range(max(y - 1, 0), min(y + 2, z2)):
+            for i in range(x - 1, x + 2):
+                tiles_hashes.append(to_tile_hash(i, j, z))
+    tiles = tiles_hashes_to_tiles(tiles_hashes)
+    if recording:
+        record_stage("simplify", start)
+    return tiles
+
+
+def simplify_geometry(geometry, resolution, simplify):
+    """Simplify the lines and rings of a geometry in tile fractions.
+
+    Only vertices are dropped, and the remaining ones are unwrapped as in
+    the original geometry, so the cover can be computed as usual.
+
+    Parameters
+    ----------
+    geometry : dict
+        LineString, MultiLineString, Polygon or MultiPolygon as GeoJSON.
+    resolution : int
+    simplify : str
+        "exact" or "superset", as in get_tiles.
+
+    Returns
+    -------
+    dict
+        Simplified geometry as GeoJSON.
+    """
+    z2 = 1 << resolution
+
+    def simplify_coordinates(coords, fractions):
+        indexes = collapse_fractions(fractions)
+        if simplify == "superset":
+            # Shorter chords keep the unwrapping of the vertices
+            fractions = [fractions[i] for i in indexes]
+            indexes = [indexes[i] for i in simplify_fractions(fractions, 0.5, z2 / 4)]
+        return [coords[i] for i in indexes]
+
+    def simplify_line(coords):
+        return simplify_coordinates(coords, tile_fractions(coords, resolution))
+
+    def simplify_polygon(rings):
+        origin = polygon_origin(rings, resolution)
+        return [
+            simplify_coordinates(ring, ring_fractions(ring, resolution, origin))
+            for ring in rings
+        ]
+
+    geom_type = geometry["type"]
+    coordinates = geometry["coordinates"]
+    if geom_type == "LineString":
+        coordinates = simplify_line(coordinates)
+    elif geom_type == "MultiLineString":
+        coordinates = [simplify_line(line) for line in coordinates]
+    elif geom_type == "Polygon":
+        coordinates = simplify_polygon(coordinates)
+    else:
+        coordinates = [simplify_polygon(polygon) for polygon in coordinates]
+    return {"type": geom_type, "coordinates": coordinates}
+
+
+def collapse_fractions(fractions):
+    """Select the vertices that are not inside the same tile as both neighbors.
+
+    The segments between the dropped vertices stay inside their tile, so
+    the tiles of the line and the fill of the rings do not change.
+
+    Returns
+    -------
+    list
+        Indexes of the selected vertices.
+    """
+    tiles = [(math.floor(x), math.floor(y)) for x, y in fractions]
+    last = len(tiles) - 1
+    indexes = [
+        i
+        for i in range(len(tiles))
+        if i == 0 or i == last or tiles[i] != tiles[i - 1] or tiles[i] != tiles[i + 1]
+    ]
+    if len(indexes) == 2 and fractions[0] == fractions[last]:
+        # Closed lines inside a single tile keep a segment
+        others = [i for i in range(1, last) if fractions[i] != fractions[0]]
+        indexes[1:1] = others[:1]
+    return indexes
+
+
+def simplify_fractions(fractions, tolerance, max_dx):
+    """Select the vertices of a Douglas-Peucker simplification.
+
+    Every dropped vertex is within the tolerance of the segment between
+    the selected vertices around it.
+
+    Parameters
+    ----------
+    fractions : list
+        Tuples (x, y) of tile fractions.
+    tolerance : float
+        Maximum distance to the simplified line, in tiles.
+    max_dx : float
+        Maximum x extent of a segment of the simplified line, in tiles.
+
+    Returns
+    -------
+    list
+        Indexes of the selected vertices.
+    """
+    if len(fractions) < 3:
+        return list(range(len(fractions)))
+
+    keep = [False] * len(fractions)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(fractions) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        x0, y0 = fractions[first]
+        x1, y1 = fractions[last]
+        if (x0, y0) == (x1, y1):
+            # Closed lines are split at the farthest vertex
+            split = max(
+                (math.hypot(fractions[i][0] - x0, fractions[i][1] - y0), i)
+                for i in range(first + 1, last)
+            )[1]
+        elif abs(x1 - x0) >= max_dx:
+            split = (first + last) // 2
+        else:
+            distance, split = max(
+                (segment_distance(fractions[i], x0, y0, x1, y1), i)
+                for i in range(first + 1, last)
+            )
+            if distance <= tolerance:
+                continue
+        keep[split] = True
+        stack.append((first, split))
+        stack.append((split, last))
+
+    return [i for i in range(len(fractions)) if keep[i]]
+
+
+def segment_distance(point, x0, y0, x1, y1):
+    """Compute the distance from a point to a segment."""
+    x, y = point
+    dx = x1 - x0
+    dy = y1 - y0
+    length = dx * dx + dy * dy
+    t = 0 if length == 0 else max(0, min(1, ((x - x0) * dx + (y - y0) * dy) / length))
+    return math.hypot(x - x0 - t * dx, y - y0 - t * dy)
+
+
+def boundary_tiles_hashes(geometry, resolution):
+    """Compute the tiles hashes of the lines or rings of a geometry.
+
+    Returns
+    -------
+    list
+    """
+    geom_type = geometry["type"]
+    coordinates = geometry["coordinates"]
+    if geom_type == "LineString":
+        return line_cover(coordinates, resolution)
+    if geom_type == "MultiLineString":
+        return [h for line in coordinates for h in line_cover(line, resolution)]
 
-    tiles_hashes = get_tiles_hashes_function[geom_type](geom_coordinates, resolution)
+    polygons = [coordinates] if geom_type == "Polygon" else coordinates
+    tiles_hashes = []
+    for rings in polygons:
+        origin = polygon_origin(rings, resolution)
+        for ring in rings:
+            tiles_hashes += line_cover(ring, resolution, [], origin)
+    return tiles_hashes
 
-    return tiles_hashes_to_tiles(tiles_hashes)
+
+def jit_backend():
+    """Load the numba backend of get_tiles on its first use.
+
+    Returns
+    -------
+    module
+        quadbin.jit, if numba can be imported.
+    None
+        Otherwise, so the pure Python functions are used.
+    """
+    if not JIT_BACKEND:
+        try:
+            from . import jit
+        except ImportError:
+            jit = None
+        JIT_BACKEND.append(jit)
+    return JIT_BACKEND[0]
 
 
 def get_point_tiles_hashes(coordinates, resolution):
@@ -97,17 +378,17 @@ def get_multilinestring_tiles_hashes(coordinates, resolution):
     ]
 
 
-def get_polygon_tiles_hashes(coordinates, resolution):
+def get_polygon_tiles_hashes(coordinates, resolution, fill_rule="evenodd"):
     """Compute tile hash for a Polygon.
 
     Returns
     -------
     list
     """
-    return polygon_cover(coordinates, resolution)
+    return polygon_cover(coordinates, resolution, fill_rule=fill_rule)
 
 
-def get_multipolygon_tiles_hashes(coordinates, resolution):
+def get_multipolygon_tiles_hashes(coordinates, resolution, fill_rule="evenodd"):
     """Compute tile hash for a MultiPolygon.
 
     Returns
@@ -117,7 +398,7 @@ def get_multipolygon_tiles_hashes(coordinates, resolution):
     return [
         tile_hash
         for i in range(len(coordinates))
-        for tile_hash in polygon_cover(coordinates[i], resolution)
+        for tile_hash in polygon_cover(coordinates[i], resolution, fill_rule=fill_rule)
     ]
 
 
@@ -132,9 +413,19 @@ def point_cover(coordinates, resolution):
     return [to_tile_hash(x, y, z)]
 
 
-def line_cover(coords, resolution, ring=None):
+def line_cover(coords, resolution, ring=None, origin=None):
     """Return the tiles hashes that cover a line.
 
+    Segments crossing the antimeridian are traversed the short way: the tile
+    x fractions are unwrapped to stay within half a world of the previous
+    vertex, and wrapped back when hashed.
+
+    Parameters
+    ----------
+    origin : float, optional
+        Tile x fraction to unwrap the first vertex against, so that all the
+        rings of a polygon share the same frame.
+
     Returns
     -------
     list
@@ -144,13 +435,14 @@ def line_cover(coords, resolution, ring=None):
     prev_y = None
     y = None
 
-    for i in range(len(coords) - 1):
-        start = point_to_tile_fraction(coords[i][0], coords[i][1], resolution)
-        stop = point_to_tile_fraction(coords[i + 1][0], coords[i + 1][1], resolution)
-        x0 = start[0]
-        y0 = start[1]
-        x1 = stop[0]
-        y1 = stop[1]
+    if ring is not None:
+        fractions = ring_fractions(coords, resolution, origin)
+    else:
+        fractions = tile_fractions(coords, resolution, origin)
+
+    for i in range(len(fractions) - 1):
+        x0, y0 = fractions[i]
+        x1, y1 = fractions[i + 1]
         dx = x1 - x0
         dy = y1 - y0
 
@@ -193,47 +485,336 @@ def line_cover(coords, resolution, ring=None):
     return tiles_hashes
 
 
-def polygon_cover(geom, zoom):
+def tile_fractions(coords, resolution, origin=None, unwrap=True):
+    """Project coordinates into tile fractions with a continuous x.
+
+    Returns
+    -------
+    list
+        Tuples (x, y) of tile fractions.
+    """
+    z2 = 1 << resolution
+    fractions = []
+    reference = origin
+
+    for coord in coords:
+        x, y, _ = point_to_tile_fraction(coord[0], coord[1], resolution)
+        if unwrap and reference is not None:
+            x += z2 * math.floor((reference - x) / z2 + 0.5)
+        fractions.append((x, y))
+        reference = x
+
+    return fractions
+
+
+def ring_fractions(coords, resolution, origin=None):
+    """Project the coordinates of a polygon ring into tile fractions.
+
+    Returns
+    -------
+    list
+        Tuples (x, y) of tile fractions, unwrapped unless the ring goes
+        around a pole.
+    """
+    fractions = tile_fractions(coords, resolution, origin)
+    if len(fractions) > 1:
+        if abs(fractions[-1][0] - fractions[0][0]) >= (1 << resolution) / 2:
+            # Rings around a pole do not close once unwrapped
+            fractions = tile_fractions(coords, resolution, unwrap=False)
+    return fractions
+
+
+def polygon_cover(geom, zoom, window=None, fill_rule="evenodd"):
     """Return the tiles hashes that cover a polygon.
 
+    The boundary tiles are traversed ring by ring, and the interior is
+    filled with the spans of tiles whose center is inside the polygon.
+
+    Parameters
+    ----------
+    window : tuple (xmin, ymin, xmax, ymax), optional
+        Inclusive tile extent. If given, only the tiles inside it are
+        returned and the fill is restricted to it.
+    fill_rule : str, optional
+        "evenodd" or "nonzero", by default "evenodd".
+
     Returns
     -------
     list
+
+    Raises
+    ------
+    ValueError
+        If the fill rule is not valid.
     """
+    if fill_rule not in FILL_RULES:
+        raise ValueError("Invalid fill rule: should be evenodd or nonzero")
+
+    recording = bool(active_recorders())
+    if recording:
+        start = timer()
+
     tiles_hashes = []
-    intersections = []
+    origin = polygon_origin(geom, zoom)
+    for ring in geom:
+        tiles_hashes += line_cover(ring, zoom, [], origin)
+
+    rows = None
+    if window is not None:
+        tiles_hashes = [
+            tile_hash
+            for tile_hash in tiles_hashes
+            if in_window(from_tile_hash(tile_hash), window)
+        ]
+        rows = (window[1], window[3])
+
+    boundary = len(tiles_hashes)
+    if recording:
+        start = record_stage("boundary", start, boundary_tiles=boundary)
+
+    for y, first, stop in polygon_spans(geom, zoom, fill_rule, rows):
+        tiles_hashes += span_hashes(y, first, stop, zoom, window)
+
+    if recording:
+        record_stage("fill", start, filled_cells=len(tiles_hashes) - boundary)
+    return tiles_hashes
 
-    for i in range(len(geom)):
-        ring = []
-        tiles_hashes += line_cover(geom[i], zoom, ring)
 
-        ring_length = len(ring)
-        k = ring_length - 1
-        for j in range(ring_length):
-            m = (j + 1) % ring_length
-            y = ring[j][1]
+def polygon_origin(geom, zoom):
+    """Compute the tile x fraction that the rings of a polygon are unwrapped against.
+
+    Returns
+    -------
+    float
+    None
+        If the polygon is empty.
+    """
+    if geom and geom[0]:
+        return point_to_tile_fraction(geom[0][0][0], geom[0][0][1], zoom)[0]
+    return None
 
-            #  add intersection if it's not local extremum or duplicate
-            if (
-                (y > ring[k][1] or y > ring[m][1])
-                and (y < ring[k][1] or y < ring[m][1])
-                and y != ring[m][1]
-            ):
-                intersections.append(ring[j])
 
-            k = j
+def polygon_spans(geom, zoom, fill_rule="evenodd", rows=None):
+    """Compute the spans of tiles whose center is inside a polygon, row by row.
 
-    intersections.sort(key=lambda tile: (tile[1], tile[0]))
+    The edges are kept in an edge table sorted by their first row, and
+    each row only intersects the center line with the active edges, so
+    the cost grows with the number of rows instead of the number of tiles.
 
-    for i in range(0, len(intersections), 2):
-        #  fill tiles between pairs of intersections
-        y = intersections[i][1]
-        for x in range(int(intersections[i][0] + 1), int(intersections[i + 1][0])):
-            tiles_hashes.append(to_tile_hash(x, y, zoom))
+    Parameters
+    ----------
+    geom : list
+        Rings of the polygon.
+    zoom : int
+    fill_rule : str, optional
+        "evenodd" or "nonzero", by default "evenodd".
+    rows : tuple (ymin, ymax), optional
+        Inclusive range of rows to compute.
+
+    Yields
+    ------
+    tuple (y, start, stop)
+        Row and range of unwrapped tile x, with the stop excluded.
+    """
+    ymin, ymax = 0, (1 << zoom) - 1
+    if rows is not None:
+        ymin, ymax = max(ymin, rows[0]), min(ymax, rows[1])
+
+    # Edge table of [first row, last row, x, y, dx/dy, winding]
+    edges = []
+    origin = polygon_origin(geom, zoom)
+    for ring in geom:
+        fractions = ring_fractions(ring, zoom, origin)
+        for (x0, y0), (x1, y1) in zip(fractions, fractions[1:] + fractions[:1]):
+            if y0 == y1:
+                continue
+            winding = 1 if y1 > y0 else -1
+            if winding < 0:
+                x0, y0, x1, y1 = x1, y1, x0, y0
+            # Rows whose center line y + 0.5 is in [y0, y1)
+            first = max(int(math.ceil(y0 - 0.5)), ymin)
+            last = min(int(math.ceil(y1 - 0.5)) - 1, ymax)
+            if first <= last:
+                edges.append([first, last, x0, y0, (x1 - x0) / (y1 - y0), winding])
+    edges.sort(key=lambda edge: edge[0])
+
+    active = []
+    i = 0
+    y = ymin
+    while i < len(edges) or active:
+        if not active:
+            y = max(y, edges[i][0])
+        while i < len(edges) and edges[i][0] <= y:
+            active.append(edges[i])
+            i += 1
+
+        center = y + 0.5
+        crossings = sorted(
+            (edge[2] + (center - edge[3]) * edge[4], edge[5]) for edge in active
+        )
+        for start, stop in crossing_spans(crossings, fill_rule):
+            start = int(math.ceil(start - 0.5))
+            stop = int(math.ceil(stop - 0.5))
+            if start < stop:
+                yield y, start, stop
+
+        y += 1
+        active = [edge for edge in active if edge[1] >= y]
+
+
+def crossing_spans(crossings, fill_rule):
+    """Pair the sorted crossings of a row into the spans inside the polygon.
+
+    Returns
+    -------
+    list
+        Tuples (start, stop) of x fractions.
+    """
+    if fill_rule == "evenodd":
+        return [
+            (crossings[i][0], crossings[i + 1][0])
+            for i in range(0, len(crossings) - 1, 2)
+        ]
+
+    spans = []
+    winding = 0
+    for x, direction in crossings:
+        if winding == 0:
+            start = x
+        winding += direction
+        if winding == 0:
+            spans.append((start, x))
+    return spans
+
+
+def span_hashes(y, start, stop, zoom, window=None):
+    """Compute the hashes of the tiles of a span.
+
+    Unwrapped spans are split at the antimeridian, and the hashes of each
+    part are an arithmetic progression.
+
+    Parameters
+    ----------
+    window : tuple (xmin, ymin, xmax, ymax), optional
+        Inclusive tile extent to restrict the span to.
+
+    Returns
+    -------
+    list
+    """
+    z2 = 1 << zoom
+    xmin, xmax = (0, z2 - 1) if window is None else (window[0], window[2])
+    base = to_tile_hash(0, y, zoom)
 
+    tiles_hashes = []
+    for offset in range(start // z2 * z2, stop, z2):
+        first = max(start, offset + xmin) - offset
+        last = min(stop, offset + xmax + 1) - offset
+        tiles_hashes += range(base + 32 * first, base + 32 * last, 32)
     return tiles_hashes
 
 
+def cover_size(geometries, resolution, fill_rule="evenodd"):
+    """Count the tiles that fill geometries without computing the fill.
+
+    The tiles of the points, lines and boundaries are computed, and the
+    interior of the polygons is counted from their spans, merged row by
+    row, so the cost grows with the perimeter and the number of rows
+    instead of the number of tiles.
+
+    Parameters
+    ----------
+    geometries : list
+        Input geometries as GeoJSON, whose covers are merged.
+    resolution : int
+    fill_rule : str, optional
+        "evenodd" or "nonzero" fill of polygons, by default "evenodd".
+
+    Returns
+    -------
+    int
+        Number of distinct tiles, as get_tiles of every geometry.
+
+    Raises
+    ------
+    Exception
+        If a geometry type is not supported.
+    ValueError
+        If the fill rule is not valid.
+    """
+    if fill_rule not in FILL_RULES:
+        raise ValueError("Invalid fill rule: should be evenodd or nonzero")
+
+    tiles_hashes = []
+    spans = []
+    for geometry in geometries:
+        geom_type = geometry["type"]
+        coordinates = geometry["coordinates"]
+        if geom_type == "Point":
+            tiles_hashes += point_cover(coordinates, resolution)
+        elif geom_type == "MultiPoint":
+            tiles_hashes += get_multipoint_tiles_hashes(coordinates, resolution)
+        elif geom_type in JIT_TYPES:
+            tiles_hashes += boundary_tiles_hashes(geometry, resolution)
+            if geom_type == "Polygon":
+                spans += polygon_spans(coordinates, resolution, fill_rule)
+            elif geom_type == "MultiPolygon":
+                for rings in coordinates:
+                    spans += polygon_spans(rings, resolution, fill_rule)
+        else:
+            raise Exception("Geometry type not implemented")
+
+    rows = row_intervals(spans, resolution)
+    size = sum(stop - start for intervals in rows.values() for start, stop in intervals)
+    starts = dict((y, [start for start, _ in rows[y]]) for y in rows)
+    for tile_hash in distinct(tiles_hashes):
+        x, y, _ = from_tile_hash(tile_hash)
+        if y in rows:
+            i = bisect.bisect_right(starts[y], x) - 1
+            if i >= 0 and x < rows[y][i][1]:
+                continue
+        size += 1
+    return size
+
+
+def row_intervals(spans, zoom):
+    """Wrap spans at the antimeridian and merge the overlapping ones of each row.
+
+    Returns
+    -------
+    dict
+        Sorted (start, stop) tile x ranges of each row, with the stop excluded.
+    """
+    z2 = 1 << zoom
+    rows = {}
+    for y, start, stop in spans:
+        for offset in range(start // z2 * z2, stop, z2):
+            interval = (max(start, offset) - offset, min(stop, offset + z2) - offset)
+            rows.setdefault(y, []).append(interval)
+
+    for y, intervals in rows.items():
+        intervals.sort()
+        merged = [intervals[0]]
+        for start, stop in intervals[1:]:
+            if start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], stop))
+            else:
+                merged.append((start, stop))
+        rows[y] = merged
+    return rows
+
+
+def in_window(tile, window):
+    """Return True if the tile is inside an inclusive tile extent.
+
+    Returns
+    -------
+    bool
+    """
+    x, y, _ = tile
+    return window[0] <= x <= window[2] and window[1] <= y <= window[3]
+
+
 def to_tile_hash(x, y, z):
     """Compute a hash from the tile.
 
@@ -242,6 +823,7 @@ def to_tile_hash(x, y, z):
     int
     """
     dim = 2 * (1 << z)
+    x = x % (1 << z)
     return ((dim * y + x) * 32) + z
 
 
@@ -268,3 +850,17 @@ def tiles_hashes_to_tiles(tiles_hashes):
     list
     """
     return [from_tile_hash(tile_hash) for tile_hash in distinct(tiles_hashes)]
+
+
+# The compiled extension, if built, replaces the inner loops above. The pure
+# Python functions remain the fallback and the reference implementation.
+PYTHON_FUNCTIONS = {
+    "to_tile_hash": to_tile_hash,
+    "from_tile_hash": from_tile_hash,
+    "line_cover": line_cover,
+}
+
+if _speedups is not None:
+    to_tile_hash = _speedups.to_tile_hash
+    from_tile_hash = _speedups.from_tile_hash
+    line_cover = _speedups.line_cover
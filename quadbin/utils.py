@@ -195,6 +195,10 @@ def tile_sibling(tile, direction):
 def tile_k_ring(origin, k, extra=False):
     """Compute the tiles within k distance of the origin tile.
 
+    The longitude wraps around the antimeridian and rows beyond the poles
+    are skipped. Each tile is returned once, even when the ring is wider
+    than the level.
+
     Parameters
     ----------
     origin : tuple (x, y, z)
@@ -210,29 +214,92 @@ def tile_k_ring(origin, k, extra=False):
     list
         Tiles in the k-ring.
     """
-    corner_tile = origin
+    x, y, z = origin
+    tiles_per_level = 1 << z
 
-    # Traverse to top left corner
-    for i in range(k):
-        corner_tile = tile_sibling(corner_tile, LEFT)
-        corner_tile = tile_sibling(corner_tile, UP)
+    if 2 * k + 1 > tiles_per_level:
+        # Every column once, at its shortest distance around the world
+        columns = range(-(tiles_per_level // 2), tiles_per_level - tiles_per_level // 2)
+    else:
+        columns = range(-k, k + 1)
 
     neighbors = []
-    traversal_tile = 0
 
-    for j in range(k * 2 + 1):
-        traversal_tile = corner_tile
-        for i in range(k * 2 + 1):
+    for j in range(-k, k + 1):
+        row = y + j
+        if row < 0 or row >= tiles_per_level:
+            continue
+        for i in columns:
+            tile = ((x + i) % tiles_per_level, row, z)
             if extra:
-                neighbors.append((traversal_tile, chebishev_distance([i, j], [k, k])))
+                neighbors.append((tile, chebishev_distance([i, j], [0, 0])))
             else:
-                neighbors.append(traversal_tile)
-            traversal_tile = tile_sibling(traversal_tile, RIGHT)
-        corner_tile = tile_sibling(corner_tile, DOWN)
+                neighbors.append(tile)
 
     return neighbors
 
 
+def tile_offset(origin, target):
+    """Compute the offset between two tiles of the same level.
+
+    The longitude wraps around the antimeridian as in tile_k_ring.
+
+    Parameters
+    ----------
+    origin : tuple (x, y, z)
+    target : tuple (x, y, z)
+
+    Returns
+    -------
+    tuple (dx, dy)
+    """
+    tiles_per_level = 1 << origin[2]
+    half = tiles_per_level // 2
+    dx = (target[0] - origin[0] + half) % tiles_per_level - half
+    return dx, target[1] - origin[1]
+
+
+def tile_path(origin, target):
+    """Compute the tiles crossed by the line between the centers of two tiles.
+
+    Consecutive tiles share an edge. The crossings of the tile edges are
+    compared as integers, and when the line crosses a corner the tile of
+    the next row is visited first.
+
+    Parameters
+    ----------
+    origin : tuple (x, y, z)
+    target : tuple (x, y, z)
+
+    Returns
+    -------
+    list
+        Tiles from the origin to the target.
+    """
+    x, y, z = origin
+    tiles_per_level = 1 << z
+    dx, dy = tile_offset(origin, target)
+    sx = 1 if dx > 0 else -1
+    sy = 1 if dy > 0 else -1
+    nx = abs(dx)
+    ny = abs(dy)
+
+    # The line crosses the i-th column edge at (2i + 1) / (2 nx), so the
+    # crossings are ordered by (2i + 1) ny against (2j + 1) nx
+    path = [origin]
+    i = j = 0
+    while i < nx or j < ny:
+        if j >= ny or (i < nx and (2 * i + 1) * ny < (2 * j + 1) * nx):
+            x = (x + sx) % tiles_per_level
+            i += 1
+        else:
+            y += sy
+            j += 1
+        path.append((x, y, z))
+
+    return path
+
+
 def chebishev_distance(u, v):
     """Compute the Chebishev distance between two 2D points."""
     return max(abs(u[0] - v[0]), abs(u[1] - v[1]))
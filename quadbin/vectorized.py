@@ -0,0 +1,637 @@
+# Vectorized cell functions over NumPy arrays of uint64 cells. NumPy is an
+# optional dependency (quadbin[numpy]), so this module is not imported by quadbin.
+
+import math
+
+import numpy as np
+
+from .main import B, FOOTER, HEADER, S
+from .utils import (
+    MAX_LATITUDE,
+    MAX_LONGITUDE,
+    MIN_LATITUDE,
+    MIN_LONGITUDE,
+    point_to_tile_fraction,
+    tile_to_latitude,
+)
+
+U64_B = [np.uint64(b) for b in B]
+U64_S = [np.uint64(s) for s in S]
+U64_FOOTER = np.uint64(FOOTER)
+U64_CELL_HEADER = np.uint64(HEADER | (1 << 59))
+U64_RESOLUTION_MASK = np.uint64(~(0x1F << 52) & 0xFFFFFFFFFFFFFFFF)
+HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+EARTH_RADIUS = 6371007.180918475  # WGS84 authalic sphere, in meters
+
+
+def as_cells(cells):
+    """Return cells as a uint64 array, without copying if possible."""
+    cells = np.asarray(cells)
+    if cells.dtype == np.int64:
+        return cells.view(np.uint64)
+    return cells.astype(np.uint64, copy=False)
+
+
+def points_to_cells(longitudes, latitudes, resolution):
+    """Convert geographic points into cells.
+
+    Parameters
+    ----------
+    longitudes : array_like of float
+        Longitudes in decimal degrees.
+    latitudes : array_like of float
+        Latitudes in decimal degrees.
+    resolution : int
+        The resolution of the cells.
+
+    Returns
+    -------
+    numpy.ndarray
+        Cells as uint64.
+
+    Raises
+    ------
+    ValueError
+        If the resolution is out of bounds.
+    """
+    if resolution < 0 or resolution > 26:
+        raise ValueError("Invalid resolution: should be between 0 and 26")
+
+    longitudes = np.clip(
+        np.asarray(longitudes, dtype=np.float64), MIN_LONGITUDE, MAX_LONGITUDE
+    )
+    latitudes = np.clip(
+        np.asarray(latitudes, dtype=np.float64), MIN_LATITUDE, MAX_LATITUDE
+    )
+
+    z2 = float(1 << resolution)
+    sinlat = np.sin(latitudes * math.pi / 180.0)
+    x = z2 * (longitudes / 360.0 + 0.5)
+    y = z2 * (0.5 - 0.25 * np.log((1 + sinlat) / (1 - sinlat)) / math.pi)
+
+    # Wrap tile x
+    x = np.floor(np.mod(x, z2))
+    y = np.floor(y)
+
+    return tiles_to_cells(x.astype(np.uint64), y.astype(np.uint64), resolution)
+
+
+def tiles_to_cells(x, y, z):
+    """Convert tiles into cells.
+
+    Parameters
+    ----------
+    x : array_like of int
+    y : array_like of int
+    z : int or array_like of int
+
+    Returns
+    -------
+    numpy.ndarray
+        Cells as uint64.
+    """
+    x = np.asarray(x).astype(np.uint64)
+    y = np.asarray(y).astype(np.uint64)
+    z = np.asarray(z).astype(np.uint64)
+
+    x = x << (np.uint64(32) - z)
+    y = y << (np.uint64(32) - z)
+
+    for i in (4, 3, 2, 1, 0):
+        x = (x | (x << U64_S[i])) & U64_B[i]
+        y = (y | (y << U64_S[i])) & U64_B[i]
+
+    return (
+        U64_CELL_HEADER
+        | (z << np.uint64(52))
+        | ((x | (y << np.uint64(1))) >> np.uint64(12))
+        | (U64_FOOTER >> (z * np.uint64(2)))
+    )
+
+
+def cells_to_tiles(cells):
+    """Convert cells into tiles.
+
+    Parameters
+    ----------
+    cells : array_like of int
+
+    Returns
+    -------
+    tuple (x, y, z)
+        Arrays of uint64.
+    """
+    cells = as_cells(cells)
+    z = (cells >> np.uint64(52)) & np.uint64(31)
+    q = (cells & U64_FOOTER) << np.uint64(12)
+    x = q & U64_B[0]
+    y = (q >> np.uint64(1)) & U64_B[0]
+
+    for i in (0, 1, 2, 3, 4):
+        x = (x | (x >> U64_S[i])) & U64_B[i + 1]
+        y = (y | (y >> U64_S[i])) & U64_B[i + 1]
+
+    x = x >> (np.uint64(32) - z)
+    y = y >> (np.uint64(32) - z)
+
+    return x, y, z
+
+
+def cells_to_points(cells):
+    """Convert cells into geographic points, as cell_to_point.
+
+    Parameters
+    ----------
+    cells : array_like of int
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of shape (N, 2) with the longitude and latitude of the
+        center of each cell.
+    """
+    x, y, z = cells_to_tiles(as_cells(cells).ravel())
+    z2 = np.left_shift(1, z.astype(np.int64)).astype(np.float64)
+    longitudes = 180 * (2.0 * (x + 0.5) / z2 - 1.0)
+    expy = np.exp(-(2.0 * (y + 0.5) / z2 - 1) * math.pi)
+    latitudes = 360 * (np.arctan(expy) / math.pi - 0.25)
+    return np.column_stack([longitudes, latitudes])
+
+
+def get_resolutions(indexes):
+    """Get the resolution of indexes.
+
+    Parameters
+    ----------
+    indexes : array_like of int
+
+    Returns
+    -------
+    numpy.ndarray
+        Resolutions as uint64.
+    """
+    return (as_cells(indexes) >> np.uint64(52)) & np.uint64(0x1F)
+
+
+def cells_to_parents(cells, parent_resolution):
+    """Compute the parent cells for a specific resolution.
+
+    Parameters
+    ----------
+    cells : array_like of int
+    parent_resolution : int
+
+    Returns
+    -------
+    numpy.ndarray
+        Parent cells as uint64.
+
+    Raises
+    ------
+    ValueError
+        If the parent resolution is not valid.
+    """
+    cells = as_cells(cells)
+    if parent_resolution < 0 or (
+        cells.size and parent_resolution > get_resolutions(cells).min()
+    ):
+        raise ValueError("Invalid resolution")
+
+    parent_resolution = np.uint64(parent_resolution)
+    return (
+        (cells & U64_RESOLUTION_MASK)
+        | (parent_resolution << np.uint64(52))
+        | (U64_FOOTER >> (parent_resolution << np.uint64(1)))
+    )
+
+
+def cells_contain(parents, cells):
+    """Test if cells are inside any of a set of parent cells.
+
+    A parent contains a cell of its resolution or finer when they share
+    the bits of the parent resolution, so cells are masked to the prefix
+    of each resolution of the parents and searched among them. Cells
+    contain themselves.
+
+    Parameters
+    ----------
+    parents : array_like of int
+        Parent cells, of any resolutions.
+    cells : array_like of int
+
+    Returns
+    -------
+    numpy.ndarray
+        Boolean for each cell.
+    """
+    parents = as_cells(parents).ravel()
+    cells = as_cells(cells)
+    contained = np.zeros(cells.shape, dtype=bool)
+    if not parents.size:
+        return contained
+
+    resolutions = get_resolutions(cells)
+    parent_resolutions = get_resolutions(parents)
+    for resolution in np.unique(parent_resolutions):
+        targets = np.unique(parents[parent_resolutions == resolution])
+        prefixes = (
+            (cells & U64_RESOLUTION_MASK)
+            | (resolution << np.uint64(52))
+            | (U64_FOOTER >> (resolution << np.uint64(1)))
+        )
+        positions = np.minimum(np.searchsorted(targets, prefixes), len(targets) - 1)
+        contained |= (resolutions >= resolution) & (targets[positions] == prefixes)
+    return contained
+
+
+def points_in_cells(longitudes, latitudes, cells):
+    """Test if geographic points are inside any of a set of cells.
+
+    The points are projected once at the finest resolution, and tested
+    against cells of any resolutions as in cells_contain.
+
+    Parameters
+    ----------
+    longitudes : array_like of float
+        Longitudes in decimal degrees.
+    latitudes : array_like of float
+        Latitudes in decimal degrees.
+    cells : array_like of int
+        Cells, of any resolutions.
+
+    Returns
+    -------
+    numpy.ndarray
+        Boolean for each point.
+    """
+    return cells_contain(cells, points_to_cells(longitudes, latitudes, 26))
+
+
+def cells_distances(origins, targets):
+    """Compute the grid distances between pairs of cells, as cell_distance.
+
+    Parameters
+    ----------
+    origins : array_like of int
+    targets : array_like of int
+
+    Returns
+    -------
+    numpy.ndarray
+        Distances as int64.
+
+    Raises
+    ------
+    ValueError
+        If any pair of cells has different resolutions.
+    """
+    dx, dy, _ = cells_offsets(origins, targets)
+    return np.maximum(np.abs(dx), np.abs(dy))
+
+
+def grid_paths(origins, targets):
+    """Compute the cells between pairs of cells, as grid_path.
+
+    The edge crossings of all the lines are sorted at once, so the cells
+    of every path are computed without a loop over the pairs.
+
+    Parameters
+    ----------
+    origins : array_like of int
+    targets : array_like of int
+
+    Returns
+    -------
+    tuple (numpy.ndarray, numpy.ndarray)
+        The concatenated uint64 cells of the paths and the int64 offsets
+        where each path starts, with the total length as last offset.
+
+    Raises
+    ------
+    ValueError
+        If any pair of cells has different resolutions.
+    """
+    dx, dy, (x, y, z) = cells_offsets(origins, targets)
+    x, y, z = x.ravel().astype(np.int64), y.ravel().astype(np.int64), z.ravel()
+    nx = np.abs(dx).ravel()
+    ny = np.abs(dy).ravel()
+    lengths = nx + ny + 1
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    # Crossings of the i-th column edge at (2i + 1) ny and of the j-th row
+    # edge at (2j + 1) nx, with the rows first at corners
+    pairs = np.arange(len(nx))
+    x_pairs = np.repeat(pairs, nx)
+    y_pairs = np.repeat(pairs, ny)
+    x_times = 2 * (np.arange(len(x_pairs)) - np.repeat(np.cumsum(nx) - nx, nx)) + 1
+    y_times = 2 * (np.arange(len(y_pairs)) - np.repeat(np.cumsum(ny) - ny, ny)) + 1
+    step_pairs = np.concatenate([x_pairs, y_pairs])
+    times = np.concatenate([x_times * ny[x_pairs], y_times * nx[y_pairs]])
+    is_x = np.concatenate([np.ones(len(x_pairs), bool), np.zeros(len(y_pairs), bool)])
+    order = np.lexsort((is_x, times, step_pairs))
+
+    # Every path starts at its origin and moves one tile per crossing
+    steps = step_pairs[order]
+    positions = np.arange(len(order)) + steps + 1
+    path_x = np.zeros(offsets[-1], dtype=np.int64)
+    path_y = np.zeros(offsets[-1], dtype=np.int64)
+    path_x[positions] = np.where(is_x[order], np.sign(dx.ravel())[steps], 0)
+    path_y[positions] = np.where(is_x[order], 0, np.sign(dy.ravel())[steps])
+    path_x = np.cumsum(path_x)
+    path_y = np.cumsum(path_y)
+    path_x += np.repeat(x - path_x[offsets[:-1]], lengths)
+    path_y += np.repeat(y - path_y[offsets[:-1]], lengths)
+
+    path_z = np.repeat(z, lengths)
+    z2 = np.left_shift(1, path_z.astype(np.int64))
+    return tiles_to_cells(np.mod(path_x, z2), path_y, path_z), offsets
+
+
+def cells_offsets(origins, targets):
+    """Compute the tile offsets between pairs of cells, as tile_offset.
+
+    Returns
+    -------
+    tuple (dx, dy, origin_tiles)
+        Offsets as int64 and the tiles of the origins.
+    """
+    x0, y0, z0 = cells_to_tiles(origins)
+    x1, y1, z1 = cells_to_tiles(targets)
+    if (z0 != z1).any():
+        raise ValueError("Invalid cells: should have the same resolution")
+
+    z2 = np.left_shift(1, z0.astype(np.int64))
+    half = z2 // 2
+    dx = np.mod(x1.astype(np.int64) - x0.astype(np.int64) + half, z2) - half
+    dy = y1.astype(np.int64) - y0.astype(np.int64)
+    return dx, dy, (x0, y0, z0)
+
+
+def nearest_cells(query_cells, candidate_cells, k=1):
+    """Find the k nearest candidate cells of each query cell.
+
+    The candidates are bucketed by the tile of their center at a coarse
+    resolution. For each query the square ring of tiles around it is
+    doubled until the k-th nearest candidate found is closer than any
+    point outside the ring, so only the candidates of the ring are ranked
+    by great-circle distance between the centers of the cells.
+
+    Parameters
+    ----------
+    query_cells : array_like of int
+    candidate_cells : array_like of int
+        Cells, of any resolutions.
+    k : int, optional
+        Number of nearest cells, by default 1.
+
+    Returns
+    -------
+    tuple (numpy.ndarray, numpy.ndarray)
+        Arrays of shape (Q, k) with the uint64 nearest cells of each query,
+        from the nearest, and their distances in meters.
+
+    Raises
+    ------
+    ValueError
+        If k is not between 1 and the number of candidates.
+    """
+    candidates = as_cells(candidate_cells).ravel()
+    if k < 1 or k > len(candidates):
+        raise ValueError("Invalid k: should be between 1 and the number of cells")
+
+    queries = np.radians(cells_to_points(query_cells))
+    points = cells_to_points(candidates)
+    resolution = min(26, int(math.log(len(candidates), 4)))
+    z2 = 1 << resolution
+    x, y, _ = cells_to_tiles(points_to_cells(points[:, 0], points[:, 1], resolution))
+    keys = y.astype(np.int64) * z2 + x.astype(np.int64)
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    points = np.radians(points[order])
+
+    cells = np.zeros((len(queries), k), dtype=np.uint64)
+    distances = np.zeros((len(queries), k), dtype=np.float64)
+    for i, (longitude, latitude) in enumerate(queries):
+        qx, qy, _ = point_to_tile_fraction(
+            math.degrees(longitude), math.degrees(latitude), resolution
+        )
+        qx, qy = min(int(qx), z2 - 1), min(int(qy), z2 - 1)
+        d = 1
+        while True:
+            indices = ring_candidates(keys, qx, qy, d, z2)
+            if len(indices) >= k:
+                found = haversine(
+                    longitude, latitude, points[indices, 0], points[indices, 1]
+                )
+                nearest = np.argsort(found, kind="stable")[:k]
+                if found[nearest[-1]] <= ring_lower_bound(
+                    longitude, latitude, qx, qy, d, resolution
+                ):
+                    break
+            d *= 2
+        cells[i] = candidates[order[indices[nearest]]]
+        distances[i] = found[nearest] * EARTH_RADIUS
+    return cells, distances
+
+
+def ring_candidates(keys, qx, qy, d, z2):
+    """Find the sorted keys y * z2 + x of the tiles within d of a tile.
+
+    Returns
+    -------
+    numpy.ndarray
+        Indexes of the keys.
+    """
+    if 2 * d + 1 >= z2:
+        ranges = [(0, z2)]
+    elif qx - d < 0:
+        ranges = [(0, qx + d + 1), (qx - d + z2, z2)]
+    elif qx + d >= z2:
+        ranges = [(0, qx + d + 1 - z2), (qx - d, z2)]
+    else:
+        ranges = [(qx - d, qx + d + 1)]
+
+    rows = np.arange(max(qy - d, 0), min(qy + d + 1, z2), dtype=np.int64)
+    bounds = np.concatenate([rows[:, None] * z2 + r for r in ranges], axis=1)
+    positions = np.searchsorted(keys, bounds.reshape(-1, 2))
+    lengths = positions[:, 1] - positions[:, 0]
+    starts = np.repeat(positions[:, 0] - np.cumsum(lengths) + lengths, lengths)
+    return starts + np.arange(lengths.sum())
+
+
+def ring_lower_bound(longitude, latitude, qx, qy, d, resolution):
+    """Compute the angular distance from a point to the outside of a ring.
+
+    The outside of the tiles within d of the tile (qx, qy) is bounded by
+    the parallels of the ring and the meridians of its west and east
+    edges. Returns infinity if the ring covers the world.
+    """
+    z2 = 1 << resolution
+    bound = np.inf
+    if qy - d > 0:
+        north = math.radians(tile_to_latitude((qx, qy - d, resolution), 0))
+        bound = min(bound, north - latitude)
+    if qy + d + 1 < z2:
+        south = math.radians(tile_to_latitude((qx, qy + d + 1, resolution), 0))
+        bound = min(bound, latitude - south)
+    if 2 * d + 1 < z2:
+        # Longitude gap to the nearest edge of the ring, under half a turn
+        west = 2 * math.pi * (qx - d) / z2 - math.pi
+        east = 2 * math.pi * (qx + d + 1) / z2 - math.pi
+        gap = min(longitude - west, east - longitude)
+        if gap < math.pi / 2:
+            meridian = math.asin(math.cos(latitude) * math.sin(gap))
+        else:
+            meridian = math.pi / 2 - abs(latitude)
+        bound = min(bound, meridian)
+    return bound
+
+
+def haversine(longitude, latitude, longitudes, latitudes):
+    """Compute the angular distances from a point to points, in radians."""
+    a = (
+        np.sin((latitudes - latitude) / 2) ** 2
+        + math.cos(latitude)
+        * np.cos(latitudes)
+        * np.sin((longitudes - longitude) / 2) ** 2
+    )
+    return 2 * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def cells_to_hilbert(cells):
+    """Compute the Hilbert curve keys of cells, as cell_to_hilbert.
+
+    Parameters
+    ----------
+    cells : array_like of int
+
+    Returns
+    -------
+    numpy.ndarray
+        Keys as uint64.
+    """
+    x, y, z = cells_to_tiles(cells)
+    shift = np.uint64(26) - z
+
+    # Tiles are moved to resolution 26, whose curve extends the coarser ones
+    x = x << shift
+    y = y << shift
+    n = np.uint64(1 << 26)
+    position = np.zeros(x.shape, dtype=np.uint64)
+    for level in range(25, -1, -1):
+        s = np.uint64(1 << level)
+        rx = (x & s) != 0
+        ry = (y & s) != 0
+        position += (s * s) * ((3 * rx) ^ ry).astype(np.uint64)
+        x, y = hilbert_rotate(n, x, y, rx, ry)
+
+    shift = shift << np.uint64(1)
+    return ((position >> shift) << (shift + np.uint64(5))) | z
+
+
+def hilbert_to_cells(keys):
+    """Convert Hilbert curve keys into cells, as hilbert_to_cell.
+
+    Parameters
+    ----------
+    keys : array_like of int
+
+    Returns
+    -------
+    numpy.ndarray
+        Cells as uint64.
+
+    Raises
+    ------
+    ValueError
+        If any key is not valid.
+    """
+    keys = as_cells(keys)
+    z = keys & np.uint64(0x1F)
+    shift = (np.uint64(26) - np.minimum(z, np.uint64(26))) << np.uint64(1)
+    position = keys >> np.uint64(5)
+    if (
+        (z > 26).any()
+        or (keys >> np.uint64(57)).any()
+        or (position & ((np.uint64(1) << shift) - np.uint64(1))).any()
+    ):
+        raise ValueError("Invalid Hilbert key")
+
+    x = np.zeros(keys.shape, dtype=np.uint64)
+    y = np.zeros(keys.shape, dtype=np.uint64)
+    for level in range(26):
+        s = np.uint64(1 << level)
+        rx = (position >> np.uint64(1)) & np.uint64(1)
+        ry = (position ^ rx) & np.uint64(1)
+        x, y = hilbert_rotate(s, x, y, rx == 1, ry == 1)
+        x += s * rx
+        y += s * ry
+        position >>= np.uint64(2)
+
+    shift = shift >> np.uint64(1)
+    return tiles_to_cells(x >> shift, y >> shift, z)
+
+
+def hilbert_rotate(n, x, y, rx, ry):
+    """Rotate the quadrants of the Hilbert curve of size n."""
+    flip = ~ry & rx
+    x = np.where(flip, n - np.uint64(1) - x, x)
+    y = np.where(flip, n - np.uint64(1) - y, y)
+    return np.where(ry, x, y), np.where(ry, y, x)
+
+
+def indexes_to_strings(indexes):
+    """Convert indexes into their string representation.
+
+    Parameters
+    ----------
+    indexes : array_like of int
+
+    Returns
+    -------
+    numpy.ndarray
+        The hexadecimal representations of the indexes.
+    """
+    nibbles = index_nibbles(as_cells(indexes))
+    strings = HEX_DIGITS[nibbles].view("S16")[..., 0].astype("U16")
+    if nibbles[..., 0].all():
+        return strings
+    strings = np.char.lstrip(strings, "0")
+    strings[strings == ""] = "0"
+    return strings
+
+
+def hex_buffers(indexes):
+    """Compute the hexadecimal representations of indexes as string buffers.
+
+    Parameters
+    ----------
+    indexes : numpy.ndarray
+        One-dimensional uint64 array.
+
+    Returns
+    -------
+    tuple (numpy.ndarray, numpy.ndarray)
+        The concatenated ASCII digits and the int32 offsets where each
+        representation starts, as in Arrow string columns.
+    """
+    nibbles = index_nibbles(indexes)
+    digits = HEX_DIGITS[nibbles]
+
+    # Leading zeros are dropped, keeping at least one digit
+    nonzero = nibbles != 0
+    nonzero[:, -1] = True
+    leading = np.argmax(nonzero, axis=1)
+    offsets = np.zeros(len(indexes) + 1, dtype=np.int32)
+    np.cumsum(16 - leading, out=offsets[1:])
+
+    if not leading.any():
+        return digits.ravel(), offsets
+    return digits[np.arange(16) >= leading[:, np.newaxis]], offsets
+
+
+def index_nibbles(indexes):
+    """Split indexes into their 16 hexadecimal digits, most significant first."""
+    shifts = np.arange(60, -4, -4, dtype=np.uint64)
+    return (indexes[..., np.newaxis] >> shifts) & np.uint64(0xF)
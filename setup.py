@@ -1,5 +1,5 @@
 import os
-from setuptools import find_packages, setup
+from setuptools import Extension, find_packages, setup
 
 here = os.path.abspath(os.path.dirname(__file__))
 
@@ -30,8 +30,17 @@ setup(
     url="https://github.com/cartodb/quadbin-py",
     license="BSD 3-Clause",
     packages=find_packages(include=["quadbin"]),
+    # Compiled speedups, skipped with a warning if they can not be built
+    ext_modules=[
+        Extension("quadbin._speedups", ["quadbin/_speedups.c"], optional=True)
+    ],
     python_requires=">=2.7",
     install_requires=[],
+    extras_require={
+        "numpy": ["numpy"],
+        "arrow": ["numpy", "pyarrow"],
+        "numba": ["numpy", "numba"],
+    },
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Intended Audience :: Developers",
@@ -0,0 +1,103 @@
+import json
+import math
+import random
+import tracemalloc
+
+import pytest
+import quadbin
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BATCH_SIZE = 10000
+
+
+def circle(longitude, latitude, radius, vertices):
+    ring = [
+        [
+            longitude + radius * math.cos(2 * math.pi * i / vertices),
+            latitude + radius * math.sin(2 * math.pi * i / vertices),
+        ]
+        for i in range(vertices)
+    ]
+    return ring + [ring[0]]
+
+
+@pytest.fixture(scope="session")
+def points():
+    rand = random.Random(0)
+    longitudes = [rand.uniform(-10.0, 5.0) for _ in range(BATCH_SIZE)]
+    latitudes = [rand.uniform(36.0, 44.0) for _ in range(BATCH_SIZE)]
+    return longitudes, latitudes
+
+
+@pytest.fixture(scope="session")
+def cells(points):
+    return [quadbin.point_to_cell(lon, lat, 17) for lon, lat in zip(*points)]
+
+
+@pytest.fixture(scope="session")
+def geometries():
+    rand = random.Random(0)
+    line = [
+        [-9.0 + 12.0 * i / 999, 40.0 + rand.uniform(-0.5, 0.5)] for i in range(1000)
+    ]
+    line_small = [
+        [-3.7 + 0.05 * i / 99, 40.4 + rand.uniform(-0.005, 0.005)] for i in range(100)
+    ]
+    geometries = {
+        "point": {"type": "Point", "coordinates": [-3.7038, 40.4168]},
+        "line": {"type": "LineString", "coordinates": line},
+        "line_small": {"type": "LineString", "coordinates": line_small},
+        "polygon": {"type": "Polygon", "coordinates": [circle(-3.7, 40.4, 1.0, 2000)]},
+        "polygon_small": {
+            "type": "Polygon",
+            "coordinates": [circle(-3.7, 40.4, 0.01, 200)],
+        },
+        "polygon_holes": {
+            "type": "Polygon",
+            "coordinates": [
+                circle(-3.7, 40.4, 0.05, 200),
+                circle(-3.72, 40.4, 0.01, 50)[::-1],
+                circle(-3.68, 40.41, 0.01, 50)[::-1],
+            ],
+        },
+    }
+    return dict((name, json.dumps(geometry)) for name, geometry in geometries.items())
+
+
+@pytest.fixture
+def run(benchmark):
+    """Benchmark a function, recording its peak memory and throughput.
+
+    The peak memory traced by tracemalloc in an extra run, the process
+    peak RSS and the items processed per second are stored in the
+    benchmark extra info, so they are saved and compared across commits
+    with --benchmark-autosave and --benchmark-compare.
+    """
+
+    def run(function, *args, **kwargs):
+        items = kwargs.pop("items", 1)
+
+        tracemalloc.start()
+        function(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        result = benchmark(function, *args, **kwargs)
+
+        benchmark.extra_info["items"] = items
+        benchmark.extra_info["peak_memory_bytes"] = peak
+        if benchmark.stats is not None:
+            benchmark.extra_info["throughput_per_second"] = (
+                items / benchmark.stats.stats.mean
+            )
+        if resource is not None:
+            benchmark.extra_info["peak_rss_kb"] = resource.getrusage(
+                resource.RUSAGE_SELF
+            ).ru_maxrss
+        return result
+
+    return run
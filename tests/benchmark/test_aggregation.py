@@ -0,0 +1,23 @@
+import pytest
+import quadbin
+
+
+@pytest.mark.parametrize("agg", ["count", "mean"])
+def test_bin_points(run, points, agg):
+    longitudes, latitudes = points
+    weights = latitudes
+    run(quadbin.bin_points, longitudes, latitudes, 15, weights, agg, items=len(weights))
+
+
+def test_bin_points_chunked(run, points):
+    longitudes, latitudes = points
+    chunks = [
+        (longitudes[start:stop], latitudes[start:stop])
+        for start, stop in zip(range(0, 10000, 1000), range(1000, 10001, 1000))
+    ]
+    run(quadbin.bin_points_chunked, chunks, 15, items=len(longitudes))
+
+
+def test_build_pyramid(run, points):
+    cells, values = quadbin.bin_points(points[0], points[1], 20)
+    run(quadbin.build_pyramid, cells, values, 0, items=len(cells))
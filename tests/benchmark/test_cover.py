@@ -0,0 +1,39 @@
+import json
+
+import pytest
+import quadbin
+
+# The large line and polygon stop at the resolutions where their covers
+# take seconds, and smaller geometries extend the range to 20
+WORKLOADS = [
+    ("point", [5, 10, 15, 20]),
+    ("line", [5, 10, 15]),
+    ("line_small", [17, 20]),
+    ("polygon", [5, 10, 13]),
+    ("polygon_small", [15, 17, 20]),
+    ("polygon_holes", [5, 10, 15, 20]),
+]
+
+
+@pytest.mark.parametrize(
+    "name,resolution",
+    [
+        (name, resolution)
+        for name, resolutions in WORKLOADS
+        for resolution in resolutions
+    ],
+)
+def test_geometry_to_cells(run, geometries, name, resolution):
+    geometry = geometries[name]
+    items = len(quadbin.geometry_to_cells(geometry, resolution))
+    run(quadbin.geometry_to_cells, geometry, resolution, items=items)
+
+
+@pytest.mark.parametrize("resolution", [10, 13])
+def test_update_cover(run, geometries, resolution):
+    previous_geometry = geometries["polygon"]
+    geometry = json.loads(previous_geometry)
+    geometry["coordinates"][0][500] = [-3.2, 40.4]
+    geometry = json.dumps(geometry)
+    cells = set(quadbin.geometry_to_cells(previous_geometry, resolution))
+    run(quadbin.update_cover, cells, previous_geometry, geometry, resolution)
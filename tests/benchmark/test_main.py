@@ -32,3 +32,66 @@ def old_cell_to_children(cell, children_resolution):
             children.append(quadbin.tile_to_cell((x, y, children_resolution)))
 
     return children
+
+
+CELL = 5209574053332910079
+
+
+@pytest.mark.parametrize(
+    "function,args",
+    [
+        (quadbin.is_valid_index, (CELL,)),
+        (quadbin.is_valid_cell, (CELL,)),
+        (quadbin.cell_to_tile, (CELL,)),
+        (quadbin.tile_to_cell, ((9, 8, 4),)),
+        (quadbin.cell_to_point, (CELL,)),
+        (quadbin.point_to_cell, (-3.7038, 40.4168, 10)),
+        (quadbin.cell_to_boundary, (CELL,)),
+        (quadbin.cell_to_bounding_box, (CELL,)),
+        (quadbin.get_resolution, (CELL,)),
+        (quadbin.index_to_string, (CELL,)),
+        (quadbin.string_to_index, ("484c1fffffffffff",)),
+        (quadbin.cell_sibling, (CELL, "right")),
+        (quadbin.cell_to_parent, (CELL, 2)),
+        (quadbin.cell_area, (CELL,)),
+    ],
+    ids=lambda value: getattr(value, "__name__", ""),
+)
+def test_scalar(run, function, args):
+    run(function, *args)
+
+
+def test_point_to_cell_batch(run, points):
+    def point_to_cells(longitudes, latitudes):
+        return [
+            quadbin.point_to_cell(lon, lat, 17)
+            for lon, lat in zip(longitudes, latitudes)
+        ]
+
+    run(point_to_cells, *points, items=len(points[0]))
+
+
+def test_cell_to_tile_batch(run, cells):
+    def cell_to_tiles(cells):
+        return [quadbin.cell_to_tile(cell) for cell in cells]
+
+    run(cell_to_tiles, cells, items=len(cells))
+
+
+def test_tile_to_cell_batch(run, cells):
+    tiles = [quadbin.cell_to_tile(cell) for cell in cells]
+
+    def tile_to_cells(tiles):
+        return [quadbin.tile_to_cell(tile) for tile in tiles]
+
+    run(tile_to_cells, tiles, items=len(tiles))
+
+
+@pytest.mark.parametrize("k", [1, 5, 10, 50])
+def test_k_ring(run, k):
+    run(quadbin.k_ring, 5234261499580514303, k, items=(2 * k + 1) ** 2)
+
+
+@pytest.mark.parametrize("k", [1, 5, 10, 50])
+def test_k_ring_distances(run, k):
+    run(quadbin.k_ring_distances, 5234261499580514303, k, items=(2 * k + 1) ** 2)
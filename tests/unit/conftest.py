@@ -0,0 +1,6 @@
+import sys
+
+collect_ignore = []
+if sys.version_info < (3,):
+    # quadbin.aio uses the async syntax of Python 3
+    collect_ignore.append("test_aio.py")
@@ -0,0 +1,107 @@
+import random
+
+import pytest
+import quadbin
+from quadbin import aggregation
+
+LONGITUDES = [-3.7038, -3.7039, -3.7038, 2.1734]
+LATITUDES = [40.4168, 40.4169, 40.4168, 41.3851]
+WEIGHTS = [1.0, 2.0, 6.0, 4.0]
+MADRID = quadbin.point_to_cell(-3.7038, 40.4168, 10)
+BARCELONA = quadbin.point_to_cell(2.1734, 41.3851, 10)
+
+
+@pytest.mark.parametrize(
+    "agg,expected",
+    [
+        ("count", [3, 1]),
+        ("sum", [9.0, 4.0]),
+        ("mean", [3.0, 4.0]),
+        ("min", [1.0, 4.0]),
+        ("max", [6.0, 4.0]),
+    ],
+)
+def test_bin_points(agg, expected):
+    cells, values = quadbin.bin_points(LONGITUDES, LATITUDES, 10, WEIGHTS, agg)
+    assert cells == sorted([MADRID, BARCELONA])
+    assert dict(zip(cells, values)) == {MADRID: expected[0], BARCELONA: expected[1]}
+
+
+def test_bin_points_without_weights():
+    cells, values = quadbin.bin_points(LONGITUDES, LATITUDES, 10, agg="sum")
+    assert dict(zip(cells, values)) == {MADRID: 3, BARCELONA: 1}
+    with pytest.raises(ValueError, match="Invalid aggregation"):
+        quadbin.bin_points(LONGITUDES, LATITUDES, 10, agg="median")
+    with pytest.raises(ValueError, match="Invalid resolution"):
+        quadbin.bin_points(LONGITUDES, LATITUDES, 27)
+
+
+def test_bin_points_chunked():
+    chunks = [
+        (LONGITUDES[:2], LATITUDES[:2], WEIGHTS[:2]),
+        (LONGITUDES[2:], LATITUDES[2:], WEIGHTS[2:]),
+    ]
+    for agg in ("count", "sum", "mean", "min", "max"):
+        assert quadbin.bin_points_chunked(chunks, 10, agg) == quadbin.bin_points(
+            LONGITUDES, LATITUDES, 10, WEIGHTS, agg
+        )
+
+
+@pytest.mark.parametrize("backend", ["default", "python"])
+def test_bin_points_lengths(backend, monkeypatch):
+    if backend == "python":
+        monkeypatch.setattr(aggregation, "np", None)
+    for longitudes, latitudes, weights in (
+        (LONGITUDES[:-1], LATITUDES, WEIGHTS),
+        (LONGITUDES, LATITUDES[:-1], None),
+        (LONGITUDES, LATITUDES, WEIGHTS[:-1]),
+    ):
+        with pytest.raises(ValueError, match="Invalid points"):
+            quadbin.bin_points(longitudes, latitudes, 10, weights, "sum")
+    chunks = [(LONGITUDES[:2], LATITUDES[:2]), (LONGITUDES[1:], LATITUDES[2:])]
+    with pytest.raises(ValueError, match="Invalid points"):
+        quadbin.bin_points_chunked(chunks, 10)
+
+
+@pytest.mark.parametrize("agg", ["count", "sum", "mean", "min", "max"])
+def test_bin_points_numpy(agg, monkeypatch):
+    pytest.importorskip("numpy")
+    rand = random.Random(0)
+    longitudes = [rand.uniform(-200, 200) for _ in range(2000)]
+    latitudes = [rand.uniform(-90, 90) for _ in range(2000)]
+    weights = [rand.randint(-5, 5) for _ in range(2000)]
+    expected = quadbin.bin_points(longitudes, latitudes, 4, weights, agg)
+    chunks = [(longitudes[:500], latitudes[:500]), (longitudes[500:], latitudes[500:])]
+    expected_chunked = quadbin.bin_points_chunked(chunks, 4, agg)
+
+    monkeypatch.setattr(aggregation, "np", None)
+    assert quadbin.bin_points(longitudes, latitudes, 4, weights, agg) == expected
+    assert quadbin.bin_points_chunked(chunks, 4, agg) == expected_chunked
+
+
+def test_build_pyramid():
+    cells = sorted(quadbin.cell_to_children(5209574053332910079, 6))
+    values = list(range(len(cells)))
+    pyramid = quadbin.build_pyramid(cells, values, 3, "sum")
+    assert sorted(pyramid) == [3, 4, 5]
+    assert pyramid[4] == ([5209574053332910079], [sum(values)])
+    assert pyramid[3] == ([quadbin.cell_to_parent(5209574053332910079, 3)], [120])
+    children = sorted(quadbin.cell_to_children(5209574053332910079, 5))
+    assert pyramid[5][0] == children
+    assert pyramid[5][1] == [
+        sum(v for c, v in zip(cells, values) if quadbin.cell_to_parent(c, 5) == child)
+        for child in children
+    ]
+    assert quadbin.build_pyramid(cells, values, 4, "count")[4][1] == [16]
+    assert quadbin.build_pyramid(cells, values, 4, "mean")[4][1] == [7.5]
+    assert quadbin.build_pyramid(cells, values, 4, "max")[4][1] == [15]
+    with pytest.raises(ValueError, match="Invalid resolution"):
+        quadbin.build_pyramid(cells, values, 7)
+    with pytest.raises(ValueError, match="Invalid order"):
+        quadbin.build_pyramid(cells[::-1], values, 4)
+    # Arguments are validated even without cells
+    for min_res in (-1, 27):
+        with pytest.raises(ValueError, match="Invalid resolution"):
+            quadbin.build_pyramid([], [], min_res)
+    with pytest.raises(ValueError, match="Invalid aggregation"):
+        quadbin.build_pyramid([], [], 4, "median")
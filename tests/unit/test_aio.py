@@ -0,0 +1,116 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import quadbin
+
+asyncio = pytest.importorskip("asyncio")
+aio = pytest.importorskip("quadbin.aio")
+
+POLYGON = json.dumps(
+    {
+        "type": "Polygon",
+        "coordinates": [
+            [
+                [-3.71, 40.41],
+                [-3.6, 40.45],
+                [-3.55, 40.38],
+                [-3.65, 40.35],
+                [-3.71, 40.41],
+            ],
+            [[-3.66, 40.4], [-3.62, 40.41], [-3.63, 40.38], [-3.66, 40.4]],
+        ],
+    }
+)
+
+
+def counting_executor():
+    executor = ThreadPoolExecutor(max_workers=1)
+    executor.submitted = 0
+    submit = executor.submit
+
+    def counted_submit(*args, **kwargs):
+        executor.submitted += 1
+        return submit(*args, **kwargs)
+
+    executor.submit = counted_submit
+    return executor
+
+
+@pytest.mark.parametrize(
+    "geometry",
+    [
+        POLYGON,
+        json.dumps({"type": "Point", "coordinates": [-3.7, 40.4]}),
+        json.dumps(
+            {
+                "type": "MultiPolygon",
+                "coordinates": [
+                    [[[179, -1], [-179, -1], [-179, 1], [179, 1], [179, -1]]],
+                    [[[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]]],
+                ],
+            }
+        ),
+        json.dumps(
+            {
+                "type": "GeometryCollection",
+                "geometries": [
+                    json.loads(POLYGON),
+                    {"type": "Point", "coordinates": [0, 0]},
+                ],
+            }
+        ),
+    ],
+)
+def test_geometry_to_cells(geometry):
+    expected = sorted(quadbin.geometry_to_cells(geometry, 14))
+    with counting_executor() as executor:
+        cells = asyncio.run(
+            aio.geometry_to_cells(geometry, 14, executor, chunk_size=16)
+        )
+    assert sorted(cells) == expected
+    assert len(cells) == len(expected)
+
+
+def test_geometry_to_cells_chunks():
+    with counting_executor() as executor:
+        cells = asyncio.run(aio.geometry_to_cells(POLYGON, 14, executor, chunk_size=16))
+    assert executor.submitted > 1
+    assert len(cells) > 16
+
+
+def test_geometry_to_cells_cancel():
+    executor = counting_executor()
+
+    async def cancel():
+        task = asyncio.ensure_future(
+            aio.geometry_to_cells(POLYGON, 16, executor, chunk_size=1)
+        )
+        while not executor.submitted:
+            await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel())
+    executor.shutdown()
+    expected = 0
+    for job in aio.cover_jobs(json.loads(POLYGON), 16, 1):
+        job()
+        expected += 1
+    assert executor.submitted < expected
+
+
+def test_cells_to_boundaries():
+    cells = quadbin.geometry_to_cells(POLYGON, 12)
+    boundaries = asyncio.run(aio.cells_to_boundaries(cells, chunk_size=3))
+    assert boundaries == [quadbin.cell_to_boundary(cell) for cell in cells]
+    boundaries = asyncio.run(aio.cells_to_boundaries(iter(cells), geojson=True))
+    assert boundaries == [quadbin.cell_to_boundary(cell, True) for cell in cells]
+
+
+def test_map_chunks():
+    assert asyncio.run(aio.map_chunks(str, range(5), chunk_size=2)) == list("01234")
+    assert asyncio.run(aio.map_chunks(str, [])) == []
+    with pytest.raises(ValueError, match="Invalid chunk size"):
+        asyncio.run(aio.map_chunks(str, [], chunk_size=0))
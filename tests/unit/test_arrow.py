@@ -0,0 +1,61 @@
+import pytest
+import quadbin
+
+pa = pytest.importorskip("pyarrow")
+arrow = pytest.importorskip("quadbin.arrow")
+
+CELLS = [5209574053332910079, 5234261499580514303]
+
+
+def test_point_to_cell():
+    longitudes = pa.array([-3.7038, None, 33.75])
+    latitudes = pa.array([40.4168, 0.0, -11.178401873711776])
+    cells = arrow.point_to_cell(longitudes, latitudes, 4)
+    assert cells.type == pa.uint64()
+    assert cells.to_pylist() == [
+        quadbin.point_to_cell(-3.7038, 40.4168, 4),
+        None,
+        5209574053332910079,
+    ]
+    with pytest.raises(ValueError, match="Invalid resolution"):
+        arrow.point_to_cell(longitudes, latitudes, 27)
+
+
+def test_point_to_cell_chunked():
+    longitudes = pa.chunked_array([[-3.7038, 33.75], [2.1734]])
+    latitudes = pa.chunked_array([[40.4168], [-11.17840187, 41.3851]])
+    cells = arrow.point_to_cell(longitudes, latitudes, 10)
+    assert isinstance(cells, pa.ChunkedArray)
+    assert cells.to_pylist() == [
+        quadbin.point_to_cell(-3.7038, 40.4168, 10),
+        quadbin.point_to_cell(33.75, -11.17840187, 10),
+        quadbin.point_to_cell(2.1734, 41.3851, 10),
+    ]
+
+
+def test_cell_to_parent():
+    cells = pa.array(CELLS + [None], type=pa.uint64())
+    assert arrow.cell_to_parent(cells, 2).to_pylist() == [
+        quadbin.cell_to_parent(CELLS[0], 2),
+        quadbin.cell_to_parent(CELLS[1], 2),
+        None,
+    ]
+    assert arrow.cell_to_parent(cells.slice(1), 10).to_pylist() == [CELLS[1], None]
+    with pytest.raises(ValueError, match="Invalid resolution"):
+        arrow.cell_to_parent(cells, 5)
+
+
+def test_cell_to_tile():
+    tiles = arrow.cell_to_tile(pa.chunked_array([pa.array(CELLS, type=pa.int64())]))
+    assert tiles.to_pylist() == [
+        dict(zip("xyz", quadbin.cell_to_tile(cell))) for cell in CELLS
+    ]
+
+
+def test_index_to_string():
+    assert arrow.index_to_string(pa.array(CELLS + [None, 255])).to_pylist() == [
+        quadbin.index_to_string(CELLS[0]),
+        quadbin.index_to_string(CELLS[1]),
+        None,
+        "ff",
+    ]
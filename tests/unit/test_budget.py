@@ -0,0 +1,69 @@
+import json
+
+import pytest
+import quadbin
+
+RING = [
+    [-3.72, 40.40],
+    [-3.69, 40.40],
+    [-3.68, 40.42],
+    [-3.70, 40.43],
+    [-3.72, 40.42],
+    [-3.72, 40.40],
+]
+
+
+def polygon(*rings):
+    return json.dumps({"type": "Polygon", "coordinates": list(rings)})
+
+
+def expand(cells, resolution):
+    tiles = set()
+    for cell in cells:
+        if quadbin.get_resolution(cell) < resolution:
+            tiles.update(quadbin.cell_to_children(cell, resolution))
+        else:
+            tiles.add(cell)
+    return tiles
+
+
+def test_cover_with_budget():
+    geometry = polygon(RING)
+    full = set(quadbin.geometry_to_cells(geometry, 17))
+    for max_cells in [50, 200, 1000]:
+        cells = quadbin.cover_with_budget(geometry, max_cells, 8, 17)
+        assert len(cells) <= max_cells
+        assert len(set(cells)) == len(cells)
+        assert all(8 <= quadbin.get_resolution(cell) <= 17 for cell in cells)
+        assert expand(cells, 17) >= full
+    # Finer cells with a larger budget
+    assert max(map(quadbin.get_resolution, cells)) == 17
+
+
+def test_cover_with_budget_exact():
+    # Without limit, the cover is the compacted cover of max_res
+    for geometry in [
+        polygon(RING),
+        json.dumps({"type": "LineString", "coordinates": RING}),
+        json.dumps(
+            {
+                "type": "GeometryCollection",
+                "geometries": [
+                    {"type": "Point", "coordinates": [-3.6, 40.5]},
+                    {"type": "Polygon", "coordinates": [RING]},
+                ],
+            }
+        ),
+    ]:
+        cells = quadbin.cover_with_budget(geometry, 10**6, 10, 16)
+        assert expand(cells, 16) == set(quadbin.geometry_to_cells(geometry, 16))
+
+
+def test_cover_with_budget_invalid():
+    geometry = polygon(RING)
+    with pytest.raises(ValueError, match="Invalid budget"):
+        quadbin.cover_with_budget(geometry, 0, 0, 10)
+    with pytest.raises(ValueError, match="Invalid resolutions"):
+        quadbin.cover_with_budget(geometry, 10, 10, 5)
+    with pytest.raises(ValueError, match="Invalid budget"):
+        quadbin.cover_with_budget(geometry, 10, 17, 20)
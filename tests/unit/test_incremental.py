@@ -0,0 +1,76 @@
+import json
+
+import pytest
+import quadbin
+
+RING = [
+    [-3.72, 40.40],
+    [-3.69, 40.40],
+    [-3.68, 40.42],
+    [-3.70, 40.43],
+    [-3.72, 40.42],
+    [-3.72, 40.40],
+]
+HOLE = [[-3.71, 40.41], [-3.70, 40.41], [-3.70, 40.42], [-3.71, 40.41]]
+
+
+def polygon(*rings):
+    return json.dumps({"type": "Polygon", "coordinates": list(rings)})
+
+
+def check_update(previous_geometry, geometry, resolution):
+    previous_cells = set(quadbin.geometry_to_cells(previous_geometry, resolution))
+    cells = set(quadbin.geometry_to_cells(geometry, resolution))
+    added, removed = quadbin.update_cover(
+        previous_cells, previous_geometry, geometry, resolution
+    )
+    assert sorted(added) == sorted(cells - previous_cells)
+    assert sorted(removed) == sorted(previous_cells - cells)
+
+
+@pytest.mark.parametrize("resolution", [12, 15, 17])
+def test_update_cover_moved_vertex(resolution):
+    ring = [list(point) for point in RING]
+    ring[2] = [-3.67, 40.425]
+    check_update(polygon(RING, HOLE), polygon(ring, HOLE), resolution)
+
+
+@pytest.mark.parametrize("resolution", [12, 15, 17])
+def test_update_cover_inserted_and_removed_vertex(resolution):
+    ring = RING[:3] + [[-3.685, 40.435]] + RING[3:]
+    check_update(polygon(RING, HOLE), polygon(ring, HOLE), resolution)
+    check_update(polygon(ring), polygon(RING), resolution)
+
+
+def test_update_cover_first_vertex():
+    ring = [[-3.725, 40.395]] + RING[1:-1] + [[-3.725, 40.395]]
+    check_update(polygon(RING), polygon(ring), 16)
+
+
+@pytest.mark.parametrize("resolution", [4, 8, 10])
+def test_update_cover_antimeridian(resolution):
+    ring = [[170, 10], [-170, 10], [-170, 20], [170, 20], [170, 10]]
+    moved = [list(point) for point in ring]
+    moved[3] = [171, 21]
+    check_update(polygon(ring), polygon(moved), resolution)
+    moved[2] = [-179.5, 21]
+    check_update(polygon(ring), polygon(moved), resolution)
+
+
+def test_update_cover_pole():
+    ring = [[124.3, -17.1], [177.8, -7.8], [-92.3, -3.4], [85.6, 13.3]]
+    ring += [[106.3, 16.9], [-134.6, 5.6], [124.3, -17.1]]
+    moved = [list(point) for point in ring]
+    moved[1] = [-84.8, -7.9]
+    check_update(polygon(ring), polygon(moved), 8)
+
+
+def test_update_cover_fallback():
+    check_update(polygon(RING, HOLE), polygon(RING), 15)
+    line = json.dumps({"type": "LineString", "coordinates": RING})
+    check_update(polygon(RING), line, 15)
+
+
+def test_update_cover_unchanged():
+    cells = quadbin.geometry_to_cells(polygon(RING), 15)
+    assert quadbin.update_cover(cells, polygon(RING), polygon(RING), 15) == ([], [])
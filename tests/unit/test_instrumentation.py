@@ -0,0 +1,71 @@
+import json
+import threading
+
+import pytest
+import quadbin
+from quadbin import instrumentation, tilecover
+
+RING = [[-3.71, 40.41], [-3.6, 40.45], [-3.55, 40.38], [-3.65, 40.35], [-3.71, 40.41]]
+POLYGON = {"type": "Polygon", "coordinates": [RING]}
+LINE = {"type": "LineString", "coordinates": RING}
+
+
+@pytest.fixture(autouse=True, params=["default", "python"])
+def backend(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(tilecover, "JIT_BACKEND", [None])
+    return request.param
+
+
+def test_instrument():
+    exported = []
+    with quadbin.instrument(exported.append) as stats:
+        cells = quadbin.geometry_to_cells(json.dumps(POLYGON), 17)
+        assert instrumentation.active_recorders() == [stats]
+    assert instrumentation.active_recorders() == []
+    assert exported == [stats]
+
+    counts = stats["counts"]
+    assert counts["calls"] == 1
+    assert counts["vertices"] == 5
+    assert counts["cells"] == len(cells) == stats["peaks"]["cells"]
+    assert counts["boundary_tiles"] > 0 and counts["filled_cells"] > 0
+    tiles_hashes = counts["boundary_tiles"] + counts["filled_cells"]
+    assert tiles_hashes == stats["peaks"]["tiles_hashes"]
+    assert tiles_hashes - counts["duplicates"] == len(cells)
+    assert sorted(stats["timings"]) == sorted(instrumentation.STAGES)
+    assert all(stats["timings"][stage] > 0 for stage in ("parse", "boundary", "fill"))
+
+    # Outside of the context nothing is recorded
+    quadbin.geometry_to_cells(json.dumps(POLYGON), 17)
+    assert exported[0]["counts"]["calls"] == 1
+
+
+def test_instrument_collection():
+    collection = {"type": "GeometryCollection", "geometries": [POLYGON, LINE]}
+    with quadbin.instrument() as outer:
+        with quadbin.instrument() as inner:
+            cells = quadbin.geometry_to_cells(json.dumps(collection), 12)
+        superset = quadbin.geometry_to_cells(json.dumps(LINE), 12, simplify="superset")
+
+    assert inner["counts"]["calls"] == 1
+    assert inner["counts"]["vertices"] == 10
+    assert inner["counts"]["cells"] == len(cells)
+    assert inner["counts"]["duplicates"] > 0
+    assert inner["timings"]["simplify"] == 0
+    assert outer["counts"]["calls"] == 2
+    assert outer["timings"]["simplify"] > 0
+    assert outer["peaks"]["cells"] == max(len(cells), len(superset))
+
+
+def test_instrument_threads():
+    def cover():
+        quadbin.geometry_to_cells(json.dumps(POLYGON), 12)
+
+    with quadbin.instrument() as stats:
+        thread = threading.Thread(target=cover)
+        thread.start()
+        thread.join()
+        assert stats["counts"]["calls"] == 0
+        cover()
+    assert stats["counts"]["calls"] == 1
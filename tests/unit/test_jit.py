@@ -0,0 +1,63 @@
+import pytest
+from quadbin import tilecover
+
+pytest.importorskip("numba")
+jit = pytest.importorskip("quadbin.jit")
+
+RING = [[-3.71, 40.41], [-3.6, 40.45], [-3.55, 40.38], [-3.65, 40.35], [-3.71, 40.41]]
+HOLE = [[-3.66, 40.4], [-3.62, 40.41], [-3.63, 40.38], [-3.66, 40.4]]
+ANTIMERIDIAN = [[179, -1], [-179, -1], [-179, 1], [179, 1], [179, -1]]
+POLAR = [[-180, 70], [-60, 70], [60, 70], [180, 70], [-180, 70]]
+NORTH = [[0, 80], [10, 80], [10, 89], [0, 89], [0, 80]]
+STAR = [[0, 10], [6, -8], [-9.5, 3], [9.5, 3], [-6, -8], [0, 10]]
+GEOMETRIES = [
+    {"type": "LineString", "coordinates": RING},
+    {"type": "LineString", "coordinates": [[170, 10, 5], [-170, 12, 5]]},
+    {"type": "MultiLineString", "coordinates": [RING, HOLE]},
+    {"type": "Polygon", "coordinates": [RING]},
+    {"type": "Polygon", "coordinates": [RING, HOLE]},
+    {"type": "Polygon", "coordinates": [ANTIMERIDIAN]},
+    {"type": "Polygon", "coordinates": [POLAR]},
+    {"type": "MultiPolygon", "coordinates": [[RING, HOLE], [ANTIMERIDIAN]]},
+    {"type": "Polygon", "coordinates": []},
+]
+
+
+@pytest.fixture
+def python_get_tiles(monkeypatch):
+    monkeypatch.setattr(tilecover, "JIT_BACKEND", [None])
+    return tilecover.get_tiles
+
+
+@pytest.mark.parametrize("geometry", GEOMETRIES)
+@pytest.mark.parametrize("resolution", [0, 3, 10, 17])
+def test_get_tiles(geometry, resolution, python_get_tiles):
+    tiles = jit.get_tiles(geometry, resolution)
+    assert sorted(tiles) == sorted(python_get_tiles(geometry, resolution))
+    assert len(tiles) == len(set(tiles))
+
+
+@pytest.mark.parametrize("fill_rule", ["evenodd", "nonzero"])
+@pytest.mark.parametrize("rings", [[RING, HOLE], [STAR], [NORTH], [POLAR]])
+def test_get_tiles_fill_rule(rings, fill_rule, python_get_tiles):
+    geometry = {"type": "Polygon", "coordinates": rings}
+    tiles_hashes = tilecover.polygon_cover(rings, 12, fill_rule=fill_rule)
+    expected = tilecover.tiles_hashes_to_tiles(tiles_hashes)
+    assert sorted(jit.get_tiles(geometry, 12, fill_rule)) == sorted(expected)
+
+
+def test_get_tiles_fallback(python_get_tiles):
+    pole = {"type": "LineString", "coordinates": [[0, 0], [0, 90]]}
+    assert jit.get_tiles(pole, 4) is None
+    assert jit.get_tiles({"type": "Point", "coordinates": [0, 0]}, 4) is None
+    assert (
+        jit.get_tiles({"type": "LineString", "coordinates": [[0, 0], [1]]}, 4) is None
+    )
+    with pytest.raises(ZeroDivisionError):
+        python_get_tiles(pole, 4)
+
+
+def test_dispatch(monkeypatch):
+    monkeypatch.setattr(tilecover, "JIT_BACKEND", [])
+    assert tilecover.jit_backend() is jit
+    jit.warm_up()
@@ -1,3 +1,5 @@
+import json
+
 import pytest
 import quadbin
 
@@ -193,6 +195,40 @@ def test_k_ring_distances():
         assert quadbin.k_ring_distances(5209574053332910079, -1)
 
 
+def test_cell_distance():
+    origin = 5209574053332910079
+    for k in range(3):
+        for neighbor in quadbin.k_ring_distances(origin, k):
+            distance = quadbin.cell_distance(origin, neighbor["index"])
+            assert distance == neighbor["distance"]
+    # The longitude wraps around the antimeridian
+    west = quadbin.tile_to_cell((0, 8, 4))
+    east = quadbin.tile_to_cell((15, 10, 4))
+    assert quadbin.cell_distance(west, east) == 2
+    with pytest.raises(ValueError, match="Invalid cells"):
+        quadbin.cell_distance(origin, quadbin.cell_to_parent(origin, 2))
+
+
+def test_grid_path():
+    origin = quadbin.tile_to_cell((9, 8, 4))
+    target = quadbin.tile_to_cell((12, 9, 4))
+    assert quadbin.grid_path(origin, target) == [
+        quadbin.tile_to_cell(tile)
+        for tile in [(9, 8, 4), (10, 8, 4), (10, 9, 4), (11, 9, 4), (12, 9, 4)]
+    ]
+    # Rows first at the corners of the tiles
+    target = quadbin.tile_to_cell((10, 9, 4))
+    assert quadbin.grid_path(origin, target) == [
+        quadbin.tile_to_cell(tile) for tile in [(9, 8, 4), (9, 9, 4), (10, 9, 4)]
+    ]
+    west = quadbin.tile_to_cell((0, 8, 4))
+    east = quadbin.tile_to_cell((15, 8, 4))
+    assert quadbin.grid_path(west, east) == [west, east]
+    assert quadbin.grid_path(origin, origin) == [origin]
+    with pytest.raises(ValueError, match="Invalid cells"):
+        quadbin.grid_path(origin, quadbin.cell_to_parent(origin, 2))
+
+
 def test_cell_sibling():
     # Res 0
     assert quadbin.cell_sibling(5192650370358181887, "up") is None
@@ -342,6 +378,62 @@ def test_cell_to_children():
         assert quadbin.cell_to_children(5209574053332910079, -1)
 
 
+def test_cell_to_key_range():
+    children = quadbin.cell_to_children(5209574053332910079, 6)
+    assert quadbin.cell_to_key_range(5209574053332910079, 6) == (
+        min(children),
+        max(children),
+    )
+    assert quadbin.cell_to_key_range(5209574053332910079, 4) == (
+        5209574053332910079,
+        5209574053332910079,
+    )
+    with pytest.raises(ValueError, match="Invalid resolution"):
+        assert quadbin.cell_to_key_range(5209574053332910079, 3)
+    with pytest.raises(ValueError, match="Invalid resolution"):
+        assert quadbin.cell_to_key_range(5209574053332910079, 27)
+
+
+def test_cells_to_key_ranges():
+    cell = 5209574053332910079
+    children = quadbin.cell_to_children(cell, 5)
+    # Siblings and descendants merge into the range of their parent
+    cells = children + [quadbin.cell_to_children(children[0], 7)[3]]
+    assert quadbin.cells_to_key_ranges(cells, 10) == [
+        quadbin.cell_to_key_range(cell, 10)
+    ]
+    ranges = quadbin.cells_to_key_ranges([children[3], children[0]], 6)
+    assert ranges == [
+        quadbin.cell_to_key_range(children[0], 6),
+        quadbin.cell_to_key_range(children[3], 6),
+    ]
+    assert quadbin.cells_to_key_ranges([], 6) == []
+    for resolution in (-1, 27):
+        with pytest.raises(ValueError, match="Invalid resolution"):
+            quadbin.cells_to_key_ranges([cell], resolution)
+        with pytest.raises(ValueError, match="Invalid resolution"):
+            quadbin.cells_to_key_ranges([], resolution)
+
+
+def test_cell_to_hilbert():
+    # The Hilbert curve of resolution 1 visits the tiles as a U
+    cells = [quadbin.tile_to_cell(tile) for tile in [(0, 0, 1), (0, 1, 1), (1, 1, 1)]]
+    keys = [quadbin.cell_to_hilbert(cell) for cell in cells]
+    assert keys == [1, (1 << 55) | 1, (2 << 55) | 1]
+    assert [quadbin.hilbert_to_cell(key) for key in keys] == cells
+    # Parents sort right before their descendants
+    cell = 5209574053332910079
+    children = quadbin.cell_to_children(cell, 6)
+    keys = sorted(quadbin.cell_to_hilbert(child) for child in children)
+    assert quadbin.cell_to_hilbert(cell) < keys[0]
+    assert keys[-1] < quadbin.cell_to_hilbert(cell) + (1 << 49)
+    assert quadbin.hilbert_to_cell(quadbin.cell_to_hilbert(cell)) == cell
+    with pytest.raises(ValueError, match="Invalid Hilbert key"):
+        quadbin.hilbert_to_cell(27)
+    with pytest.raises(ValueError, match="Invalid Hilbert key"):
+        quadbin.hilbert_to_cell((1 << 40) | 4)
+
+
 def test_geometry_to_cells_point():
     coordinates = [-3.71219873428345, 40.413365349070865]
     geometry = '{{"type":"Point","coordinates":{0}}}'.format(coordinates)
@@ -688,6 +780,140 @@ def test_geometry_to_cells_geometrycollection():
     )
 
 
+def test_geometry_to_cells_antimeridian():
+    polygon = [[[170, -10], [-170, -10], [-170, 10], [170, 10], [170, -10]]]
+    geometry = '{{"type":"Polygon","coordinates":{0}}}'.format(polygon)
+    assert sorted(quadbin.geometry_to_cells(geometry, 5)) == sorted(
+        [
+            quadbin.tile_to_cell((0, 15, 5)),
+            quadbin.tile_to_cell((0, 16, 5)),
+            quadbin.tile_to_cell((31, 15, 5)),
+            quadbin.tile_to_cell((31, 16, 5)),
+        ]
+    )
+    line = [[175, 0], [-175, 1]]
+    geometry = '{{"type":"LineString","coordinates":{0}}}'.format(line)
+    assert sorted(quadbin.geometry_to_cells(geometry, 6)) == sorted(
+        [
+            quadbin.tile_to_cell((0, 31, 6)),
+            quadbin.tile_to_cell((63, 31, 6)),
+            quadbin.tile_to_cell((63, 32, 6)),
+        ]
+    )
+
+
+def test_geometry_to_cells_fill_rule():
+    # The center of the star winds twice, so only nonzero fills it
+    star = [[0, 10], [6, -8], [-9.5, 3], [9.5, 3], [-6, -8], [0, 10]]
+    geometry = json.dumps({"type": "Polygon", "coordinates": [star]})
+    center = quadbin.point_to_cell(0, 0, 8)
+    evenodd = quadbin.geometry_to_cells(geometry, 8)
+    nonzero = quadbin.geometry_to_cells(geometry, 8, fill_rule="nonzero")
+    assert center not in evenodd
+    assert center in nonzero
+    assert set(evenodd) < set(nonzero)
+    assert quadbin.estimate_cover_size(geometry, 8, "nonzero") == len(nonzero)
+    with pytest.raises(ValueError, match="Invalid fill rule"):
+        quadbin.geometry_to_cells(geometry, 8, fill_rule="winding")
+
+
+ESTIMATE_RING = [[-3.72, 40.40], [-3.60, 40.38], [-3.65, 40.47], [-3.72, 40.40]]
+ESTIMATE_HOLE = [[-3.68, 40.41], [-3.65, 40.41], [-3.66, 40.43], [-3.68, 40.41]]
+ESTIMATE_ANTIMERIDIAN = [[170, -10], [-170, -10], [-170, 10], [170, 10], [170, -10]]
+ESTIMATE_POLAR = [[-180, 70], [-60, 70], [60, 70], [180, 70], [-180, 70]]
+
+
+@pytest.mark.parametrize(
+    "geometry, resolutions",
+    [
+        ({"type": "Point", "coordinates": ESTIMATE_RING[0]}, [0, 12, 17]),
+        ({"type": "LineString", "coordinates": ESTIMATE_RING}, [0, 12, 17]),
+        (
+            {"type": "Polygon", "coordinates": [ESTIMATE_RING, ESTIMATE_HOLE]},
+            [0, 5, 12, 17],
+        ),
+        ({"type": "Polygon", "coordinates": [ESTIMATE_ANTIMERIDIAN]}, [0, 3, 8]),
+        ({"type": "Polygon", "coordinates": [ESTIMATE_POLAR]}, [0, 3, 8]),
+        (
+            {
+                "type": "MultiPolygon",
+                "coordinates": [
+                    [ESTIMATE_RING],
+                    [ESTIMATE_HOLE],
+                    [ESTIMATE_ANTIMERIDIAN],
+                ],
+            },
+            [0, 3, 8],
+        ),
+        (
+            {
+                "type": "GeometryCollection",
+                "geometries": [
+                    {"type": "Polygon", "coordinates": [ESTIMATE_RING]},
+                    {"type": "MultiPoint", "coordinates": ESTIMATE_HOLE},
+                    {"type": "LineString", "coordinates": ESTIMATE_ANTIMERIDIAN},
+                ],
+            },
+            [0, 5, 12],
+        ),
+    ],
+)
+def test_estimate_cover_size(geometry, resolutions):
+    geometry = json.dumps(geometry)
+    for resolution in resolutions:
+        assert quadbin.estimate_cover_size(geometry, resolution) == len(
+            quadbin.geometry_to_cells(geometry, resolution)
+        )
+
+
+def test_estimate_cover_size_large():
+    # Boxes have the same cover as bbox_to_cells, counted from its rows
+    geometry = json.dumps({"type": "Polygon", "coordinates": [ESTIMATE_ANTIMERIDIAN]})
+    for resolution in [17, 22]:
+        rows = quadbin.bbox_to_rows(170, -10, -170, 10, resolution)
+        expected = sum(stop - start for _, start, stop in rows)
+        assert quadbin.estimate_cover_size(geometry, resolution) == expected
+    assert quadbin.estimate_cover_size(geometry, 17) == 53304240
+
+
+def test_bbox_to_cells():
+    bbox = [-3.72, 40.40, -3.70, 40.42]
+    polygon = [
+        [[-3.72, 40.40], [-3.70, 40.40], [-3.70, 40.42], [-3.72, 40.42], [-3.72, 40.40]]
+    ]
+    geometry = '{{"type":"Polygon","coordinates":{0}}}'.format(polygon)
+    for resolution in [0, 10, 14, 17]:
+        cells = quadbin.bbox_to_cells(*bbox, resolution=resolution)
+        assert sorted(cells) == sorted(quadbin.geometry_to_cells(geometry, resolution))
+    assert len(quadbin.bbox_to_cells(-180, -90, 180, 90, 4)) == 256
+
+
+def test_bbox_to_cells_antimeridian():
+    assert sorted(quadbin.bbox_to_cells(170, -10, -170, 10, 5)) == sorted(
+        [
+            quadbin.tile_to_cell((0, 15, 5)),
+            quadbin.tile_to_cell((0, 16, 5)),
+            quadbin.tile_to_cell((31, 15, 5)),
+            quadbin.tile_to_cell((31, 16, 5)),
+        ]
+    )
+    assert quadbin.bbox_to_rows(170, -10, -170, 10, 5) == [
+        (15, 31, 32),
+        (15, 0, 1),
+        (16, 31, 32),
+        (16, 0, 1),
+    ]
+    # The whole row when the box wraps inside a single column
+    assert quadbin.bbox_to_rows(10, 1, 9, 2, 2) == [(1, 0, 4)]
+
+
+def test_bbox_to_cells_invalid():
+    with pytest.raises(ValueError, match="Invalid resolution"):
+        quadbin.bbox_to_cells(0, 0, 1, 1, 27)
+    with pytest.raises(ValueError, match="Invalid bounding box"):
+        quadbin.bbox_to_cells(0, 1, 1, 0, 4)
+
+
 def test_cell_area():
     assert quadbin.cell_area(5209574053332910079) == pytest.approx(
         6023040823252.6641, rel=1e-2
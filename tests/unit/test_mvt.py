@@ -0,0 +1,118 @@
+import struct
+from fractions import Fraction
+
+import pytest
+import quadbin
+
+
+def read_varint(data, position):
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if byte < 0x80:
+            return value, position
+
+
+def read_message(data):
+    fields = []
+    position = 0
+    while position < len(data):
+        key, position = read_varint(data, position)
+        field, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, position = read_varint(data, position)
+        elif wire_type == 1:
+            value = struct.unpack_from("<d", data, position)[0]
+            position += 8
+        else:
+            length, position = read_varint(data, position)
+            end = position + length
+            value = data[position:end]
+            position = end
+        fields.append((field, value))
+    return fields
+
+
+def read_packed(data):
+    values = []
+    position = 0
+    while position < len(data):
+        value, position = read_varint(data, position)
+        values.append(value)
+    return values
+
+
+def read_tile(data):
+    layer = read_message(read_message(bytearray(data))[0][1])
+    features = []
+    for field, value in layer:
+        if field == 2:
+            feature = dict(read_message(value))
+            feature[2] = read_packed(feature.get(2, b""))
+            feature[4] = read_packed(feature[4])
+            features.append(feature)
+    values = [read_message(value)[0] for field, value in layer if field == 4]
+    return dict(layer), features, values
+
+
+def test_cells_to_mvt():
+    tile = (9, 8, 4)
+    children = sorted(quadbin.cell_to_children(quadbin.tile_to_cell(tile), 5))
+    outside = quadbin.tile_to_cell((0, 0, 5))
+    data = quadbin.cells_to_mvt(children + [outside], [1, 2, 3.5, 4, 5], tile)
+    layer, features, values = read_tile(data)
+    assert layer[15] == 2
+    assert layer[1] == b"cells"
+    assert layer[3] == b"value"
+    assert layer[5] == 4096
+    assert len(features) == 4
+    # Integers are zigzag encoded
+    assert values == [(6, 2), (3, 3.5), (6, 4), (6, 8)]
+    # Top left child: MoveTo(0, 0), LineTo(+2048, 0), (0, +2048), (-2048, 0), Close
+    top_left = features[0]
+    assert top_left[1] == quadbin.tile_to_cell((18, 16, 5))
+    assert top_left[3] == 3
+    assert top_left[4] == [9, 0, 0, 26, 4096, 0, 0, 4096, 4095, 0, 15]
+
+
+def test_cells_to_mvt_grouping():
+    tile = (9, 8, 4)
+    parent = quadbin.tile_to_cell(tile)
+    cells = sorted(quadbin.cell_to_children(parent, 10))[:8]
+    _, features, values = read_tile(quadbin.cells_to_mvt(cells, [1] * 8, tile, 16))
+    assert len(features) == 1
+    assert 1 not in features[0]
+    assert features[0][4] == [9, 0, 0, 26, 2, 0, 0, 2, 1, 0, 15]
+    assert values == [(6, 16)]
+    _, features, _ = read_tile(quadbin.cells_to_mvt([parent], None, (37, 33, 6)))
+    assert features[0][2] == []
+    assert features[0][4][3:] == [26, 8192, 0, 0, 8192, 8191, 0, 15]
+    with pytest.raises(ValueError, match="Invalid extent"):
+        quadbin.cells_to_mvt(cells, None, tile, 0)
+
+
+def test_cells_to_mvt_values():
+    tile = (9, 8, 4)
+    cells = sorted(quadbin.cell_to_children(quadbin.tile_to_cell(tile), 5))
+    data = quadbin.cells_to_mvt(cells, [True, Fraction(1, 4), -(1 << 63), "a"], tile)
+    _, _, values = read_tile(data)
+    assert values == [(7, 1), (6, (1 << 64) - 1), (3, 0.25), (1, b"a")]
+    with pytest.raises(ValueError, match="Invalid value"):
+        quadbin.cells_to_mvt(cells[:1], [1 << 63], tile)
+    with pytest.raises(ValueError, match="Invalid values"):
+        quadbin.cells_to_mvt(cells, [1, 2, 3], tile)
+    with pytest.raises(ValueError, match="Invalid values"):
+        quadbin.cells_to_mvt(cells[:2], iter([1, 2, 3]), tile)
+
+
+def test_cells_to_mvt_numpy():
+    np = pytest.importorskip("numpy")
+    tile = (9, 8, 4)
+    cells = sorted(quadbin.cell_to_children(quadbin.tile_to_cell(tile), 5))
+    data = quadbin.cells_to_mvt(cells, np.array([1, 2, 3, -4], dtype=np.int64), tile)
+    assert read_tile(data)[2] == [(6, 2), (6, 6), (6, 4), (6, 7)]
+    data = quadbin.cells_to_mvt(cells[:1], np.array([0.5], dtype=np.float32), tile)
+    assert read_tile(data)[2] == [(3, 0.5)]
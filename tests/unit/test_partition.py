@@ -0,0 +1,60 @@
+import pytest
+import quadbin
+
+np = pytest.importorskip("numpy")
+partition = pytest.importorskip("quadbin.partition")
+vectorized = pytest.importorskip("quadbin.vectorized")
+
+
+def skewed_cells(size=20000):
+    # Most cells in two cities and the rest all over the world
+    rng = np.random.default_rng(0)
+    longitudes = np.concatenate(
+        [
+            rng.normal(-3.7, 0.1, size),
+            rng.normal(2.2, 0.1, size),
+            rng.uniform(-180, 180, size),
+        ]
+    )
+    latitudes = np.concatenate(
+        [
+            rng.normal(40.4, 0.1, size),
+            rng.normal(41.4, 0.1, size),
+            rng.uniform(-80, 80, size),
+        ]
+    )
+    return vectorized.points_to_cells(longitudes, latitudes, 16)
+
+
+def test_partition_boundaries():
+    cells = skewed_cells()
+    boundaries = partition.partition_boundaries(cells[::10], 8)
+    assert len(boundaries) == 7
+    counts = np.bincount(partition.assign_partition(cells, boundaries), minlength=8)
+    assert counts.min() > 0.8 * len(cells) / 8
+    assert counts.max() < 1.2 * len(cells) / 8
+    # Boundaries start their partition, and are coarser than the cells
+    assert partition.assign_partition(boundaries, boundaries).tolist() == list(
+        range(1, 8)
+    )
+    assert (vectorized.get_resolutions(boundaries) < 16).all()
+
+
+def test_partition_boundaries_aligned():
+    # Samples of two cells of resolution 4, split at the start of the later one
+    cells = [quadbin.tile_to_cell((12, 2, 4)), quadbin.tile_to_cell((9, 8, 4))]
+    sample = np.array(
+        [child for cell in cells for child in quadbin.cell_to_children(cell, 10)[:100]],
+        dtype=np.uint64,
+    )
+    boundaries = partition.partition_boundaries(sample, 2)
+    assert vectorized.get_resolutions(boundaries).tolist() == [1]
+    assigned = partition.assign_partition(sample, boundaries)
+    assert assigned.tolist() == [0] * 100 + [1] * 100
+
+
+def test_partition_boundaries_invalid():
+    with pytest.raises(ValueError, match="Invalid number of partitions"):
+        partition.partition_boundaries([5209574053332910079], 0)
+    with pytest.raises(ValueError, match="Invalid sample"):
+        partition.partition_boundaries([], 2)
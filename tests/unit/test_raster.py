@@ -0,0 +1,134 @@
+import pytest
+import quadbin
+
+np = pytest.importorskip("numpy")
+raster = pytest.importorskip("quadbin.raster")
+
+TILE = (9, 8, 4)
+CELL = 5209574053332910079
+CHILDREN = sorted(quadbin.cell_to_children(CELL, 6))
+CHILDREN_RASTER = [
+    [0, 1, 4, 5],
+    [2, 3, 6, 7],
+    [8, 9, 12, 13],
+    [10, 11, 14, 15],
+]
+
+
+def test_cells_to_raster_tile():
+    values = np.arange(16.0)
+    assert raster.cells_to_raster(CHILDREN, values, TILE, 4, 4).tolist() == (
+        CHILDREN_RASTER
+    )
+    # Coarser cells fill their pixels
+    assert raster.cells_to_raster([CELL], [5.0], TILE, 2, 3).tolist() == [[5.0] * 2] * 3
+    parent = quadbin.cell_to_parent(CELL, 2)
+    assert (
+        raster.cells_to_raster([parent], [1.0], TILE, 2, 2).tolist() == [[1.0] * 2] * 2
+    )
+    # Cells outside the tile are ignored
+    outside = quadbin.tile_to_cell((0, 0, 4))
+    result = raster.cells_to_raster([outside], [1.0], TILE, 2, 2, nodata=-1)
+    assert result.tolist() == [[-1.0, -1.0], [-1.0, -1.0]]
+
+
+@pytest.mark.parametrize(
+    "agg,expected",
+    [
+        ("count", [[4, 4], [4, 4]]),
+        ("sum", [[6, 22], [38, 54]]),
+        ("mean", [[1.5, 5.5], [9.5, 13.5]]),
+        ("min", [[0, 4], [8, 12]]),
+        ("max", [[3, 7], [11, 15]]),
+    ],
+)
+def test_cells_to_raster_aggregation(agg, expected):
+    values = np.arange(16.0)
+    assert (
+        raster.cells_to_raster(CHILDREN, values, TILE, 2, 2, agg).tolist() == expected
+    )
+
+
+def test_cells_to_raster_bbox():
+    bbox = quadbin.cell_to_bounding_box(CELL)
+    result = raster.cells_to_raster(CHILDREN, np.arange(16.0), bbox, 4, 4)
+    assert result.tolist() == CHILDREN_RASTER
+    with pytest.raises(ValueError, match="Invalid aggregation"):
+        raster.cells_to_raster(CHILDREN, np.arange(16.0), bbox, 4, 4, "median")
+
+
+def test_raster_antimeridian():
+    east = quadbin.tile_to_cell((7, 3, 3))
+    west = quadbin.tile_to_cell((0, 3, 3))
+    xmin, ymin, _, ymax = quadbin.cell_to_bounding_box(east)
+    bbox = (xmin, ymin, quadbin.cell_to_bounding_box(west)[2], ymax)
+    result = raster.cells_to_raster([west, east], [2.0, 1.0], bbox, 4, 1)
+    assert result.tolist() == [[1.0, 1.0, 2.0, 2.0]]
+    children = quadbin.cell_to_children(west, 5) + quadbin.cell_to_children(east, 5)
+    values = [2.0] * 16 + [1.0] * 16
+    result = raster.cells_to_raster(children, values, bbox, 2, 1, "sum")
+    assert result.tolist() == [[16.0, 32.0]]
+
+    cells, values = raster.raster_to_cells([[1.0, 2.0]], bbox, 3)
+    assert cells.tolist() == [west, east] and values.tolist() == [2.0, 1.0]
+    cells, values = raster.raster_to_cells([[1.0, 2.0]], bbox, 4)
+    assert len(cells) == 8 and sorted(values.tolist()) == [1.0] * 4 + [2.0] * 4
+    with pytest.raises(ValueError, match="Invalid bounding box"):
+        raster.cells_to_raster([east], [1.0], (xmin, ymax, xmin + 1, ymin), 4, 1)
+
+
+def test_raster_to_cells_finer_cells():
+    cells, values = raster.raster_to_cells(CHILDREN_RASTER, TILE, 6)
+    assert cells.tolist() == CHILDREN
+    assert values.tolist() == list(range(16))
+    # Every cell takes the pixel of its center
+    cells, values = raster.raster_to_cells([[1, 2], [3, 4]], TILE, 6)
+    assert cells.tolist() == CHILDREN
+    assert values.tolist() == [1, 1, 1, 1, 2, 2, 2, 2, 3, 3, 3, 3, 4, 4, 4, 4]
+
+
+@pytest.mark.parametrize(
+    "agg,expected",
+    [
+        ("count", [4, 4, 4, 4]),
+        ("sum", [6, 22, 38, 54]),
+        ("mean", [1.5, 5.5, 9.5, 13.5]),
+        ("min", [0, 4, 8, 12]),
+        ("max", [3, 7, 11, 15]),
+    ],
+)
+def test_raster_to_cells_aggregation(agg, expected):
+    array = raster.cells_to_raster(CHILDREN, np.arange(16.0), TILE, 4, 4)
+    cells, values = raster.raster_to_cells(array, TILE, 5, agg=agg)
+    assert cells.tolist() == sorted(quadbin.cell_to_children(CELL, 5))
+    assert values.tolist() == expected
+
+
+def test_raster_to_cells_nodata():
+    array = np.array([[np.nan, 1.0], [-1.0, 2.0]])
+    cells, values = raster.raster_to_cells(array, TILE, 4, nodata=-1)
+    assert cells.tolist() == [CELL]
+    assert values.tolist() == [1.5]
+    cells, values = raster.raster_to_cells(array, TILE, 4, nodata=-1, agg="count")
+    assert values.tolist() == [2]
+    cells, values = raster.raster_to_cells(np.full((2, 2), np.nan), TILE, 4)
+    assert cells.tolist() == [] and values.tolist() == []
+
+
+def test_raster_to_cells_mode():
+    array = np.array([[3, 1], [1, 2]], dtype=np.uint8)
+    cells, values = raster.raster_to_cells(array, TILE, 4, agg="mode")
+    assert cells.tolist() == [CELL]
+    assert values.dtype == np.uint8 and values.tolist() == [1]
+
+
+def test_raster_to_cells_roundtrip():
+    bbox = quadbin.cell_to_bounding_box(CELL)
+    array = np.arange(64.0).reshape(8, 8)
+    cells, values = raster.raster_to_cells(array, bbox, 7)
+    assert len(cells) == 64
+    assert raster.cells_to_raster(cells, values, bbox, 8, 8).tolist() == array.tolist()
+    with pytest.raises(ValueError, match="Invalid resolution"):
+        raster.raster_to_cells(array, bbox, 27)
+    with pytest.raises(ValueError, match="Invalid aggregation"):
+        raster.raster_to_cells(array, bbox, 7, agg="median")
@@ -0,0 +1,41 @@
+import io
+import json
+import struct
+
+import quadbin
+
+CELLS = [5209574053332910079, 5234261499580514303]
+
+
+def test_cells_to_geojson():
+    geojson = json.loads(quadbin.cells_to_geojson(CELLS, properties=[{"a": 1}, {}]))
+    assert geojson["type"] == "FeatureCollection"
+    assert [feature["id"] for feature in geojson["features"]] == [
+        "484c1fffffffffff",
+        quadbin.index_to_string(CELLS[1]),
+    ]
+    assert [feature["properties"] for feature in geojson["features"]] == [{"a": 1}, {}]
+    assert [feature["geometry"] for feature in geojson["features"]] == [
+        json.loads(quadbin.cell_to_boundary(cell, geojson=True)) for cell in CELLS
+    ]
+    assert quadbin.cells_to_geojson([]) == b'{"type":"FeatureCollection","features":[]}'
+
+
+def test_cells_to_geojson_file():
+    file = io.BytesIO()
+    assert quadbin.cells_to_geojson(iter(CELLS), file) is None
+    assert file.getvalue() == quadbin.cells_to_geojson(CELLS)
+
+
+def test_cells_to_wkb():
+    wkb = quadbin.cells_to_wkb(CELLS)
+    assert struct.unpack_from("<BII", wkb) == (1, 6, 2)
+    assert len(wkb) == 9 + 2 * 93
+    for i, cell in enumerate(CELLS):
+        polygon = struct.unpack_from("<BIII10d", wkb, 9 + i * 93)
+        assert polygon[:4] == (1, 3, 1, 5)
+        coordinates = [list(point) for point in zip(polygon[4::2], polygon[5::2])]
+        assert coordinates == quadbin.cell_to_boundary(cell)
+    file = io.BytesIO()
+    quadbin.cells_to_wkb(CELLS, file)
+    assert file.getvalue() == wkb
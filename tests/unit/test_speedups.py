@@ -0,0 +1,124 @@
+import json
+import random
+
+import pytest
+import quadbin
+from quadbin import main, tilecover
+
+speedups = pytest.importorskip("quadbin._speedups")
+
+random.seed(0)
+POINTS = [(random.uniform(-200, 200), random.uniform(-90, 90)) for _ in range(200)]
+POINTS += [(180, 85.06), (-180, -85.06), (0, 0), (179.999999, 0)]
+GEOMETRIES = [
+    {"type": "LineString", "coordinates": [[-3.71, 40.41], [-3.6, 40.45]]},
+    {
+        "type": "LineString",
+        "coordinates": [[170, 10], [-170, 12], [175, 14], [-175, 10]],
+    },
+    {
+        "type": "Polygon",
+        "coordinates": [
+            [[-3.71, 40.41], [-3.6, 40.45], [-3.55, 40.38], [-3.71, 40.41]],
+            [[-3.66, 40.41], [-3.62, 40.41], [-3.63, 40.4], [-3.66, 40.41]],
+        ],
+    },
+    {
+        "type": "Polygon",
+        "coordinates": [[[179, -1], [-179, -1], [-179, 1], [179, 1], [179, -1]]],
+    },
+    {
+        "type": "Polygon",
+        "coordinates": [[[-180, 70], [-60, 70], [60, 70], [180, 70], [-180, 70]]],
+    },
+    {
+        "type": "Polygon",
+        "coordinates": [[[0, 80], [10, 80], [10, 89], [0, 89], [0, 80]]],
+    },
+]
+
+
+@pytest.fixture
+def python_tilecover(monkeypatch):
+    monkeypatch.setattr(tilecover, "JIT_BACKEND", [None])
+    for name, function in tilecover.PYTHON_FUNCTIONS.items():
+        monkeypatch.setattr(tilecover, name, function)
+
+
+def test_dispatch():
+    assert quadbin.point_to_cell is speedups.point_to_cell
+    assert quadbin.cell_to_tile is speedups.cell_to_tile
+    assert tilecover.line_cover is speedups.line_cover
+
+
+@pytest.mark.parametrize("resolution", [0, 1, 10, 17, 26])
+def test_cells(resolution):
+    python = main.PYTHON_FUNCTIONS
+    for longitude, latitude in POINTS:
+        cell = speedups.point_to_cell(longitude, latitude, resolution)
+        assert cell == python["point_to_cell"](longitude, latitude, resolution)
+        tile = speedups.cell_to_tile(cell)
+        assert tile == python["cell_to_tile"](cell)
+        assert speedups.tile_to_cell(tile) == python["tile_to_cell"](tile)
+        parent_resolution = resolution // 2
+        assert speedups.cell_to_parent(cell, parent_resolution) == python[
+            "cell_to_parent"
+        ](cell, parent_resolution)
+        if resolution < 26:
+            children_resolution = min(resolution + 2, 26)
+            assert speedups.cell_to_children(cell, children_resolution) == python[
+                "cell_to_children"
+            ](cell, children_resolution)
+
+
+def test_errors():
+    python = main.PYTHON_FUNCTIONS
+    cell = quadbin.point_to_cell(0, 0, 4)
+    for name, args in [
+        ("point_to_cell", (0, 0, 27)),
+        ("point_to_cell", (float("nan"), 0, 4)),
+        ("cell_to_parent", (cell, 5)),
+        ("cell_to_children", (cell, 4)),
+        ("tile_to_cell", ((0, 0, 33),)),
+    ]:
+        with pytest.raises(ValueError):
+            python[name](*args)
+        with pytest.raises(ValueError):
+            getattr(speedups, name)(*args)
+    assert speedups.tile_to_cell(None) is None
+
+
+@pytest.mark.parametrize("geometry", GEOMETRIES)
+@pytest.mark.parametrize("resolution", [4, 9, 14])
+def test_get_tiles(geometry, resolution, python_tilecover):
+    expected = sorted(tilecover.get_tiles(geometry, resolution))
+    for name in tilecover.PYTHON_FUNCTIONS:
+        setattr(tilecover, name, getattr(speedups, name))
+    assert sorted(tilecover.get_tiles(geometry, resolution)) == expected
+
+
+@pytest.mark.parametrize("origin", [None, 0.5, 15.5])
+def test_line_cover_ring(origin):
+    python = tilecover.PYTHON_FUNCTIONS["line_cover"]
+    coords = GEOMETRIES[3]["coordinates"][0]
+    python_ring, ring = [], []
+    assert speedups.line_cover(coords, 4, ring, origin) == python(
+        coords, 4, python_ring, origin
+    )
+    assert ring == python_ring
+
+
+def test_tile_hashes():
+    python = tilecover.PYTHON_FUNCTIONS
+    tiles = [(0, 0, 0), (-1, 3, 2), (5, 7, 3), (3, -1, 4), (67108863, 67108863, 26)]
+    for x, y, z in tiles:
+        tile_hash = speedups.to_tile_hash(x, y, z)
+        assert tile_hash == python["to_tile_hash"](x, y, z)
+        assert speedups.from_tile_hash(tile_hash) == python["from_tile_hash"](tile_hash)
+
+
+def test_geometry_to_cells(python_tilecover):
+    geometry = json.dumps(GEOMETRIES[2])
+    expected = sorted(quadbin.geometry_to_cells(geometry, 17))
+    tilecover.line_cover = speedups.line_cover
+    assert sorted(quadbin.geometry_to_cells(geometry, 17)) == expected
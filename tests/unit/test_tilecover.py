@@ -0,0 +1,133 @@
+import math
+
+import pytest
+from quadbin import tilecover
+from quadbin.utils import tile_to_latitude, tile_to_longitude
+
+
+def square(x0, y0, x1, y1, z=4):
+    # Ring of tile fractions, counterclockwise on the map
+    points = [(x0, y1), (x1, y1), (x1, y0), (x0, y0), (x0, y1)]
+    return [
+        [tile_to_longitude((0, 0, z), x), tile_to_latitude((0, 0, z), y)]
+        for x, y in points
+    ]
+
+
+def test_polygon_spans():
+    polygon = [square(2.2, 3.2, 7.8, 5.6)]
+    assert list(tilecover.polygon_spans(polygon, 4)) == [
+        (3, 2, 8),
+        (4, 2, 8),
+        (5, 2, 8),
+    ]
+    assert list(tilecover.polygon_spans(polygon, 4, rows=(5, 9))) == [(5, 2, 8)]
+    # Holes are not filled
+    polygon.append(square(3.2, 3.2, 5.8, 5.6)[::-1])
+    assert list(tilecover.polygon_spans(polygon, 4)) == [
+        (3, 2, 3),
+        (3, 6, 8),
+        (4, 2, 3),
+        (4, 6, 8),
+        (5, 2, 3),
+        (5, 6, 8),
+    ]
+
+
+def test_polygon_spans_fill_rule():
+    # Two overlapping rings with the same orientation
+    polygon = [square(1.2, 1.2, 6.8, 2.8), square(4.2, 1.2, 9.8, 2.8)]
+    assert list(tilecover.polygon_spans(polygon, 4)) == [
+        (1, 1, 4),
+        (1, 7, 10),
+        (2, 1, 4),
+        (2, 7, 10),
+    ]
+    assert list(tilecover.polygon_spans(polygon, 4, "nonzero")) == [
+        (1, 1, 10),
+        (2, 1, 10),
+    ]
+
+
+def test_polygon_spans_antimeridian():
+    polygon = [square(14.5, 1.2, 17.6, 2.8)]
+    assert list(tilecover.polygon_spans(polygon, 4)) == [(1, 14, 18), (2, 14, 18)]
+    tiles = tilecover.tiles_hashes_to_tiles(tilecover.polygon_cover(polygon, 4))
+    assert sorted(tiles) == [
+        (0, 1, 4),
+        (0, 2, 4),
+        (1, 1, 4),
+        (1, 2, 4),
+        (14, 1, 4),
+        (14, 2, 4),
+        (15, 1, 4),
+        (15, 2, 4),
+    ]
+
+
+def test_polygon_cover_fill_rule():
+    polygon = [square(1.2, 1.2, 6.8, 5.8), square(4.2, 1.2, 9.8, 5.8)]
+    evenodd = set(tilecover.polygon_cover(polygon, 4))
+    nonzero = set(tilecover.polygon_cover(polygon, 4, fill_rule="nonzero"))
+    assert nonzero - evenodd == {tilecover.to_tile_hash(5, y, 4) for y in (2, 3, 4)}
+    window = set(tilecover.polygon_cover(polygon, 4, (5, 3, 6, 15), "nonzero"))
+    assert window == {
+        tilecover.to_tile_hash(x, y, 4) for x in (5, 6) for y in (3, 4, 5)
+    }
+    with pytest.raises(ValueError, match="Invalid fill rule"):
+        tilecover.polygon_cover(polygon, 4, fill_rule="winding")
+
+
+def test_span_hashes():
+    assert tilecover.span_hashes(1, 14, 18, 4) == [
+        tilecover.to_tile_hash(x, 1, 4) for x in (14, 15, 16, 17)
+    ]
+    assert tilecover.span_hashes(1, 14, 18, 4, (0, 0, 14, 15)) == [
+        tilecover.to_tile_hash(x, 1, 4) for x in (14, 16, 17)
+    ]
+
+
+def wavy_ring(n=400):
+    # Ring with small waves along a circle in tile fractions of z=4
+    points = []
+    for i in range(n):
+        angle = 2 * math.pi * i / n
+        radius = 3 + 0.3 * math.sin(40 * angle)
+        points.append((8 + radius * math.cos(angle), 8 + radius * math.sin(angle)))
+    points.append(points[0])
+    return [
+        [tile_to_longitude((0, 0, 4), x), tile_to_latitude((0, 0, 4), y)]
+        for x, y in points
+    ]
+
+
+def test_get_tiles_simplify():
+    ring = wavy_ring()
+    for geometry in (
+        {"type": "Polygon", "coordinates": [ring]},
+        {"type": "LineString", "coordinates": ring},
+    ):
+        for resolution in (2, 4, 6):
+            tiles = set(tilecover.get_tiles(geometry, resolution))
+            exact = tilecover.get_tiles(geometry, resolution, "exact")
+            superset = tilecover.get_tiles(geometry, resolution, "superset")
+            assert set(exact) == tiles
+            assert set(superset) >= tiles
+
+
+def test_simplify_geometry():
+    geometry = {"type": "Polygon", "coordinates": [wavy_ring()]}
+    exact = tilecover.simplify_geometry(geometry, 4, "exact")
+    superset = tilecover.simplify_geometry(geometry, 4, "superset")
+    assert len(superset["coordinates"][0]) < len(exact["coordinates"][0]) < 401
+    assert exact["coordinates"][0][0] == exact["coordinates"][0][-1]
+    # A ring inside a single tile keeps a segment
+    geometry = {"type": "Polygon", "coordinates": [square(2.2, 3.2, 2.8, 3.6)]}
+    for simplify in ("exact", "superset"):
+        assert tilecover.get_tiles(geometry, 4, simplify) != []
+
+
+def test_get_tiles_simplify_invalid():
+    geometry = {"type": "Polygon", "coordinates": [wavy_ring()]}
+    with pytest.raises(ValueError, match="Invalid simplification"):
+        tilecover.get_tiles(geometry, 4, "fast")
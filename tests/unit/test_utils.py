@@ -1,5 +1,10 @@
 import pytest
-from quadbin.utils import point_to_tile, point_to_tile_fraction, tile_area
+from quadbin.utils import (
+    point_to_tile,
+    point_to_tile_fraction,
+    tile_area,
+    tile_k_ring,
+)
 
 
 def test_point_to_tile_fraction():
@@ -22,6 +27,31 @@ def test_point_to_tile():
     assert point_to_tile(-175, 95, 2) == (0, 0, 2)
 
 
+def test_tile_k_ring():
+    # Wraps around the antimeridian and skips rows beyond the poles
+    assert tile_k_ring((0, 0, 3), 1) == [
+        (7, 0, 3),
+        (0, 0, 3),
+        (1, 0, 3),
+        (7, 1, 3),
+        (0, 1, 3),
+        (1, 1, 3),
+    ]
+    assert tile_k_ring((7, 4, 3), 1, extra=True)[:3] == [
+        ((6, 3, 3), 1),
+        ((7, 3, 3), 1),
+        ((0, 3, 3), 1),
+    ]
+    # Rings wider than the level do not repeat tiles
+    assert sorted(tile_k_ring((0, 0, 1), 2)) == [
+        (0, 0, 1),
+        (0, 1, 1),
+        (1, 0, 1),
+        (1, 1, 1),
+    ]
+    assert tile_k_ring((0, 0, 0), 3, extra=True) == [((0, 0, 0), 0)]
+
+
 @pytest.mark.parametrize(
     "tile,expected",
     [
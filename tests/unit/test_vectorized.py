@@ -0,0 +1,154 @@
+import pytest
+import quadbin
+
+np = pytest.importorskip("numpy")
+vectorized = pytest.importorskip("quadbin.vectorized")
+
+LONGITUDES = [-3.7038, 33.75, 2.1734, -185.0, 180.0, 0.0]
+LATITUDES = [40.4168, -11.178401873711776, 41.3851, 85.0, -90.0, 0.0]
+
+
+@pytest.mark.parametrize("resolution", [0, 1, 4, 10, 17, 26])
+def test_points_to_cells(resolution):
+    cells = vectorized.points_to_cells(LONGITUDES, LATITUDES, resolution)
+    assert cells.dtype == np.uint64
+    assert cells.tolist() == [
+        quadbin.point_to_cell(lon, lat, resolution)
+        for lon, lat in zip(LONGITUDES, LATITUDES)
+    ]
+    with pytest.raises(ValueError, match="Invalid resolution"):
+        vectorized.points_to_cells(LONGITUDES, LATITUDES, 27)
+
+
+def test_cells_to_tiles_and_tiles_to_cells():
+    cells = vectorized.points_to_cells(LONGITUDES, LATITUDES, 17)
+    x, y, z = vectorized.cells_to_tiles(cells)
+    tiles = list(zip(x.tolist(), y.tolist(), z.tolist()))
+    assert tiles == [quadbin.cell_to_tile(cell) for cell in cells.tolist()]
+    assert vectorized.tiles_to_cells(x, y, z).tolist() == cells.tolist()
+    assert vectorized.tiles_to_cells([9], [8], 4).tolist() == [5209574053332910079]
+
+
+def test_cells_to_parents():
+    cells = np.array([5209574053332910079, 5234261499580514303], dtype=np.int64)
+    assert vectorized.get_resolutions(cells).tolist() == [4, 10]
+    assert vectorized.cells_to_parents(cells, 2).tolist() == [
+        quadbin.cell_to_parent(5209574053332910079, 2),
+        quadbin.cell_to_parent(5234261499580514303, 2),
+    ]
+    with pytest.raises(ValueError, match="Invalid resolution"):
+        vectorized.cells_to_parents(cells, 5)
+
+
+def test_cells_contain():
+    cells = vectorized.points_to_cells(LONGITUDES, LATITUDES, 17)
+    parents = [
+        quadbin.cell_to_parent(cells[0].item(), 4),
+        quadbin.cell_to_parent(cells[1].item(), 12),
+        cells[2].item(),
+        quadbin.cell_to_children(cells[5].item(), 18)[0],
+    ]
+    assert vectorized.cells_contain(parents, cells).tolist() == [
+        True,
+        True,
+        True,
+        False,
+        False,
+        False,
+    ]
+    assert vectorized.cells_contain(parents[:1], parents).tolist() == [
+        True,
+        False,
+        False,
+        False,
+    ]
+    assert not vectorized.cells_contain([], cells).any()
+
+
+def test_points_in_cells():
+    parents = [
+        quadbin.point_to_cell(-3.7, 40.4, 8),
+        quadbin.point_to_cell(2.2, 41.4, 2),
+    ]
+    contained = vectorized.points_in_cells(LONGITUDES, LATITUDES, parents)
+    assert contained.tolist() == [True, False, True, False, False, False]
+
+
+def test_cells_distances_and_grid_paths():
+    origins = vectorized.points_to_cells(LONGITUDES, LATITUDES, 10)
+    targets = vectorized.points_to_cells(LONGITUDES[::-1], LATITUDES[::-1], 10)
+    distances = vectorized.cells_distances(origins, targets)
+    assert distances.tolist() == [
+        quadbin.cell_distance(origin, target)
+        for origin, target in zip(origins.tolist(), targets.tolist())
+    ]
+    cells, offsets = vectorized.grid_paths(origins, targets)
+    assert [
+        cells[start:stop].tolist() for start, stop in zip(offsets, offsets[1:])
+    ] == [
+        quadbin.grid_path(origin, target)
+        for origin, target in zip(origins.tolist(), targets.tolist())
+    ]
+    with pytest.raises(ValueError, match="Invalid cells"):
+        vectorized.cells_distances(origins, vectorized.cells_to_parents(targets, 2))
+
+
+def test_cells_to_points():
+    cells = vectorized.points_to_cells(LONGITUDES, LATITUDES, 10)
+    points = vectorized.cells_to_points(cells)
+    assert points.shape == (len(cells), 2)
+    assert np.allclose(points, [quadbin.cell_to_point(cell) for cell in cells.tolist()])
+
+
+def test_nearest_cells():
+    longitudes = np.linspace(-179.5, 179.5, 300)
+    latitudes = np.sin(np.arange(300)) * 80
+    candidates = np.concatenate(
+        [
+            vectorized.points_to_cells(longitudes, latitudes, resolution)
+            for resolution in [8, 14]
+        ]
+    )
+    queries = vectorized.points_to_cells(LONGITUDES, LATITUDES, 12)
+    cells, distances = vectorized.nearest_cells(queries, candidates, k=3)
+    assert cells.shape == distances.shape == (len(queries), 3)
+
+    # Brute force over the centers of all the candidates
+    points = np.radians(vectorized.cells_to_points(candidates))
+    for query, row in zip(np.radians(vectorized.cells_to_points(queries)), distances):
+        expected = np.sort(
+            vectorized.haversine(query[0], query[1], points[:, 0], points[:, 1])
+        )
+        assert np.allclose(row, expected[:3] * vectorized.EARTH_RADIUS)
+
+    cells, distances = vectorized.nearest_cells(candidates[:5], candidates)
+    assert cells[:, 0].tolist() == candidates[:5].tolist()
+    assert distances[:, 0].tolist() == [0.0] * 5
+    with pytest.raises(ValueError, match="Invalid k"):
+        vectorized.nearest_cells(queries, candidates[:2], k=3)
+
+
+def test_cells_to_hilbert():
+    cells = np.concatenate(
+        [
+            vectorized.points_to_cells(LONGITUDES, LATITUDES, resolution)
+            for resolution in [0, 1, 7, 26]
+        ]
+    )
+    keys = vectorized.cells_to_hilbert(cells)
+    assert keys.tolist() == [quadbin.cell_to_hilbert(cell) for cell in cells.tolist()]
+    assert vectorized.hilbert_to_cells(keys).tolist() == cells.tolist()
+    with pytest.raises(ValueError, match="Invalid Hilbert key"):
+        vectorized.hilbert_to_cells([27])
+
+
+def test_indexes_to_strings():
+    indexes = np.array([5209574053332910079, 255, 0], dtype=np.uint64)
+    assert vectorized.indexes_to_strings(indexes).tolist() == [
+        "484c1fffffffffff",
+        "ff",
+        "0",
+    ]
+    data, offsets = vectorized.hex_buffers(indexes)
+    assert data.tobytes() == b"484c1fffffffffffff0"
+    assert offsets.tolist() == [0, 16, 18, 19]